@@ -4,14 +4,19 @@ from .neurodiffeq import diff
 from .utils import set_tensor_type as _set_tensor_type  # Don't export this function
 
 from . import conditions
+from . import distributed
 from . import function_basis
 from . import generators
+from . import geometry
 from . import networks
 from . import neurodiffeq
 from . import operators
+from . import optimizers
 from . import pde
 from . import ode
 from . import pde_spherical
+from . import solvers
+from . import sweep
 from . import temporal
 
 # Set default float type to 64 bits
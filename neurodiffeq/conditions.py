@@ -75,6 +75,68 @@ class BaseCondition:
         self.ith_unit = ith_unit
 
 
+def _overrides_enforce(condition):
+    return condition.__class__.enforce != BaseCondition.enforce
+
+
+def _enforce_on_single_net(net, conditions, *coordinates):
+    r"""Enforce several conditions on the output units of a single (multi-output) network,
+    running the network only once instead of once per condition.
+
+    The output column(s) handed to each condition are chosen in the same way as ``BaseCondition.enforce``,
+    i.e., using the ``ith_unit`` of the condition. Conditions that override ``.enforce`` are enforced separately.
+
+    :param net: The multi-output network.
+    :type net: `torch.nn.Module`
+    :param conditions: The conditions to enforce.
+    :type conditions: list[`BaseCondition`]
+    :param coordinates: Inputs of the neural network.
+    :type coordinates: `torch.Tensor`
+    :return: The re-parameterized outputs, one for each condition.
+    :rtype: list[`torch.Tensor`]
+    """
+    network_output = None
+    us = []
+    for con in conditions:
+        if _overrides_enforce(con):
+            us.append(con.enforce(net, *coordinates))
+            continue
+        if network_output is None:
+            network_output = net(torch.cat(coordinates, dim=1))
+        if con.ith_unit is not None:
+            us.append(con.parameterize(network_output[:, con.ith_unit].view(-1, 1), *coordinates))
+        else:
+            us.append(con.parameterize(network_output, *coordinates))
+    return us
+
+
+def _enforce_on_fused_nets(nets, conditions, *coordinates):
+    r"""Enforce each condition on its own network, evaluating all networks with a single vectorized call
+    (see ``neurodiffeq.networks.FusedNetList``). None of the conditions should override ``.enforce``.
+
+    :param nets: The networks, one for each condition.
+    :type nets: `neurodiffeq.networks.FusedNetList`
+    :param conditions: The conditions to enforce.
+    :type conditions: list[`BaseCondition`]
+    :param coordinates: Inputs of the neural networks.
+    :type coordinates: `torch.Tensor`
+    :return: The re-parameterized outputs, one for each condition.
+    :rtype: list[`torch.Tensor`]
+    """
+    network_outputs = nets(torch.cat(coordinates, dim=1))
+    us = []
+    for network_output, con in zip(network_outputs, conditions):
+        if con.ith_unit is not None:
+            network_output = network_output[:, con.ith_unit].view(-1, 1)
+        us.append(con.parameterize(network_output, *coordinates))
+    return us
+
+
+def _parametric_value(value, params):
+    r"""Evaluate a value of a condition, which is either a constant or a function of the parameters of the problem"""
+    return value(*params) if callable(value) else value
+
+
 class IrregularBoundaryCondition(BaseCondition):
     # Is there a more elegant solution?
     def in_domain(self, *coordinates):
@@ -106,7 +168,7 @@ class EnsembleCondition(BaseCondition):
     def __init__(self, *sub_conditions, force=False):
         super(EnsembleCondition, self).__init__()
         for i, c in enumerate(sub_conditions):
-            if c.__class__.enforce != BaseCondition.enforce:
+            if _overrides_enforce(c):
                 msg = f"{c.__class__.__name__} (index={i})'s overrides BaseCondition's `.enforce` method. " \
                       f"Ensembl'ing is likely not going to work."
                 if force:
@@ -164,9 +226,11 @@ class IVP(BaseCondition):
     :param t_0: The initial time.
     :type t_0: float
     :param u_0: The initial value of :math:`u`. :math:`u(t_0)=u_0`.
-    :type u_0: float
+        For parametric problems, it can also be a function mapping the parameters (tensors) to the initial values.
+    :type u_0: float or callable
     :param u_0_prime: The initial derivative of :math:`u` w.r.t. :math:`t`. :math:`\displaystyle\frac{\partial u}{\partial t}\bigg|_{t = t_0} = u_0'`, defaults to None.
-    :type u_0_prime: float, optional
+        For parametric problems, it can also be a function mapping the parameters (tensors) to the initial derivatives.
+    :type u_0_prime: float or callable, optional
     """
 
     @deprecated_alias(x_0='u_0', x_0_prime='u_0_prime')
@@ -174,7 +238,7 @@ class IVP(BaseCondition):
         super().__init__()
         self.t_0, self.u_0, self.u_0_prime = t_0, u_0, u_0_prime
 
-    def parameterize(self, output_tensor, t):
+    def parameterize(self, output_tensor, t, *params):
         r"""Re-parameterizes outputs such that the Dirichlet/Neumann condition is satisfied.
 
         - For Dirichlet condition, the re-parameterization is
@@ -188,13 +252,17 @@ class IVP(BaseCondition):
         :type output_tensor: `torch.Tensor`
         :param t: Input to the neural network; i.e., sampled time-points; i.e., independent variables.
         :type t: `torch.Tensor`
+        :param params: Parameters of a parametric problem, if any; passed to `u_0` and `u_0_prime` if they are callable.
+        :type params: `torch.Tensor`
         :return: The re-parameterized output of the network.
         :rtype: `torch.Tensor`
         """
+        u_0 = _parametric_value(self.u_0, params)
         if self.u_0_prime is None:
-            return self.u_0 + (1 - torch.exp(-t + self.t_0)) * output_tensor
+            return u_0 + (1 - torch.exp(-t + self.t_0)) * output_tensor
         else:
-            return self.u_0 + (t - self.t_0) * self.u_0_prime + ((1 - torch.exp(-t + self.t_0)) ** 2) * output_tensor
+            u_0_prime = _parametric_value(self.u_0_prime, params)
+            return u_0 + (t - self.t_0) * u_0_prime + ((1 - torch.exp(-t + self.t_0)) ** 2) * output_tensor
 
 
 class DirichletBVP(BaseCondition):
@@ -204,11 +272,13 @@ class DirichletBVP(BaseCondition):
     :param t_0: The initial time.
     :type t_0: float
     :param u_0: The initial value of :math:`u`. :math:`u(t_0)=u_0`.
-    :type u_0: float
+        For parametric problems, it can also be a function mapping the parameters (tensors) to the values.
+    :type u_0: float or callable
     :param t_1: The final time.
     :type t_1: float
     :param u_1: The initial value of :math:`u`. :math:`u(t_1)=u_1`.
-    :type u_1: float
+        For parametric problems, it can also be a function mapping the parameters (tensors) to the values.
+    :type u_1: float or callable
     """
 
     @deprecated_alias(x_0='u_0', x_1='u_1')
@@ -216,7 +286,7 @@ class DirichletBVP(BaseCondition):
         super().__init__()
         self.t_0, self.u_0, self.t_1, self.u_1 = t_0, u_0, t_1, u_1
 
-    def parameterize(self, output_tensor, t):
+    def parameterize(self, output_tensor, t, *params):
         r"""Re-parameterizes outputs such that the Dirichlet condition is satisfied on both ends of the domain.
 
         The re-parameterization is
@@ -227,13 +297,15 @@ class DirichletBVP(BaseCondition):
         :type output_tensor: `torch.Tensor`
         :param t: Input to the neural network; i.e., sampled time-points or another independent variable.
         :type t: `torch.Tensor`
+        :param params: Parameters of a parametric problem, if any; passed to `u_0` and `u_1` if they are callable.
+        :type params: `torch.Tensor`
         :return: The re-parameterized output of the network.
         :rtype: `torch.Tensor`
         """
 
         t_tilde = (t - self.t_0) / (self.t_1 - self.t_0)
-        return self.u_0 * (1 - t_tilde) \
-               + self.u_1 * t_tilde \
+        return _parametric_value(self.u_0, params) * (1 - t_tilde) \
+               + _parametric_value(self.u_1, params) * t_tilde \
                + (1 - torch.exp((1 - t_tilde) * t_tilde)) * output_tensor
 
 
@@ -261,6 +333,10 @@ class DirichletBVP2D(BaseCondition):
     :type y_max: float
     :param y_max_val: The boundary value on :math:`y = y_1`, i.e. :math:`g_1(x)`.
     :type y_max_val: callable
+
+    .. note::
+        For parametric problems, the parameters (tensors) are passed to the boundary values after the coordinate,
+        e.g., :math:`f_0(y, p_1, \dots, p_k)`.
     """
 
     def __init__(self, x_min, x_min_val, x_max, x_max_val, y_min, y_min_val, y_max, y_max_val):
@@ -272,7 +348,7 @@ class DirichletBVP2D(BaseCondition):
         self.y0, self.g0 = y_min, y_min_val
         self.y1, self.g1 = y_max, y_max_val
 
-    def parameterize(self, output_tensor, x, y):
+    def parameterize(self, output_tensor, x, y, *params):
         r"""Re-parameterizes outputs such that the Dirichlet condition is satisfied on all four sides of the domain.
 
         The re-parameterization is
@@ -297,16 +373,22 @@ class DirichletBVP2D(BaseCondition):
         :type x: `torch.Tensor`
         :param y: :math:`y`-coordinates of inputs to the neural network; i.e., the sampled :math:`y`-coordinates
         :type y: `torch.Tensor`
+        :param params: Parameters of a parametric problem, if any; passed to the boundary values after the coordinate.
+        :type params: `torch.Tensor`
         :return: The re-parameterized output of the network.
         :rtype: `torch.Tensor`
         """
         x_tilde = (x - self.x0) / (self.x1 - self.x0)
         y_tilde = (y - self.y0) / (self.y1 - self.y0)
-        x0 = torch.ones_like(x_tilde[0, 0]).expand(*x_tilde.shape) * self.x0
-        x1 = torch.ones_like(x_tilde[0, 0]).expand(*x_tilde.shape) * self.x1
-        Axy = (1 - x_tilde) * self.f0(y) + x_tilde * self.f1(y) \
-              + (1 - y_tilde) * (self.g0(x) - ((1 - x_tilde) * self.g0(x0) + x_tilde * self.g0(x1))) \
-              + y_tilde * (self.g1(x) - ((1 - x_tilde) * self.g1(x0) + x_tilde * self.g1(x1)))
+        # avoid indexing and expanding, which are harder for `torch.compile` to trace with fixed shapes
+        x0 = torch.ones_like(x_tilde) * self.x0
+        x1 = torch.ones_like(x_tilde) * self.x1
+        f0, f1 = self.f0(y, *params), self.f1(y, *params)
+        g0, g0_x0, g0_x1 = self.g0(x, *params), self.g0(x0, *params), self.g0(x1, *params)
+        g1, g1_x0, g1_x1 = self.g1(x, *params), self.g1(x0, *params), self.g1(x1, *params)
+        Axy = (1 - x_tilde) * f0 + x_tilde * f1 \
+              + (1 - y_tilde) * (g0 - ((1 - x_tilde) * g0_x0 + x_tilde * g0_x1)) \
+              + y_tilde * (g1 - ((1 - x_tilde) * g1_x0 + x_tilde * g1_x1))
 
         return Axy + x_tilde * (1 - x_tilde) * y_tilde * (1 - y_tilde) * output_tensor
 
@@ -339,6 +421,11 @@ class IBVP1D(BaseCondition):
     :type x_max_prime: callable, optional
     :raises NotImplementedError: When unimplemented boundary conditions are configured.
 
+    .. note::
+        For parametric problems (including operator learning, where the parameters are discretized initial or boundary
+        data), the parameters (tensors) are passed to the initial and boundary values after the coordinate,
+        e.g., :math:`u_0(x, p_1, \dots, p_k)` and :math:`g(t, p_1, \dots, p_k)`.
+
     .. note::
         This condition cannot be passed to ``neurodiffeq.conditions.EnsembleCondition`` unless both boundaries uses
         Dirichlet conditions (by specifying only ``x_min_val`` and ``x_max_val``) and ``force`` is set to True in
@@ -358,8 +445,8 @@ class IBVP1D(BaseCondition):
         self.x_max, self.x_max_val, self.x_max_prime = x_max, x_max_val, x_max_prime
         self.t_min, self.t_min_val = t_min, t_min_val
 
-    def enforce(self, net, x, t):
-        r"""Enforces this condition on a network with inputs `x` and `t`
+    def enforce(self, net, x, t, *params):
+        r"""Enforces this condition on a network with inputs `x` and `t` (followed by the parameters, if any)
 
         :param net: The network whose output is to be re-parameterized.
         :type net: `torch.nn.Module`
@@ -367,6 +454,8 @@ class IBVP1D(BaseCondition):
         :type x: `torch.Tensor`
         :param t: The :math:`t`-coordinates of the samples; i.e., the temporal coordinates.
         :type t: `torch.Tensor`
+        :param params: Parameters of a parametric problem, if any.
+        :type params: `torch.Tensor`
         :return: The re-parameterized output, where the condition is automatically satisfied.
         :rtype: `torch.Tensor`
 
@@ -376,28 +465,28 @@ class IBVP1D(BaseCondition):
         """
 
         def ANN(x, t):
-            out = net(torch.cat([x, t], dim=1))
+            out = net(torch.cat([x, t, *params], dim=1))
             if self.ith_unit is not None:
                 out = out[:, self.ith_unit].view(-1, 1)
             return out
 
         uxt = ANN(x, t)
         if self.x_min_val and self.x_max_val:
-            return self.parameterize(uxt, x, t)
+            return self.parameterize(uxt, x, t, *params)
         elif self.x_min_val and self.x_max_prime:
             x1 = self.x_max * torch.ones_like(x, requires_grad=True)
             ux1t = ANN(x1, t)
-            return self.parameterize(uxt, x, t, ux1t, x1)
+            return self.parameterize(uxt, x, t, ux1t, x1, *params)
         elif self.x_min_prime and self.x_max_val:
             x0 = self.x_min * torch.ones_like(x, requires_grad=True)
             ux0t = ANN(x0, t)
-            return self.parameterize(uxt, x, t, ux0t, x0)
+            return self.parameterize(uxt, x, t, ux0t, x0, *params)
         elif self.x_min_prime and self.x_max_prime:
             x0 = self.x_min * torch.ones_like(x, requires_grad=True)
             x1 = self.x_max * torch.ones_like(x, requires_grad=True)
             ux0t = ANN(x0, t)
             ux1t = ANN(x1, t)
-            return self.parameterize(uxt, x, t, ux0t, x0, ux1t, x1)
+            return self.parameterize(uxt, x, t, ux0t, x0, ux1t, x1, *params)
         else:
             raise NotImplementedError('Sorry, this boundary condition is not implemented.')
 
@@ -455,6 +544,8 @@ class IBVP1D(BaseCondition):
         :param t: The :math:`t`-coordinates of the samples; i.e., the temporal coordinates.
         :type t: `torch.Tensor`
         :param additional_tensors: additional tensors that will be passed by ``enforce``
+            (network outputs on the Neumann boundaries and the boundary coordinates), followed by the parameters of a
+            parametric problem, if any
         :type additional_tensors: `torch.Tensor`
         :return: The re-parameterized output of the network.
         :rtype: `torch.Tensor`
@@ -465,46 +556,49 @@ class IBVP1D(BaseCondition):
         t_tilde = t - self.t_min
 
         if self.x_min_val and self.x_max_val:
-            return self._parameterize_dd(u, x, t, x_tilde, t_tilde, t0)
+            return self._parameterize_dd(u, x, t, x_tilde, t_tilde, t0, additional_tensors)
         elif self.x_min_val and self.x_max_prime:
-            return self._parameterize_dn(u, x, t, x_tilde, t_tilde, t0, *additional_tensors)
+            return self._parameterize_dn(u, x, t, x_tilde, t_tilde, t0, additional_tensors[2:],
+                                         *additional_tensors[:2])
         elif self.x_min_prime and self.x_max_val:
-            return self._parameterize_nd(u, x, t, x_tilde, t_tilde, t0, *additional_tensors)
+            return self._parameterize_nd(u, x, t, x_tilde, t_tilde, t0, additional_tensors[2:],
+                                         *additional_tensors[:2])
         elif self.x_min_prime and self.x_max_prime:
-            return self._parameterize_nn(u, x, t, x_tilde, t_tilde, t0, *additional_tensors)
+            return self._parameterize_nn(u, x, t, x_tilde, t_tilde, t0, additional_tensors[4:],
+                                         *additional_tensors[:4])
         else:
             raise NotImplementedError('Sorry, this boundary condition is not implemented.')
 
     # When we have Dirichlet boundary conditions on both ends of the domain:
-    def _parameterize_dd(self, uxt, x, t, x_tilde, t_tilde, t0):
-        Axt = self.t_min_val(x) + \
-              x_tilde * (self.x_max_val(t) - self.x_max_val(t0)) + \
-              (1 - x_tilde) * (self.x_min_val(t) - self.x_min_val(t0))
+    def _parameterize_dd(self, uxt, x, t, x_tilde, t_tilde, t0, p):
+        Axt = self.t_min_val(x, *p) + \
+              x_tilde * (self.x_max_val(t, *p) - self.x_max_val(t0, *p)) + \
+              (1 - x_tilde) * (self.x_min_val(t, *p) - self.x_min_val(t0, *p))
         return Axt + x_tilde * (1 - x_tilde) * (1 - torch.exp(-t_tilde)) * uxt
 
     # When we have Dirichlet boundary condition on the left end of the domain
     # and Neumann boundary condition on the right end of the domain:
-    def _parameterize_dn(self, uxt, x, t, x_tilde, t_tilde, t0, ux1t, x1):
-        Axt = (self.x_min_val(t) - self.x_min_val(t0)) + self.t_min_val(x) + \
-              x_tilde * (self.x_max - self.x_min) * (self.x_max_prime(t) - self.x_max_prime(t0))
+    def _parameterize_dn(self, uxt, x, t, x_tilde, t_tilde, t0, p, ux1t, x1):
+        Axt = (self.x_min_val(t, *p) - self.x_min_val(t0, *p)) + self.t_min_val(x, *p) + \
+              x_tilde * (self.x_max - self.x_min) * (self.x_max_prime(t, *p) - self.x_max_prime(t0, *p))
         return Axt + x_tilde * (1 - torch.exp(-t_tilde)) * (
                 uxt - (self.x_max - self.x_min) * diff(ux1t, x1) - ux1t
         )
 
     # When we have Neumann boundary condition on the left end of the domain
     # and Dirichlet boundary condition on the right end of the domain:
-    def _parameterize_nd(self, uxt, x, t, x_tilde, t_tilde, t0, ux0t, x0):
-        Axt = (self.x_max_val(t) - self.x_max_val(t0)) + self.t_min_val(x) + \
-              (x_tilde - 1) * (self.x_max - self.x_min) * (self.x_min_prime(t) - self.x_min_prime(t0))
+    def _parameterize_nd(self, uxt, x, t, x_tilde, t_tilde, t0, p, ux0t, x0):
+        Axt = (self.x_max_val(t, *p) - self.x_max_val(t0, *p)) + self.t_min_val(x, *p) + \
+              (x_tilde - 1) * (self.x_max - self.x_min) * (self.x_min_prime(t, *p) - self.x_min_prime(t0, *p))
         return Axt + (1 - x_tilde) * (1 - torch.exp(-t_tilde)) * (
                 uxt + (self.x_max - self.x_min) * diff(ux0t, x0) - ux0t
         )
 
     # When we have Neumann boundary conditions on both ends of the domain:
-    def _parameterize_nn(self, uxt, x, t, x_tilde, t_tilde, t0, ux0t, x0, ux1t, x1):
-        Axt = self.t_min_val(x) \
-              - 0.5 * (1 - x_tilde) ** 2 * (self.x_max - self.x_min) * (self.x_min_prime(t) - self.x_min_prime(t0)) \
-              + 0.5 * x_tilde ** 2 * (self.x_max - self.x_min) * (self.x_max_prime(t) - self.x_max_prime(t0))
+    def _parameterize_nn(self, uxt, x, t, x_tilde, t_tilde, t0, p, ux0t, x0, ux1t, x1):
+        Axt = self.t_min_val(x, *p) \
+              - 0.5 * (1 - x_tilde) ** 2 * (self.x_max - self.x_min) * (self.x_min_prime(t, *p) - self.x_min_prime(t0, *p)) \
+              + 0.5 * x_tilde ** 2 * (self.x_max - self.x_min) * (self.x_max_prime(t, *p) - self.x_max_prime(t0, *p))
         return Axt + (1 - torch.exp(-t_tilde)) * (
                 uxt
                 - x_tilde * (self.x_max - self.x_min) * diff(ux0t, x0)
@@ -530,6 +624,11 @@ class DirichletBVPSpherical(BaseCondition):
     :type r_1: float or None
     :param g: The value of :math:`u` on the exterior boundary. :math:`u(r_1, \theta, \phi)=g(\theta, \phi)`. If set to None, `r_1` must also be set to None.
     :type g: callable or None
+
+    .. note::
+        For parametric problems (including operator learning, where the parameters are discretized boundary data),
+        the parameters (tensors) are passed to `f` and `g` after the coordinates,
+        e.g., :math:`f(\theta, \phi, p_1, \dots, p_k)`.
     """
 
     def __init__(self, r_0, f, r_1=None, g=None):
@@ -539,7 +638,7 @@ class DirichletBVPSpherical(BaseCondition):
         self.r_0, self.r_1 = r_0, r_1
         self.f, self.g = f, g
 
-    def parameterize(self, output_tensor, r, theta, phi):
+    def parameterize(self, output_tensor, r, theta, phi, *params):
         r"""Re-parameterizes outputs such that the Dirichlet condition is satisfied on both spherical boundaries.
 
         - If both inner and outer boundaries are specified
@@ -566,15 +665,17 @@ class DirichletBVPSpherical(BaseCondition):
         :type theta: `torch.Tensor`
         :param phi: The longitudes (or :math:`\phi`-component) of the inputs to the network.
         :type phi: `torch.Tensor`
+        :param params: Parameters of a parametric problem, if any; passed to `f` and `g` after the coordinates.
+        :type params: `torch.Tensor`
         :return: The re-parameterized output of the network.
         :rtype: `torch.Tensor`
         """
         if self.r_1 is None:
-            return (1 - torch.exp(-torch.abs(r - self.r_0))) * output_tensor + self.f(theta, phi)
+            return (1 - torch.exp(-torch.abs(r - self.r_0))) * output_tensor + self.f(theta, phi, *params)
         else:
             r_tilde = (r - self.r_0) / (self.r_1 - self.r_0)
-            return self.f(theta, phi) * (1 - r_tilde) + \
-                   self.g(theta, phi) * r_tilde + \
+            return self.f(theta, phi, *params) * (1 - r_tilde) + \
+                   self.g(theta, phi, *params) * r_tilde + \
                    (1. - torch.exp((1 - r_tilde) * r_tilde)) * output_tensor
 
 
@@ -0,0 +1,209 @@
+import os
+import socket
+import warnings
+import dill
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+from .solvers import _requires_residuals
+from .solvers import SwitchOptimizerCallback, LRSchedulerCallback, PlateauCallback, EarlyStoppingCallback
+from .pde_spherical import SphericalSolver
+
+# callbacks that only depend on the epochs and the loss histories, which are the same in every process;
+# they may change the optimizer, hence they are run by every process to keep the replicas identical
+_EVERY_RANK_CALLBACKS = (SwitchOptimizerCallback, LRSchedulerCallback, PlateauCallback, EarlyStoppingCallback)
+
+
+class DistributedSphericalSolver(SphericalSolver):
+    r"""A ``SphericalSolver`` trained data-parallel on CPUs with ``torch.distributed`` (gloo backend),
+    with one replica of the networks in every process.
+    It must be created in every process of an initialized process group, e.g. by the function passed to
+    ``neurodiffeq.distributed.launch``.
+
+    Every process samples points from its own generators (its shard of the training points), hence the generators of
+    different processes must be seeded or constructed differently. At the start, the networks of every process are
+    overwritten by those of rank 0. In every optimization step, the gradients are averaged over all processes before
+    ``._do_optimizer_step()``, so the replicas stay identical. The losses and metrics are averaged over all processes
+    as well; the best networks are kept by rank 0 only. The callbacks of ``neurodiffeq.solvers`` that adjust the
+    training (``SwitchOptimizerCallback``, ``LRSchedulerCallback``, ``PlateauCallback`` and ``EarlyStoppingCallback``)
+    are run by every process, other callbacks (and the monitor) are only run by rank 0,
+    after which its ``._stop_training`` flag is broadcast to all processes.
+
+    :param args: Positional arguments passed to ``neurodiffeq.pde_spherical.SphericalSolver``.
+    :param kwargs: Keyword arguments passed to ``neurodiffeq.pde_spherical.SphericalSolver``.
+
+    .. note::
+        Other callbacks must not change the state of the solver (e.g., the optimizer) other than
+        ``._stop_training``, as they are only run by rank 0.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if not dist.is_initialized():
+            raise RuntimeError("The default process group isn't initialized; "
+                               "use `neurodiffeq.distributed.launch` or `torch.distributed.init_process_group`")
+        super(DistributedSphericalSolver, self).__init__(*args, **kwargs)
+        if _requires_residuals(self.optimizer):
+            raise ValueError(f"{self.optimizer.__class__.__name__} is not supported by {self.__class__.__name__}")
+        self.rank = dist.get_rank()
+        self.world_size = dist.get_world_size()
+        with torch.no_grad():
+            for net in self.nets:
+                for tensor in list(net.parameters()) + list(net.buffers()):
+                    dist.broadcast(tensor, src=0)
+
+    def _all_reduce_mean(self, tensor):
+        dist.all_reduce(tensor)
+        tensor /= self.world_size
+        return tensor
+
+    def _all_reduce_gradients(self):
+        """Average the gradients of the optimized parameters over all processes, with a single all-reduce"""
+        params = [p for group in self.optimizer.param_groups for p in group['params'] if p.requires_grad]
+        for p in params:
+            if p.grad is None:
+                p.grad = torch.zeros_like(p)
+        flat = self._all_reduce_mean(torch.cat([p.grad.reshape(-1) for p in params]))
+        for p, g in zip(params, flat.split([p.numel() for p in params])):
+            p.grad.copy_(g.view_as(p))
+
+    def _do_optimizer_step(self, closure=None):
+        if closure is None:
+            self._all_reduce_gradients()
+            return super(DistributedSphericalSolver, self)._do_optimizer_step()
+
+        def reduced_closure():
+            loss = closure()
+            self._all_reduce_gradients()
+            return self._all_reduce_mean(torch.as_tensor(loss, dtype=torch.get_default_dtype()).clone())
+
+        return super(DistributedSphericalSolver, self)._do_optimizer_step(reduced_closure)
+
+    def _update_history(self, value, metric_type, key):
+        value = self._all_reduce_mean(torch.tensor(float(value))).item()
+        super(DistributedSphericalSolver, self)._update_history(value, metric_type, key)
+
+    def _update_best(self):
+        if self.rank == 0:
+            super(DistributedSphericalSolver, self)._update_best()
+
+    def _sync_flag(self, flag):
+        flag = torch.tensor(float(flag))
+        dist.broadcast(flag, src=0)
+        return bool(flag.item())
+
+    def fit(self, max_epochs, callbacks=None, monitor=None, time_budget=None):
+        r"""Run multiple epochs of training and validation in every process;
+        see ``neurodiffeq.pde_spherical.SphericalSolver.fit``.
+        The callbacks (except those adjusting the training, see ``DistributedSphericalSolver``) and the monitor
+        are only run by rank 0, and so are the decisions on the wall clock (if `time_budget` is specified).
+
+        :param max_epochs: number of epochs to run
+        :type max_epochs: int
+        :param monitor: DEPRECATED; use a MonitorCallback instance instead; Monitor for visualizing solution and metrics
+        :rtype monitor: `neurodiffeq.pde_spherical.MonitorSpherical`
+        :param callbacks: a list of callback functions, each accepting the solver instance itself as its only argument
+        :rtype callbacks: list[callable]
+        :param time_budget: if specified, the wall-clock budget of the training, in seconds;
+            see `neurodiffeq.solvers.BaseSolver.fit`
+        :type time_budget: float
+        """
+        callbacks = list(callbacks) if callbacks else []
+
+        def synced_callbacks(solver):
+            for cb in callbacks:
+                if solver.rank == 0 or isinstance(cb, _EVERY_RANK_CALLBACKS):
+                    cb(solver)
+            solver._stop_training = solver._sync_flag(solver._stop_training)
+
+        super(DistributedSphericalSolver, self).fit(
+            max_epochs=max_epochs, callbacks=[synced_callbacks], monitor=monitor if self.rank == 0 else None,
+            time_budget=time_budget,
+        )
+
+    def get_solution(self, copy=True, best=True, harmonics_fn=None):
+        """Return a solution class; the best networks are only known to rank 0, other ranks use the current ones
+
+        :param copy: if True, use a deep copy of internal nets and conditions
+        :type copy: bool
+        :param best: if True, return the solution with lowest loss instead of the solution after the last epoch
+        :type best: bool
+        :param harmonics_fn: if set, use it as function basis for returned solution
+        :type harmonics_fn: callable
+        :return: trained solution; one for each member in ensemble mode
+        :rtype: `neurodiffeq.pde_spherical.SolutionSpherical` or list[`neurodiffeq.pde_spherical.SolutionSpherical`]
+        """
+        best = best and self._best_snapshot is not None
+        return super(DistributedSphericalSolver, self).get_solution(copy=copy, best=best, harmonics_fn=harmonics_fn)
+
+    def _get_internal_variables(self):
+        available_params = super(DistributedSphericalSolver, self)._get_internal_variables()
+        available_params.update({"rank": self.rank, "world_size": self.world_size})
+        return available_params
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _launch_worker(rank, payload, world_size, master_addr, master_port, n_threads, seed, queue):
+    os.environ['MASTER_ADDR'] = master_addr
+    os.environ['MASTER_PORT'] = str(master_port)
+    torch.set_num_threads(n_threads)
+    torch.manual_seed(seed + rank)
+    dist.init_process_group('gloo', rank=rank, world_size=world_size)
+    try:
+        result = dill.loads(payload)(rank, world_size)
+        if rank == 0:
+            queue.put(dill.dumps(result))
+    finally:
+        dist.destroy_process_group()
+
+
+def launch(fn, world_size, n_threads=None, seed=0, master_addr='127.0.0.1', master_port=None, start_method='fork'):
+    r"""Run a function in `world_size` processes on this machine, with a gloo process group initialized in each,
+    and return what it returns in rank 0.
+
+    :param fn: The function to run, mapping the rank and the world size to a result; usually, it creates a
+        ``DistributedSphericalSolver``, fits it and returns its solution. It's sent to the processes with ``dill``.
+    :type fn: callable
+    :param world_size: Number of processes.
+    :type world_size: int
+    :param n_threads: Number of threads for PyTorch operations in every process,
+        defaults to an even share of the CPUs.
+    :type n_threads: int, optional
+    :param seed: The random seed of rank 0; rank `i` is seeded with `seed + i`, so that the processes
+        sample different points. Defaults to 0.
+    :type seed: int, optional
+    :param master_addr: The address of rank 0, defaults to '127.0.0.1'.
+    :type master_addr: str, optional
+    :param master_port: The port of rank 0, defaults to a free port.
+    :type master_port: int, optional
+    :param start_method: The start method of the processes ('fork', 'spawn' or 'forkserver'), defaults to 'fork'.
+    :type start_method: str, optional
+    :return: The result of `fn` in rank 0.
+    """
+    if world_size < 1:
+        raise ValueError(f"`world_size` must be positive, got {world_size}")
+    if n_threads is None:
+        n_threads = max(1, (os.cpu_count() or 1) // world_size)
+    if master_port is None:
+        master_port = _free_port()
+    if world_size > (os.cpu_count() or 1):
+        warnings.warn(f"{world_size} processes are launched on {os.cpu_count()} CPUs")
+
+    queue = mp.get_context(start_method).SimpleQueue()
+    context = mp.start_processes(
+        _launch_worker, args=(dill.dumps(fn), world_size, master_addr, master_port, n_threads, seed, queue),
+        nprocs=world_size, join=False, start_method=start_method,
+    )
+    # the result is read while waiting, so that rank 0 isn't blocked by a full pipe
+    result = None
+    while not context.join(timeout=0.1):
+        if not queue.empty():
+            result = queue.get()
+    if not queue.empty():
+        result = queue.get()
+    return dill.loads(result) if result is not None else None
@@ -28,6 +28,12 @@ class BaseGenerator:
         self.check_generator(other)
         return EnsembleGenerator(self, other)
 
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.get_examples()
+
 
 class Generator1D(BaseGenerator):
     """An example generator for generating 1-D training points.
@@ -261,6 +267,237 @@ class GeneratorSpherical(BaseGenerator):
         return r, theta, phi
 
 
+def _sample_box_volume(size, xyz_min, xyz_max, rng=None):
+    lo = torch.tensor(xyz_min, dtype=torch.get_default_dtype())
+    hi = torch.tensor(xyz_max, dtype=torch.get_default_dtype())
+    p = lo + (hi - lo) * torch.rand(size, 3, generator=rng)
+    return p[:, 0], p[:, 1], p[:, 2]
+
+
+def _sample_box_surface(size, xyz_min, xyz_max, rng=None):
+    lo = torch.tensor(xyz_min, dtype=torch.get_default_dtype())
+    hi = torch.tensor(xyz_max, dtype=torch.get_default_dtype())
+    lx, ly, lz = (hi - lo).tolist()
+    # faces are ordered as x=x_min, x=x_max, y=y_min, y=y_max, z=z_min, z=z_max
+    areas = torch.tensor([ly * lz, ly * lz, lx * lz, lx * lz, lx * ly, lx * ly])
+    face = torch.multinomial(areas, size, replacement=True, generator=rng)
+    p = lo + (hi - lo) * torch.rand(size, 3, generator=rng)
+    axis = face // 2
+    value = torch.where(face % 2 == 0, lo[axis], hi[axis])
+    p[torch.arange(size), axis] = value
+    return p[:, 0], p[:, 1], p[:, 2]
+
+
+def _sample_ball_volume(size, center, radius, rng=None):
+    direction = torch.randn(size, 3, generator=rng)
+    direction = direction / direction.norm(dim=1, keepdim=True)
+    r = radius * torch.rand(size, 1, generator=rng) ** (1 / 3)
+    p = torch.tensor(center, dtype=torch.get_default_dtype()) + r * direction
+    return p[:, 0], p[:, 1], p[:, 2]
+
+
+def _sample_ball_surface(size, center, radius, rng=None):
+    direction = torch.randn(size, 3, generator=rng)
+    direction = direction / direction.norm(dim=1, keepdim=True)
+    p = torch.tensor(center, dtype=torch.get_default_dtype()) + radius * direction
+    return p[:, 0], p[:, 1], p[:, 2]
+
+
+def _sample_cylinder_volume(size, center, radius, height, rng=None):
+    r = radius * torch.sqrt(torch.rand(size, generator=rng))
+    theta = 2 * np.pi * torch.rand(size, generator=rng)
+    h = height * (torch.rand(size, generator=rng) - 0.5)
+    x0, y0, z0 = center
+    return x0 + r * torch.cos(theta), y0 + r * torch.sin(theta), z0 + h
+
+
+def _sample_cylinder_surface(size, center, radius, height, rng=None):
+    # parts are ordered as lateral surface, bottom disk, top disk
+    areas = torch.tensor([2 * np.pi * radius * height, np.pi * radius ** 2, np.pi * radius ** 2])
+    part = torch.multinomial(areas, size, replacement=True, generator=rng)
+    on_disk = part > 0
+    r = torch.where(on_disk, radius * torch.sqrt(torch.rand(size, generator=rng)), torch.full((size,), radius))
+    theta = 2 * np.pi * torch.rand(size, generator=rng)
+    h = height * (torch.rand(size, generator=rng) - 0.5)
+    h = torch.where(on_disk, torch.where(part == 1, -0.5 * height, 0.5 * height), h)
+    x0, y0, z0 = center
+    return x0 + r * torch.cos(theta), y0 + r * torch.sin(theta), z0 + h
+
+
+def _check_3d_method(method):
+    if method not in ('volume', 'surface'):
+        raise ValueError(f'Unknown method: {method}')
+
+
+class GeneratorBox3D(BaseGenerator):
+    """A generator for generating points uniformly in (or on the surface of) an axis-aligned box.
+    Exactly ``size`` points are generated every time; no rejection sampling is involved.
+
+    :param size: The number of points to generate each time `get_examples` is called.
+    :type size: int
+    :param xyz_min: The lower bound of the box on the x, y and z dimension, defaults to (0.0, 0.0, 0.0).
+    :type xyz_min: tuple[float, float, float], optional
+    :param xyz_max: The upper bound of the box on the x, y and z dimension, defaults to (1.0, 1.0, 1.0).
+    :type xyz_max: tuple[float, float, float], optional
+    :param method: If set to 'volume', the points are uniformly distributed in the box.
+        If set to 'surface', the points are uniformly distributed on the 6 faces of the box;
+        faces are chosen with probability proportional to their areas. Defaults to 'volume'.
+    :type method: str, optional
+    :raises ValueError: When provided with an unknown method.
+    """
+
+    def __init__(self, size, xyz_min=(0.0, 0.0, 0.0), xyz_max=(1.0, 1.0, 1.0), method='volume'):
+        super(GeneratorBox3D, self).__init__()
+        _check_3d_method(method)
+        self.size = size
+        self.xyz_min, self.xyz_max = tuple(xyz_min), tuple(xyz_max)
+        self.method = method
+
+    def get_examples(self):
+        sampler = _sample_box_volume if self.method == 'volume' else _sample_box_surface
+        return tuple(c.requires_grad_(True) for c in sampler(self.size, self.xyz_min, self.xyz_max))
+
+
+class GeneratorBall3D(BaseGenerator):
+    """A generator for generating points uniformly in (or on the surface of) a ball.
+    Exactly ``size`` points are generated every time; no rejection sampling is involved.
+
+    :param size: The number of points to generate each time `get_examples` is called.
+    :type size: int
+    :param center: The center of the ball, defaults to (0.0, 0.0, 0.0).
+    :type center: tuple[float, float, float], optional
+    :param radius: The radius of the ball, defaults to 1.0.
+    :type radius: float, optional
+    :param method: If set to 'volume', the points are uniformly distributed in the ball.
+        If set to 'surface', the points are uniformly distributed on the sphere. Defaults to 'volume'.
+    :type method: str, optional
+    :raises ValueError: When provided with an unknown method.
+    """
+
+    def __init__(self, size, center=(0.0, 0.0, 0.0), radius=1.0, method='volume'):
+        super(GeneratorBall3D, self).__init__()
+        _check_3d_method(method)
+        self.size = size
+        self.center, self.radius = tuple(center), radius
+        self.method = method
+
+    def get_examples(self):
+        sampler = _sample_ball_volume if self.method == 'volume' else _sample_ball_surface
+        return tuple(c.requires_grad_(True) for c in sampler(self.size, self.center, self.radius))
+
+
+class GeneratorCylinder3D(BaseGenerator):
+    """A generator for generating points uniformly in (or on the surface of) a cylinder whose axis is parallel to z.
+    Exactly ``size`` points are generated every time; no rejection sampling is involved.
+
+    :param size: The number of points to generate each time `get_examples` is called.
+    :type size: int
+    :param center: The center of the cylinder (midpoint of its axis), defaults to (0.0, 0.0, 0.0).
+    :type center: tuple[float, float, float], optional
+    :param radius: The radius of the cylinder, defaults to 1.0.
+    :type radius: float, optional
+    :param height: The height of the cylinder, defaults to 1.0.
+    :type height: float, optional
+    :param method: If set to 'volume', the points are uniformly distributed in the cylinder.
+        If set to 'surface', the points are uniformly distributed on the lateral surface and the two disks;
+        each part is chosen with probability proportional to its area. Defaults to 'volume'.
+    :type method: str, optional
+    :raises ValueError: When provided with an unknown method.
+    """
+
+    def __init__(self, size, center=(0.0, 0.0, 0.0), radius=1.0, height=1.0, method='volume'):
+        super(GeneratorCylinder3D, self).__init__()
+        _check_3d_method(method)
+        self.size = size
+        self.center, self.radius, self.height = tuple(center), radius, height
+        self.method = method
+
+    def get_examples(self):
+        sampler = _sample_cylinder_volume if self.method == 'volume' else _sample_cylinder_surface
+        return tuple(c.requires_grad_(True) for c in sampler(self.size, self.center, self.radius, self.height))
+
+
+class ParameterGenerator(BaseGenerator):
+    """A generator for sampling the parameters of a parametric family of problems (e.g., coefficients or boundary
+    values), one value of each parameter for every point, so that a single network learns the solutions of the whole
+    family. Combine it with a generator of coordinates using the `*` operator,
+    e.g., ``Generator1D(32, 0.0, 1.0) * ParameterGenerator(32, 0.5, 2.0)``, which yields :math:`t` followed by the
+    parameter.
+
+    :param size: The number of points to generate each time `get_examples` is called.
+    :type size: int
+    :param param_min: The lower bound(s) of the parameter(s).
+    :type param_min: float or tuple[float]
+    :param param_max: The upper bound(s) of the parameter(s).
+    :type param_max: float or tuple[float]
+    :param method: If set to 'uniform', the parameters are drawn independently from uniform distributions.
+        If set to 'latin-hypercube', the range of each parameter is split into `size` equal strata, one value is drawn
+        from each stratum, and the values of different parameters are paired at random;
+        this covers the parameter space more evenly. Defaults to 'uniform'.
+    :type method: str, optional
+    :raises ValueError: When provided with an unknown method or bounds of different lengths.
+    """
+
+    def __init__(self, size, param_min, param_max, method='uniform'):
+        super(ParameterGenerator, self).__init__()
+        if method not in ('uniform', 'latin-hypercube'):
+            raise ValueError(f'Unknown method: {method}')
+        param_min = tuple(param_min) if isinstance(param_min, (list, tuple)) else (param_min,)
+        param_max = tuple(param_max) if isinstance(param_max, (list, tuple)) else (param_max,)
+        if len(param_min) != len(param_max):
+            raise ValueError(f"param_min ({len(param_min)} values) and param_max ({len(param_max)} values) "
+                             f"differ in length")
+        self.size = size
+        self.n_params = len(param_min)
+        self.param_min, self.param_max = param_min, param_max
+        self.method = method
+
+    def get_examples(self):
+        lo = torch.tensor(self.param_min, dtype=torch.get_default_dtype())
+        hi = torch.tensor(self.param_max, dtype=torch.get_default_dtype())
+        u = torch.rand(self.size, self.n_params)
+        if self.method == 'latin-hypercube':
+            strata = torch.stack([torch.randperm(self.size) for _ in range(self.n_params)], dim=1)
+            u = (strata + u) / self.size
+        p = lo + (hi - lo) * u
+        params = tuple(p[:, i].requires_grad_(True) for i in range(self.n_params))
+        return params[0] if self.n_params == 1 else params
+
+
+class InputFunctionGenerator(BaseGenerator):
+    """A generator for operator learning (see ``neurodiffeq.networks.DeepONet``), which samples random input functions
+    (e.g., initial or boundary data) in a discretized form, such as their values at fixed sensor points or their
+    coefficients in some basis. Every time `get_examples` is called, `n_functions` functions are sampled, each shared
+    by `size // n_functions` consecutive points. Combine it with a generator of coordinates using the `*` operator,
+    e.g., ``Generator2D((16, 16), method='equally-spaced-noisy') * InputFunctionGenerator(256, 8, sampler)``,
+    which yields the coordinates followed by the discretized data of the function each point belongs to;
+    the solvers then handle the data as the parameters of a parametric problem.
+
+    :param size: The number of points to generate each time `get_examples` is called.
+    :type size: int
+    :param n_functions: The number of functions to sample each time `get_examples` is called;
+        must divide `size`.
+    :type n_functions: int
+    :param sampler: A function mapping a number of functions `n` to their discretized values,
+        a tensor of shape (n, n_sensors).
+    :type sampler: callable
+    :raises ValueError: When `n_functions` doesn't divide `size`.
+    """
+
+    def __init__(self, size, n_functions, sampler):
+        super(InputFunctionGenerator, self).__init__()
+        if size % n_functions != 0:
+            raise ValueError(f"n_functions ({n_functions}) doesn't divide size ({size})")
+        self.size = size
+        self.n_functions = n_functions
+        self.sampler = sampler
+
+    def get_examples(self):
+        data = self.sampler(self.n_functions).repeat_interleave(self.size // self.n_functions, dim=0)
+        data = tuple(data[:, i] for i in range(data.shape[1]))
+        return data[0] if len(data) == 1 else data
+
+
 class ConcatGenerator(BaseGenerator):
     r"""An concatenated generator for sampling points, whose `get_examples` method returns the concatenated vector of the samples returned by its sub-generators.
         Not to be confused with EnsembleGenerator which returns all the samples of its sub-generators
@@ -443,15 +680,30 @@ class FilterGenerator(BaseGenerator):
 class ResampleGenerator(BaseGenerator):
     """A generator whose output is shuffled and resampled every time
 
+    By default, the sub-generator is called every time and its whole output is used as the candidate pool.
+    When ``refresh_every`` or ``refresh_fraction`` is specified, the generator works in *pooled mode* instead:
+    a candidate pool is cached and each call only draws indices from it,
+    so that a large pool can be used for small batches without regenerating the pool every time.
+
     :param generator: a generator used to generate samples to be shuffled and resampled
     :type generator: BaseGenerator
     :param size: size of the shuffled output, defaults to the size of `generator`
     :type size: int
     :param replacement: whether to sample with replacement or not; defaults to False
     :type replacement: bool
+    :param refresh_every: (pooled mode) regenerate the whole pool every `refresh_every` calls; defaults to None
+    :type refresh_every: int
+    :param refresh_fraction: (pooled mode) replace this fraction of the pool with fresh samples every call;
+        fresh samples are taken from a reserve pool, which is regenerated only when used up, and each of them replaces
+        the sample at the same position of the pool; defaults to None
+    :type refresh_fraction: float
+    :param stratify: (pooled mode) split the pool into `size` contiguous strata and draw one index from each,
+        which is useful when the sub-generator returns ordered samples (e.g. on a grid); defaults to False
+    :type stratify: bool
     """
 
-    def __init__(self, generator, size=None, replacement=False):
+    def __init__(self, generator, size=None, replacement=False, refresh_every=None, refresh_fraction=None,
+                 stratify=False):
         super(ResampleGenerator, self).__init__()
         self.generator = generator
         if size is None:
@@ -460,7 +712,68 @@ class ResampleGenerator(BaseGenerator):
             self.size = size
         self.replacement = replacement
 
+        if refresh_every is not None and refresh_every < 1:
+            raise ValueError(f"`refresh_every` must be a positive integer, got {refresh_every}")
+        if refresh_fraction is not None and not 0 < refresh_fraction <= 1:
+            raise ValueError(f"`refresh_fraction` must be in (0, 1], got {refresh_fraction}")
+        self.refresh_every = refresh_every
+        self.refresh_fraction = refresh_fraction
+        self.pooled = refresh_every is not None or refresh_fraction is not None
+        if stratify and not self.pooled:
+            raise ValueError("`stratify` requires pooled mode; specify `refresh_every` or `refresh_fraction`")
+        self.stratify = stratify
+
+        self.pool = None
+        self.reserve = None
+        self.reserve_positions = None
+        self.requires_grad = None
+        self.n_calls = 0
+
+    def _generate(self):
+        xs = self.generator.get_examples()
+        if isinstance(xs, torch.Tensor):
+            xs = [xs]
+        self.requires_grad = [x.requires_grad for x in xs]
+        return [x.detach() for x in xs]
+
+    def _refresh_pool(self):
+        if self.pool is None or (self.refresh_every is not None and self.n_calls % self.refresh_every == 0):
+            self.pool = self._generate()
+            return
+        if self.refresh_fraction is None:
+            return
+
+        pool_size = len(self.pool[0])
+        n_fresh = max(1, int(round(self.refresh_fraction * pool_size)))
+        # a fresh sample replaces the sample at its own position in the reserve pool,
+        # so that the order of the samples (and hence the strata) is kept
+        n_replaced = 0
+        while n_replaced < n_fresh:
+            if self.reserve is None or len(self.reserve_positions) == 0:
+                self.reserve = self._generate()
+                self.reserve_positions = torch.randperm(min(pool_size, len(self.reserve[0])))
+            replaced = self.reserve_positions[:n_fresh - n_replaced]
+            self.reserve_positions = self.reserve_positions[len(replaced):]
+            self.pool = [p.index_copy(0, replaced, r[replaced]) for p, r in zip(self.pool, self.reserve)]
+            n_replaced += len(replaced)
+
+    def _pooled_indices(self, pool_size):
+        if self.stratify:
+            bounds = torch.linspace(0, pool_size, self.size + 1)
+            lo, hi = bounds[:-1], bounds[1:]
+            return (lo + torch.rand(self.size) * (hi - lo)).long().clamp(max=pool_size - 1)
+        if self.replacement:
+            return torch.randint(pool_size, (self.size,))
+        return torch.randperm(pool_size)[:self.size]
+
     def get_examples(self):
+        if self.pooled:
+            self._refresh_pool()
+            self.n_calls += 1
+            indices = self._pooled_indices(len(self.pool[0]))
+            xs = [x[indices].requires_grad_(rg) for x, rg in zip(self.pool, self.requires_grad)]
+            return xs[0] if len(xs) == 1 else xs
+
         if self.replacement:
             indices = torch.randint(self.generator.size, (self.size,))
         else:
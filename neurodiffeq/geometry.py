@@ -0,0 +1,449 @@
+"""This module contains 2-D polygons and 3-D triangle meshes that describe irregular domains,
+and tools to sample points in (or on the boundary of) them
+"""
+import struct
+import numpy as np
+import torch
+from .generators import BaseGenerator
+from .conditions import IrregularBoundaryCondition, NoCondition
+
+# maximum number of (point, edge/face) pairs processed at once by the vectorized containment tests
+_CHUNK_PAIRS = 2 ** 22
+# maximum number of batches of candidates drawn by rejection sampling before giving up
+_MAX_REJECTION_ROUNDS = 100
+
+
+def _as_tensor(x):
+    return torch.as_tensor(x, dtype=torch.get_default_dtype())
+
+
+def _as_coordinates(coordinates):
+    # accepts tensors or numpy arrays of any shape; returns flattened tensors and the original shape
+    shape = np.shape(coordinates[0])
+    return [_as_tensor(np.asarray(c) if not isinstance(c, torch.Tensor) else c.detach()).reshape(-1)
+            for c in coordinates], shape
+
+
+def _chunked(points, n_elements, fn):
+    # apply `fn` on chunks of `points` so that at most `_CHUNK_PAIRS` (point, element) pairs are materialized
+    chunk_size = max(1, _CHUNK_PAIRS // max(n_elements, 1))
+    return torch.cat([fn(points[i:i + chunk_size]) for i in range(0, len(points), chunk_size)])
+
+
+class BaseGeometry:
+    """Base class for all geometries; Children classes must implement ``.contains``, ``.sample_interior``
+    and ``.sample_boundary`` and have a ``.dim`` field
+    """
+
+    def __init__(self):
+        self.dim = None
+
+    def contains(self, *coordinates):
+        r"""Test whether the points lie within the geometry.
+
+        :param coordinates: Coordinates of the points, each a 1-D tensor.
+        :type coordinates: `torch.Tensor`
+        :return: Whether each point lies within the geometry.
+        :rtype: `torch.Tensor`
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    def sample_interior(self, size, rng=None):
+        r"""Sample points uniformly (w.r.t. area or volume) in the interior.
+
+        :param size: Number of points to sample.
+        :type size: int
+        :param rng: The random number generator to use, defaults to the global one.
+        :type rng: `torch.Generator`, optional
+        :return: Coordinates of the sampled points, each a 1-D tensor of length ``size``.
+        :rtype: tuple[`torch.Tensor`]
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    def sample_boundary(self, size, rng=None):
+        r"""Sample points uniformly (w.r.t. length or area) on the boundary, together with the outward unit normals.
+
+        :param size: Number of points to sample.
+        :type size: int
+        :param rng: The random number generator to use, defaults to the global one.
+        :type rng: `torch.Generator`, optional
+        :return: Coordinates of the sampled points followed by the components of their normals,
+            each a 1-D tensor of length ``size``.
+        :rtype: tuple[`torch.Tensor`]
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    def in_domain(self, *coordinates):
+        r"""Given the coordinates (numpy.ndarray or torch.Tensor), return a boolean array indicating
+        whether the points lie within the domain. The signature is the same as
+        ``neurodiffeq.conditions.IrregularBoundaryCondition.in_domain``.
+
+        :param coordinates: Coordinates of the points.
+        :type coordinates: `numpy.ndarray` or `torch.Tensor`
+        :return: Whether each point lies within the domain, with the same shape as the coordinates.
+        :rtype: `numpy.ndarray`
+        """
+        flat, shape = _as_coordinates(coordinates)
+        return self.contains(*flat).cpu().numpy().reshape(shape)
+
+    def filter_fn(self, xs):
+        r"""A filter to be used with ``neurodiffeq.generators.FilterGenerator``.
+
+        :param xs: Coordinates of the points.
+        :type xs: list[`torch.Tensor`]
+        :return: A mask indicating whether each point lies within the domain.
+        :rtype: `torch.Tensor`
+        """
+        flat, shape = _as_coordinates(xs)
+        return self.contains(*flat).reshape(shape)
+
+
+class Polygon(BaseGeometry):
+    r"""A simple (i.e. non-self-intersecting) 2-D polygon.
+
+    :param vertices: Vertices of the polygon, in clockwise or counter-clockwise order, with shape (n_vertices, 2).
+        The last vertex must not repeat the first one.
+    :type vertices: array-like
+    """
+
+    def __init__(self, vertices):
+        super(Polygon, self).__init__()
+        self.dim = 2
+        vertices = _as_tensor(np.asarray(vertices, dtype=np.float64))
+        if vertices.ndim != 2 or vertices.shape[1] != 2 or len(vertices) < 3:
+            raise ValueError(f"Vertices must have shape (n_vertices >= 3, 2), got {tuple(vertices.shape)}")
+        # make the orientation counter-clockwise, so that the outward normal of edge (dx, dy) is (dy, -dx)
+        if self._signed_area(vertices) < 0:
+            vertices = vertices.flip(0)
+        self.vertices = vertices
+        self.edge_starts = vertices
+        self.edge_ends = vertices.roll(-1, dims=0)
+        edges = self.edge_ends - self.edge_starts
+        self.edge_lengths = edges.norm(dim=1)
+        self.edge_normals = torch.stack([edges[:, 1], -edges[:, 0]], dim=1) / self.edge_lengths.view(-1, 1)
+        self.triangles = self._triangulate(vertices.numpy())
+        a, b, c = (vertices[self.triangles[:, i]] for i in range(3))
+        self.triangle_areas = 0.5 * ((b - a)[:, 0] * (c - a)[:, 1] - (b - a)[:, 1] * (c - a)[:, 0])
+        self.area = float(self.triangle_areas.sum())
+        self.perimeter = float(self.edge_lengths.sum())
+
+    @staticmethod
+    def _signed_area(vertices):
+        x, y = vertices[:, 0], vertices[:, 1]
+        return 0.5 * float((x * y.roll(-1) - x.roll(-1) * y).sum())
+
+    @staticmethod
+    def _triangulate(vertices):
+        # ear clipping for a counter-clockwise simple polygon
+        def cross(o, a, b):
+            return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+        remaining = list(range(len(vertices)))
+        triangles = []
+        while len(remaining) > 3:
+            n = len(remaining)
+            for k in range(n):
+                i, j, l = remaining[k - 1], remaining[k], remaining[(k + 1) % n]
+                a, b, c = vertices[i], vertices[j], vertices[l]
+                if cross(a, b, c) <= 0:
+                    continue
+                others = vertices[[m for m in remaining if m not in (i, j, l)]]
+                inside = (
+                    (cross(a, b, others.T) >= 0) & (cross(b, c, others.T) >= 0) & (cross(c, a, others.T) >= 0)
+                )
+                if not inside.any():
+                    triangles.append((i, j, l))
+                    del remaining[k]
+                    break
+            else:
+                raise ValueError("Failed to triangulate the polygon; is it simple (non-self-intersecting)?")
+        triangles.append(tuple(remaining))
+        return torch.tensor(triangles, dtype=torch.long)
+
+    def winding_number(self, x, y):
+        r"""Compute the winding number of the polygon around each point.
+
+        :param x: The x-coordinates of the points, a 1-D tensor.
+        :type x: `torch.Tensor`
+        :param y: The y-coordinates of the points, a 1-D tensor.
+        :type y: `torch.Tensor`
+        :return: The winding numbers (non-zero inside, zero outside).
+        :rtype: `torch.Tensor`
+        """
+        a, b = self.edge_starts, self.edge_ends
+
+        def _winding_number(p):
+            px, py = p[:, 0:1], p[:, 1:2]
+            is_left = (b[:, 0] - a[:, 0]) * (py - a[:, 1]) - (px - a[:, 0]) * (b[:, 1] - a[:, 1])
+            upward = (a[:, 1] <= py) & (b[:, 1] > py) & (is_left > 0)
+            downward = (a[:, 1] > py) & (b[:, 1] <= py) & (is_left < 0)
+            return upward.sum(dim=1) - downward.sum(dim=1)
+
+        points = torch.stack([_as_tensor(x).detach(), _as_tensor(y).detach()], dim=1)
+        return _chunked(points, len(a), _winding_number)
+
+    def contains(self, x, y):
+        r"""Test whether the points lie within the polygon using the crossing-number (even-odd) rule.
+
+        :param x: The x-coordinates of the points, a 1-D tensor.
+        :type x: `torch.Tensor`
+        :param y: The y-coordinates of the points, a 1-D tensor.
+        :type y: `torch.Tensor`
+        :return: Whether each point lies within the polygon.
+        :rtype: `torch.Tensor`
+        """
+        a, b = self.edge_starts, self.edge_ends
+
+        def _crossing_parity(p):
+            px, py = p[:, 0:1], p[:, 1:2]
+            straddle = (a[:, 1] > py) != (b[:, 1] > py)
+            x_cross = a[:, 0] + (py - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+            crossings = (straddle & (px < x_cross)).sum(dim=1)
+            return crossings % 2 == 1
+
+        points = torch.stack([_as_tensor(x).detach(), _as_tensor(y).detach()], dim=1)
+        return _chunked(points, len(a), _crossing_parity)
+
+    def sample_interior(self, size, rng=None):
+        tri = torch.multinomial(self.triangle_areas, size, replacement=True, generator=rng)
+        a, b, c = (self.vertices[self.triangles[tri, i]] for i in range(3))
+        u, v = torch.rand(2, size, 1, generator=rng)
+        # reflect points in the other half of the parallelogram back into the triangle
+        flip = (u + v) > 1
+        u, v = torch.where(flip, 1 - u, u), torch.where(flip, 1 - v, v)
+        p = a + u * (b - a) + v * (c - a)
+        return p[:, 0], p[:, 1]
+
+    def sample_boundary(self, size, rng=None):
+        edge = torch.multinomial(self.edge_lengths, size, replacement=True, generator=rng)
+        s = torch.rand(size, 1, generator=rng)
+        p = self.edge_starts[edge] + s * (self.edge_ends[edge] - self.edge_starts[edge])
+        n = self.edge_normals[edge]
+        return p[:, 0], p[:, 1], n[:, 0], n[:, 1]
+
+
+class TriangleMesh(BaseGeometry):
+    r"""A closed, consistently oriented 3-D triangle mesh.
+
+    :param vertices: Vertices of the mesh, with shape (n_vertices, 3).
+    :type vertices: array-like
+    :param faces: Indices of the vertices of each triangle, with shape (n_faces, 3).
+    :type faces: array-like
+    """
+
+    def __init__(self, vertices, faces):
+        super(TriangleMesh, self).__init__()
+        self.dim = 3
+        self.vertices = _as_tensor(np.asarray(vertices, dtype=np.float64))
+        faces = torch.as_tensor(np.asarray(faces, dtype=np.int64))
+        if self.vertices.ndim != 2 or self.vertices.shape[1] != 3:
+            raise ValueError(f"Vertices must have shape (n_vertices, 3), got {tuple(self.vertices.shape)}")
+        if faces.ndim != 2 or faces.shape[1] != 3:
+            raise ValueError(f"Faces must have shape (n_faces, 3), got {tuple(faces.shape)}")
+
+        a, b, c = (self.vertices[faces[:, i]] for i in range(3))
+        signed_volume = float((a * torch.cross(b, c, dim=1)).sum()) / 6
+        # make the orientation such that face normals point outward
+        if signed_volume < 0:
+            faces = faces[:, [0, 2, 1]]
+            b, c = c, b
+        self.faces = faces
+        self.volume = abs(signed_volume)
+        cross = torch.cross(b - a, c - a, dim=1)
+        self.face_areas = 0.5 * cross.norm(dim=1)
+        self.face_normals = cross / cross.norm(dim=1, keepdim=True)
+        self.area = float(self.face_areas.sum())
+        self.bounds = (self.vertices.min(dim=0).values, self.vertices.max(dim=0).values)
+
+    @classmethod
+    def from_file(cls, path):
+        r"""Load a mesh from an OBJ or STL (ASCII or binary) file, depending on the file extension.
+
+        :param path: Path to the file.
+        :type path: str
+        :rtype: `neurodiffeq.geometry.TriangleMesh`
+        """
+        path = str(path)
+        if path.lower().endswith('.obj'):
+            return cls.from_obj(path)
+        if path.lower().endswith('.stl'):
+            return cls.from_stl(path)
+        raise ValueError(f"Unknown mesh format: {path}")
+
+    @classmethod
+    def from_obj(cls, path):
+        r"""Load a mesh from a Wavefront OBJ file. Polygonal faces are triangulated as fans.
+
+        :param path: Path to the file.
+        :type path: str
+        :rtype: `neurodiffeq.geometry.TriangleMesh`
+        """
+        vertices, faces = [], []
+        with open(path) as f:
+            for line in f:
+                tokens = line.split()
+                if not tokens:
+                    continue
+                if tokens[0] == 'v':
+                    vertices.append([float(t) for t in tokens[1:4]])
+                elif tokens[0] == 'f':
+                    # entries look like `v`, `v/vt`, `v//vn` or `v/vt/vn`; indices are 1-based or negative
+                    idx = [int(t.split('/')[0]) for t in tokens[1:]]
+                    idx = [i - 1 if i > 0 else len(vertices) + i for i in idx]
+                    faces.extend([idx[0], idx[k], idx[k + 1]] for k in range(1, len(idx) - 1))
+        return cls(vertices, faces)
+
+    @classmethod
+    def from_stl(cls, path):
+        r"""Load a mesh from an ASCII or binary STL file. Duplicate vertices are merged.
+
+        :param path: Path to the file.
+        :type path: str
+        :rtype: `neurodiffeq.geometry.TriangleMesh`
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        n_faces = struct.unpack('<I', data[80:84])[0] if len(data) >= 84 else -1
+        if len(data) == 84 + 50 * n_faces:
+            record = np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)), ('attr', '<u2')])
+            corners = np.frombuffer(data, dtype=record, count=n_faces, offset=84)['vertices'].reshape(-1, 3)
+        else:
+            corners = np.array([
+                [float(t) for t in line.split()[1:4]]
+                for line in data.decode().splitlines() if line.strip().startswith('vertex')
+            ]).reshape(-1, 3)
+        vertices, inverse = np.unique(corners.astype(np.float64), axis=0, return_inverse=True)
+        return cls(vertices, inverse.reshape(-1, 3))
+
+    def winding_number(self, x, y, z):
+        r"""Compute the generalized winding number of the mesh around each point,
+        i.e. the sum of solid angles subtended by the triangles divided by :math:`4\pi`.
+
+        :param x: The x-coordinates of the points, a 1-D tensor.
+        :type x: `torch.Tensor`
+        :param y: The y-coordinates of the points, a 1-D tensor.
+        :type y: `torch.Tensor`
+        :param z: The z-coordinates of the points, a 1-D tensor.
+        :type z: `torch.Tensor`
+        :return: The winding numbers (close to 1 inside, close to 0 outside).
+        :rtype: `torch.Tensor`
+        """
+        va, vb, vc = (self.vertices[self.faces[:, i]] for i in range(3))
+
+        def _winding_number(p):
+            a, b, c = va - p[:, None], vb - p[:, None], vc - p[:, None]
+            la, lb, lc = a.norm(dim=2), b.norm(dim=2), c.norm(dim=2)
+            numerator = (a * torch.cross(b, c, dim=2)).sum(dim=2)
+            denominator = la * lb * lc + (a * b).sum(dim=2) * lc + (b * c).sum(dim=2) * la + (c * a).sum(dim=2) * lb
+            return torch.atan2(numerator, denominator).sum(dim=1) / (2 * np.pi)
+
+        points = torch.stack([_as_tensor(x).detach(), _as_tensor(y).detach(), _as_tensor(z).detach()], dim=1)
+        return _chunked(points, len(self.faces), _winding_number)
+
+    def contains(self, x, y, z):
+        r"""Test whether the points lie within the mesh using the generalized winding number.
+
+        :param x: The x-coordinates of the points, a 1-D tensor.
+        :type x: `torch.Tensor`
+        :param y: The y-coordinates of the points, a 1-D tensor.
+        :type y: `torch.Tensor`
+        :param z: The z-coordinates of the points, a 1-D tensor.
+        :type z: `torch.Tensor`
+        :return: Whether each point lies within the mesh.
+        :rtype: `torch.Tensor`
+        """
+        return self.winding_number(x, y, z) > 0.5
+
+    def sample_interior(self, size, rng=None):
+        lo, hi = self.bounds
+        acceptance = max(self.volume / float((hi - lo).prod()), 1e-3)
+        accepted = []
+        n_accepted = 0
+        for _ in range(_MAX_REJECTION_ROUNDS):
+            if n_accepted >= size:
+                break
+            # oversample a little, so that a single batch is usually enough
+            n_candidates = int(1.2 * (size - n_accepted) / acceptance) + 16
+            p = lo + (hi - lo) * torch.rand(n_candidates, 3, generator=rng)
+            p = p[self.contains(p[:, 0], p[:, 1], p[:, 2])]
+            accepted.append(p)
+            n_accepted += len(p)
+        else:
+            if n_accepted < size:
+                raise ValueError(
+                    f"Only {n_accepted} of {size} points were found inside the mesh after {_MAX_REJECTION_ROUNDS} "
+                    f"rounds of rejection sampling; the mesh is probably open, degenerate or inconsistently oriented"
+                )
+        p = torch.cat(accepted)[:size]
+        return p[:, 0], p[:, 1], p[:, 2]
+
+    def sample_boundary(self, size, rng=None):
+        face = torch.multinomial(self.face_areas, size, replacement=True, generator=rng)
+        a, b, c = (self.vertices[self.faces[face, i]] for i in range(3))
+        u, v = torch.rand(2, size, 1, generator=rng)
+        flip = (u + v) > 1
+        u, v = torch.where(flip, 1 - u, u), torch.where(flip, 1 - v, v)
+        p = a + u * (b - a) + v * (c - a)
+        n = self.face_normals[face]
+        return p[:, 0], p[:, 1], p[:, 2], n[:, 0], n[:, 1], n[:, 2]
+
+
+class GeometryGenerator(BaseGenerator):
+    r"""A generator that samples points in (or on the boundary of) a geometry.
+    Exactly ``size`` points are generated every time.
+
+    :param geometry: The geometry to sample from.
+    :type geometry: `neurodiffeq.geometry.Polygon` or `neurodiffeq.geometry.TriangleMesh`
+    :param size: The number of points to generate each time `get_examples` is called.
+    :type size: int
+    :param method: If set to 'interior', points are sampled uniformly in the interior.
+        If set to 'boundary', points are sampled uniformly on the boundary. Defaults to 'interior'.
+    :type method: str, optional
+    :param with_normals: Whether to also return the components of the outward unit normals
+        (only for ``method='boundary'``). The normals don't require gradient. Defaults to False.
+    :type with_normals: bool, optional
+    :raises ValueError: When provided with an unknown method.
+    """
+
+    def __init__(self, geometry, size, method='interior', with_normals=False):
+        super(GeometryGenerator, self).__init__()
+        if method not in ('interior', 'boundary'):
+            raise ValueError(f'Unknown method: {method}')
+        if with_normals and method != 'boundary':
+            raise ValueError("Normals are only available when `method='boundary'`")
+        self.geometry = geometry
+        self.size = size
+        self.method = method
+        self.with_normals = with_normals
+
+    def get_examples(self):
+        if self.method == 'interior':
+            return tuple(c.requires_grad_(True) for c in self.geometry.sample_interior(self.size))
+        examples = self.geometry.sample_boundary(self.size)
+        coordinates = tuple(c.requires_grad_(True) for c in examples[:self.geometry.dim])
+        if self.with_normals:
+            return coordinates + tuple(examples[self.geometry.dim:])
+        return coordinates
+
+
+class GeometryCondition(IrregularBoundaryCondition):
+    r"""A condition that re-parameterizes network outputs with a given condition,
+    and whose ``in_domain`` is given by a geometry (e.g. for monitors to mask out points outside an irregular domain).
+
+    :param geometry: The geometry that describes the domain.
+    :type geometry: `neurodiffeq.geometry.Polygon` or `neurodiffeq.geometry.TriangleMesh`
+    :param condition: The condition used to re-parameterize network outputs. Defaults to a ``NoCondition``.
+        Its ``.enforce`` method must not be overridden.
+    :type condition: `neurodiffeq.conditions.BaseCondition`, optional
+    """
+
+    def __init__(self, geometry, condition=None):
+        super(GeometryCondition, self).__init__()
+        self.geometry = geometry
+        self.condition = condition if condition is not None else NoCondition()
+
+    def parameterize(self, output_tensor, *input_tensors):
+        return self.condition.parameterize(output_tensor, *input_tensors)
+
+    def in_domain(self, *coordinates):
+        return self.geometry.in_domain(*coordinates)
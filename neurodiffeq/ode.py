@@ -1,29 +1,31 @@
+import os
+import warnings
+import dill
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 
 import torch
 import torch.nn as nn
-import torch.optim as optim
 
 from .networks import FCNN
 from .generators import Generator1D
 from ._version_utils import warn_deprecate_class
 from .conditions import NoCondition, IVP, DirichletBVP
+from .conditions import _enforce_on_single_net
+from .solvers import Solver1D, _residual_criterion, _column_residuals, _broadcast_inputs
 from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
 
 ExampleGenerator = warn_deprecate_class(Generator1D)
 
 
-def _trial_solution(single_net, nets, ts, conditions):
-    if single_net:  # using a single net
-        us = [
-            con.enforce(single_net, ts)
-            for con in conditions
-        ]
+def _trial_solution(single_net, nets, ts, conditions, params=()):
+    if single_net:  # using a single net, whose forward pass is shared by all conditions
+        us = _enforce_on_single_net(single_net, conditions, ts, *params)
     else:  # using multiple nets
         us = [
-            con.enforce(net, ts)
+            con.enforce(net, ts, *params)
             for con, net in zip(conditions, nets)
         ]
     return us
@@ -108,7 +110,8 @@ def solve(
         optimizer=None, criterion=None, additional_loss_term=None, metrics=None, batch_size=16,
         max_epochs=1000,
         monitor=None, return_internal=False,
-        return_best=False
+        return_best=False, exact_epoch_loss=False, compile=False, callbacks=None,
+        time_budget=None,
 ):
     r"""Train a neural network to solve an ODE.
 
@@ -148,6 +151,21 @@ def solve(
     :type return_internal: bool, optional
     :param return_best: Whether to return the nets that achieved the lowest validation loss, defaults to False.
     :type return_best: bool, optional
+    :param exact_epoch_loss: Whether to evaluate the training loss and metrics on all training points again after each epoch,
+        instead of recording the sample-weighted average of the mini-batch losses and metrics, defaults to False.
+    :type exact_epoch_loss: bool, optional
+    :param compile: Whether to compile the computation of the loss with `torch.compile`, falling back to eager execution
+        if compilation fails, defaults to False.
+    :type compile: bool, optional
+    :param callbacks: Callbacks run after every epoch, each a function `cb(solver)` accepting the underlying solver
+        (e.g., `neurodiffeq.solvers.EarlyStoppingCallback`), which can stop the training by setting
+        `solver._stop_training` to True, defaults to None.
+    :type callbacks: list[callable], optional
+    :param time_budget: If specified, the wall-clock budget of the training, in seconds; the training stops after an
+        epoch if the next one is predicted not to fit in the budget (see `neurodiffeq.solvers.BaseSolver.fit`),
+        and the nets that achieved the lowest validation loss are returned regardless of `return_best`.
+        Defaults to None.
+    :type time_budget: float, optional
     :return: The solution of the ODE. The history of training loss and validation loss.
         Optionally, the nets, conditions, training generator, validation generator, optimizer and loss function.
     :rtype: tuple[`neurodiffeq.ode.Solution`, dict]; or tuple[`neurodiffeq.ode.Solution`, dict, dict]
@@ -159,7 +177,8 @@ def solve(
         train_generator=train_generator, shuffle=shuffle, valid_generator=valid_generator,
         optimizer=optimizer, criterion=criterion, additional_loss_term=additional_loss_term, metrics=metrics, batch_size=batch_size,
         max_epochs=max_epochs, monitor=monitor, return_internal=return_internal,
-        return_best=return_best
+        return_best=return_best, exact_epoch_loss=exact_epoch_loss, compile=compile, callbacks=callbacks,
+        time_budget=time_budget,
     )
 
 
@@ -169,7 +188,8 @@ def solve_system(
         optimizer=None, criterion=None, additional_loss_term=None, metrics=None, batch_size=16,
         max_epochs=1000,
         monitor=None, return_internal=False,
-        return_best=False,
+        return_best=False, exact_epoch_loss=False, compile=False, callbacks=None,
+        time_budget=None,
 ):
     r"""Train a neural network to solve an ODE.
 
@@ -211,69 +231,26 @@ def solve_system(
     :type return_internal: bool, optional
     :param return_best: Whether to return the nets that achieved the lowest validation loss, defaults to False.
     :type return_best: bool, optional
+    :param exact_epoch_loss: Whether to evaluate the training loss and metrics on all training points again after each epoch,
+        instead of recording the sample-weighted average of the mini-batch losses and metrics, defaults to False.
+    :type exact_epoch_loss: bool, optional
+    :param compile: Whether to compile the computation of the loss with `torch.compile`, falling back to eager execution
+        if compilation fails, defaults to False.
+    :type compile: bool, optional
+    :param callbacks: Callbacks run after every epoch, each a function `cb(solver)` accepting the underlying solver
+        (e.g., `neurodiffeq.solvers.EarlyStoppingCallback`), which can stop the training by setting
+        `solver._stop_training` to True, defaults to None.
+    :type callbacks: list[callable], optional
+    :param time_budget: If specified, the wall-clock budget of the training, in seconds; the training stops after an
+        epoch if the next one is predicted not to fit in the budget (see `neurodiffeq.solvers.BaseSolver.fit`),
+        and the nets that achieved the lowest validation loss are returned regardless of `return_best`.
+        Defaults to None.
+    :type time_budget: float, optional
     :return: The solution of the ODE. The history of training loss and validation loss.
         Optionally, the nets, conditions, training generator, validation generator, optimizer and loss function.
     :rtype: tuple[`neurodiffeq.ode.Solution`, dict]; or tuple[`neurodiffeq.ode.Solution`, dict, dict]
     """
 
-    ########################################### subroutines ###########################################
-    def train(train_generator, net, nets, ode_system, conditions, criterion, additional_loss_term, shuffle, optimizer):
-        train_examples_t = train_generator.get_examples()
-        train_examples_t = train_examples_t.reshape((-1, 1))
-        n_examples_train = train_generator.size
-        idx = np.random.permutation(n_examples_train) if shuffle else np.arange(n_examples_train)
-
-        batch_start, batch_end = 0, batch_size
-        while batch_start < n_examples_train:
-            if batch_end > n_examples_train:
-                batch_end = n_examples_train
-            batch_idx = idx[batch_start:batch_end]
-            ts = train_examples_t[batch_idx]
-
-            train_loss_batch = calculate_loss(ts, net, nets, ode_system, conditions, criterion, additional_loss_term)
-
-            optimizer.zero_grad()
-            train_loss_batch.backward()
-            optimizer.step()
-
-            batch_start += batch_size
-            batch_end += batch_size
-
-        train_loss_epoch = calculate_loss(train_examples_t, net, nets, ode_system, conditions, criterion, additional_loss_term)
-        train_loss_epoch = train_loss_epoch.item()
-
-        train_metrics_epoch = calculate_metrics(train_examples_t, net, nets, conditions, metrics)
-        return train_loss_epoch, train_metrics_epoch
-
-    def valid(valid_generator, net, nets, ode_system, conditions, criterion, additional_loss_term):
-        valid_examples_t = valid_generator.get_examples()
-        valid_examples_t = valid_examples_t.reshape((-1, 1))
-        valid_loss_epoch = calculate_loss(valid_examples_t, net, nets, ode_system, conditions, criterion, additional_loss_term)
-        valid_loss_epoch = valid_loss_epoch.item()
-
-        valid_metrics_epoch = calculate_metrics(valid_examples_t, net, nets, conditions, metrics)
-        return valid_loss_epoch, valid_metrics_epoch
-
-    def calculate_loss(ts, net, nets, ode_system, conditions, criterion, additional_loss_term):
-        us = _trial_solution(net, nets, ts, conditions)
-        Futs = ode_system(*us, ts)
-        loss = sum(
-            criterion(Fut, torch.zeros_like(ts))
-            for Fut in Futs
-        )
-        if additional_loss_term is not None:
-            loss += additional_loss_term(*us, ts)
-        return loss
-
-    def calculate_metrics(ts, net, nets, conditions, metrics):
-        us = _trial_solution(net, nets, ts, conditions)
-        metrics_ = {
-            metric_name: metric_function(*us, ts).item()
-            for metric_name, metric_function in metrics.items()
-        }
-        return metrics_
-    ###################################################################################################
-
     if single_net and nets:
         raise RuntimeError('Only one of net and nets should be specified')
     # defaults to use a single neural network
@@ -284,73 +261,38 @@ def solve_system(
             hidden_units=(32, 32),
             actv=nn.Tanh,
         )
-    if single_net:
-        # mark the Conditions so that we know which condition correspond to which output unit
-        for ith, con in enumerate(conditions):
-            con.set_impose_on(ith)
-    if not train_generator:
-        if (t_min is None) or (t_max is None):
-            raise RuntimeError('Please specify t_min and t_max when train_generator is not specified')
-        train_generator = Generator1D(32, t_min, t_max, method='equally-spaced-noisy')
-    if not valid_generator:
-        if (t_min is None) or (t_max is None):
-            raise RuntimeError('Please specify t_min and t_max when train_generator is not specified')
-        valid_generator = Generator1D(32, t_min, t_max, method='equally-spaced')
-    if (not optimizer) and single_net:  # using a single net
-        optimizer = optim.Adam(single_net.parameters(), lr=0.001)
-    if (not optimizer) and nets:  # using multiple nets
-        all_parameters = []
-        for net in nets:
-            all_parameters += list(net.parameters())
-        optimizer = optim.Adam(all_parameters, lr=0.001)
     if not criterion:
         criterion = nn.MSELoss()
-    if metrics is None:
-        metrics = {}
-
-    history = {}
-    history['train_loss'] = []
-    history['valid_loss'] = []
-    for metric_name, _ in metrics.items():
-        history['train__' + metric_name] = []
-        history['valid__' + metric_name] = []
-
-    if return_best:
-        valid_loss_epoch_min = np.inf
-        solution_min = None
-
-    for epoch in range(max_epochs):
-        train_loss_epoch, train_metrics_epoch = train(train_generator, single_net, nets, ode_system, conditions, criterion, additional_loss_term, shuffle,
-                                 optimizer)
-        history['train_loss'].append(train_loss_epoch)
-        for metric_name, metric_value in train_metrics_epoch.items():
-            history['train__'+metric_name].append(metric_value)
-
-        valid_loss_epoch, valid_metrics_epoch = valid(valid_generator, single_net, nets, ode_system, conditions, criterion, additional_loss_term,)
-        history['valid_loss'].append(valid_loss_epoch)
-        for metric_name, metric_value in valid_metrics_epoch.items():
-            history['valid__'+metric_name].append(metric_value)
-
-        if monitor and epoch % monitor.check_every == 0:
-            monitor.check(single_net, nets, conditions, history)
-
-        if return_best and valid_loss_epoch < valid_loss_epoch_min:
-            valid_loss_epoch_min = valid_loss_epoch
-            solution_min = Solution(single_net, nets, conditions)
-
-    if return_best:
-        solution = solution_min
-    else:
-        solution = Solution(single_net, nets, conditions)
+
+    solver = Solver1D(
+        ode_system=_column_residuals(ode_system), conditions=conditions, t_min=t_min, t_max=t_max,
+        single_net=single_net or None, nets=nets or None,
+        train_generator=train_generator, valid_generator=valid_generator,
+        optimizer=optimizer, criterion=_residual_criterion(criterion),
+        n_batches_train=1, n_batches_valid=1, metrics=metrics,
+        additional_loss_term=additional_loss_term, batch_size=batch_size, shuffle=shuffle,
+        exact_epoch_loss=exact_epoch_loss, compile=compile,
+    )
+
+    callbacks = list(callbacks) if callbacks else []
+    if monitor:
+        def monitor_callback(solver):
+            if solver.local_epoch % monitor.check_every == 0:
+                monitor.check(single_net, nets, conditions, solver.metrics_history)
+        callbacks.append(monitor_callback)
+
+    solver.fit(max_epochs=max_epochs, callbacks=callbacks, time_budget=time_budget)
+    solution = solver.get_solution(best=return_best or time_budget is not None)
+    history = solver.metrics_history
 
     if return_internal:
         internal = {
             'single_net': single_net,
             'nets': nets,
             'conditions': conditions,
-            'train_generator': train_generator,
-            'valid_generator': valid_generator,
-            'optimizer': optimizer,
+            'train_generator': solver.generator['train'],
+            'valid_generator': solver.generator['valid'],
+            'optimizer': solver.optimizer,
             'criterion': criterion
         }
         return solution, history, internal
@@ -373,27 +315,258 @@ class Solution:
         self.nets = deepcopy(nets)
         self.conditions = deepcopy(conditions)
 
-    def __call__(self, ts, as_type='tf'):
+    def __call__(self, ts, as_type='tf', params=()):
         """Evaluate the solution at certain points.
 
         :param ts: the points on which the dependent variables are evaluated.
         :type ts: `torch.Tensor` or sequence of number
         :param as_type: Whether the returned value is a `torch.Tensor` ('tf') or `numpy.array` ('np').
         :type as_type: str
+        :param params: For parametric problems, the parameters of the member of the family to evaluate,
+            each a number or broadcastable to the shape of `ts`. Must be passed by keyword.
+        :type params: tuple or list
         :return: dependent variables are evaluated at given points.
         :rtype: list[`torch.Tensor` or `numpy.array` (when there is more than one dependent variables)
             `torch.Tensor` or `numpy.array` (when there is only one dependent variable)
         """
         if not isinstance(ts, torch.Tensor):
             ts = torch.tensor(ts)
+        params = tuple(params)
+        if params:
+            ts, *params = _broadcast_inputs(ts, *params)
         original_shape = ts.shape
         ts = ts.reshape(-1, 1)
+        params = [p.reshape(-1, 1) for p in params]
         if as_type not in ('tf', 'np'):
             raise ValueError("The valid return types are 'tf' and 'np'.")
 
-        us = _trial_solution(self.single_net, self.nets, ts, self.conditions)
+        us = _trial_solution(self.single_net, self.nets, ts, self.conditions, params)
         us = [u.reshape(original_shape) for u in us]
         if as_type == 'np':
             us = [u.detach().cpu().numpy() for u in us]
 
         return us if len(self.conditions) > 1 else us[0]
+
+
+class PiecewiseSolution:
+    r"""A solution to an ODE (system) stitched together from the solutions on consecutive subintervals of time,
+    as returned by ``neurodiffeq.ode.solve_system_parallel_in_time``.
+
+    :param solutions: The solutions on the subintervals.
+    :type solutions: list[`neurodiffeq.ode.Solution`]
+    :param t_breaks: The end points :math:`T_0 < T_1 < ... < T_K` of the :math:`K` subintervals.
+    :type t_breaks: list[float]
+    """
+    def __init__(self, solutions, t_breaks):
+        """Initializer method
+        """
+        if len(t_breaks) != len(solutions) + 1:
+            raise ValueError(f"Expected {len(solutions) + 1} break points for {len(solutions)} solutions, "
+                             f"got {len(t_breaks)}")
+        self.solutions = solutions
+        self.t_breaks = list(t_breaks)
+
+    def __call__(self, ts, as_type='tf'):
+        """Evaluate the solution at certain points.
+        Points outside :math:`[T_0, T_K]` are evaluated by the solution on the first or the last subinterval.
+
+        :param ts: the points on which the dependent variables are evaluated.
+        :type ts: `torch.Tensor` or sequence of number
+        :param as_type: Whether the returned value is a `torch.Tensor` ('tf') or `numpy.array` ('np').
+        :type as_type: str
+        :return: dependent variables are evaluated at given points.
+        :rtype: list[`torch.Tensor` or `numpy.array` (when there is more than one dependent variables)
+            `torch.Tensor` or `numpy.array` (when there is only one dependent variable)
+        """
+        if not isinstance(ts, torch.Tensor):
+            ts = torch.tensor(ts)
+        if as_type not in ('tf', 'np'):
+            raise ValueError("The valid return types are 'tf' and 'np'.")
+        original_shape = ts.shape
+        ts = ts.reshape(-1)
+        # a point on a break point T_k is evaluated by the solution starting at T_k
+        boundaries = torch.tensor(self.t_breaks[1:-1], dtype=ts.dtype, device=ts.device)
+        segment_ids = torch.bucketize(ts.detach(), boundaries, right=True)
+
+        n_vars = len(self.solutions[0].conditions)
+        us = [torch.zeros_like(ts) for _ in range(n_vars)]
+        for k, solution in enumerate(self.solutions):
+            mask = (segment_ids == k)
+            if not mask.any():
+                continue
+            segment_us = solution(ts[mask], as_type='tf')
+            if n_vars == 1:
+                segment_us = [segment_us]
+            for u, segment_u in zip(us, segment_us):
+                u[mask] = segment_u
+
+        us = [u.reshape(original_shape) for u in us]
+        if as_type == 'np':
+            us = [u.detach().cpu().numpy() for u in us]
+
+        return us if n_vars > 1 else us[0]
+
+
+def _train_subinterval(payload):
+    # run in worker processes; the payload is serialized with `dill` so that lambdas and closures can be passed
+    kwargs, n_threads = dill.loads(payload)
+    if n_threads:
+        torch.set_num_threads(n_threads)
+    return dill.dumps(solve_system(**kwargs))
+
+
+def solve_system_parallel_in_time(
+        ode_system, initial_values, t_min, t_max, n_subintervals=4,
+        coarse_propagator=None, max_iterations=None, tol=1e-4, n_workers=None,
+        single_net=None, nets=None, criterion=None, additional_loss_term=None, metrics=None, batch_size=16,
+        max_epochs=1000, return_best=False,
+):
+    r"""Train neural networks to solve a first-order initial value problem on a long time domain, in parallel in time.
+
+    :math:`[t_{min}, t_{max}]` is split into subintervals :math:`[T_k, T_{k+1}]`, each with its own networks,
+    which are trained concurrently in a pool of processes. The initial values :math:`U_k` of the subintervals are
+    coupled with the parareal iteration
+
+    .. math::
+        U_{k+1}^{j+1} = G(U_k^{j+1}) + F(U_k^j) - G(U_k^j),
+
+    where :math:`F(U_k)` is the value at :math:`T_{k+1}` of the networks trained on :math:`[T_k, T_{k+1}]` from
+    :math:`U_k` and :math:`G` is a cheap coarse propagator. Without coarse propagator, :math:`G = 0` and the initial values
+    are passed one subinterval further per iteration. In every iteration, only the subintervals whose initial values
+    changed are trained again, warm-started from the networks of the previous iteration.
+    The iteration stops once no initial value changes by more than `tol`, which happens after at most `n_subintervals`
+    iterations.
+
+    :param ode_system: The ODE system to solve, as in ``neurodiffeq.ode.solve_system``.
+        Higher-order ODEs must be rewritten as first-order systems.
+    :type ode_system: callable
+    :param initial_values: The values of the dependent variables at :math:`t_{min}`.
+    :type initial_values: list[float]
+    :param t_min: The lower bound of the domain (t) on which the ODE is solved.
+    :type t_min: float
+    :param t_max: The upper bound of the domain (t) on which the ODE is solved.
+    :type t_max: float
+    :param n_subintervals: Number of subintervals of equal length, defaults to 4.
+    :type n_subintervals: int, optional
+    :param coarse_propagator: The coarse propagator :math:`G`, a function that maps :math:`(u, t_0, t_1)` to an
+        approximation of the dependent variables at :math:`t_1` given their values :math:`u` (a list of floats)
+        at :math:`t_0`, e.g. a few steps of the explicit Euler method. Defaults to None.
+    :type coarse_propagator: callable, optional
+    :param max_iterations: The maximum number of parareal iterations, defaults to `n_subintervals`.
+    :type max_iterations: int, optional
+    :param tol: The tolerance on the change of the initial values of the subintervals, defaults to 1e-4.
+    :type tol: float, optional
+    :param n_workers: Number of worker processes, defaults to the smaller of `n_subintervals` and the number of CPUs.
+        If 0, the subintervals are trained one after another in the current process.
+    :type n_workers: int, optional
+    :param single_net: The single neural network used on every subinterval (it's copied for each subinterval).
+        Only one of `single_net` and `nets` should be specified, defaults to None
+    :type single_net: `torch.nn.Module`, optional
+    :param nets: The neural networks used on every subinterval (they're copied for each subinterval), defaults to None.
+    :type nets: list[`torch.nn.Module`], optional
+    :param criterion: The loss function to use for training, defaults to None.
+    :type criterion: `torch.nn.modules.loss._Loss`, optional
+    :param additional_loss_term: Extra terms to add to the loss function, as in ``neurodiffeq.ode.solve_system``.
+    :type additional_loss_term: callable
+    :param metrics: Metrics to keep track of during training, as in ``neurodiffeq.ode.solve_system``.
+    :type metrics: dict[string, callable]
+    :param batch_size: The size of the mini-batch to use, defaults to 16.
+    :type batch_size: int, optional
+    :param max_epochs: The maximum number of epochs to train the networks of a subinterval per iteration,
+        defaults to 1000.
+    :type max_epochs: int, optional
+    :param return_best: Whether to use the nets that achieved the lowest validation loss on each subinterval,
+        defaults to False.
+    :type return_best: bool, optional
+    :return: The solution of the ODE. The history, with the training histories of the subintervals (concatenated over
+        iterations) under 'subintervals' and the largest change of the initial values in every iteration under
+        'interface_change'.
+    :rtype: tuple[`neurodiffeq.ode.PiecewiseSolution`, dict]
+
+    .. note::
+        The ODE system, the coarse propagator, the networks and the metrics are sent to the worker processes with
+        ``dill``; each worker uses an even share of the CPUs for its PyTorch operations.
+    """
+    if single_net and nets:
+        raise RuntimeError('Only one of net and nets should be specified')
+    if n_subintervals < 1:
+        raise ValueError(f"`n_subintervals` must be positive, got {n_subintervals}")
+    n_vars = len(initial_values)
+    if (not single_net) and (not nets):
+        single_net = FCNN(n_input_units=1, n_output_units=n_vars, hidden_units=(32, 32), actv=nn.Tanh)
+    max_iterations = n_subintervals if max_iterations is None else max_iterations
+    if max_iterations < 1:
+        raise ValueError(f"`max_iterations` must be positive, got {max_iterations}")
+    if n_workers is None:
+        n_workers = min(n_subintervals, os.cpu_count() or 1)
+    n_threads = max(1, (os.cpu_count() or 1) // n_workers) if n_workers else None
+
+    t_breaks = np.linspace(t_min, t_max, n_subintervals + 1).tolist()
+
+    def coarse(u, k):
+        if coarse_propagator is None:
+            return np.zeros(n_vars)
+        return np.asarray(coarse_propagator(list(u), t_breaks[k], t_breaks[k + 1]), dtype=float).reshape(n_vars)
+
+    # initial guess by a sequential sweep of the coarse propagator
+    us = [np.asarray(initial_values, dtype=float)]
+    for k in range(n_subintervals - 1):
+        us.append(coarse(us[k], k) if coarse_propagator is not None else us[0].copy())
+
+    solutions = [None] * n_subintervals
+    trained_from = [None] * n_subintervals
+    fine_values = [None] * n_subintervals
+    history = {'subintervals': [{} for _ in range(n_subintervals)], 'interface_change': []}
+
+    def make_payload(k):
+        previous = solutions[k]
+        kwargs = dict(
+            ode_system=ode_system,
+            conditions=[IVP(t_0=t_breaks[k], u_0=float(u)) for u in us[k]],
+            t_min=t_breaks[k], t_max=t_breaks[k + 1],
+            single_net=previous.single_net if previous else deepcopy(single_net),
+            nets=previous.nets if previous else deepcopy(nets),
+            criterion=criterion, metrics=metrics, batch_size=batch_size, max_epochs=max_epochs,
+            additional_loss_term=additional_loss_term,
+            return_best=return_best,
+        )
+        return dill.dumps((kwargs, n_threads))
+
+    executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers else None
+    try:
+        for _ in range(max_iterations):
+            to_train = [
+                k for k in range(n_subintervals)
+                if trained_from[k] is None or np.max(np.abs(us[k] - trained_from[k])) > tol
+            ]
+            payloads = [make_payload(k) for k in to_train]
+            if executor:
+                results = list(executor.map(_train_subinterval, payloads))
+            else:
+                results = [_train_subinterval(payload) for payload in payloads]
+
+            for k, result in zip(to_train, results):
+                solutions[k], segment_history = dill.loads(result)
+                trained_from[k] = us[k].copy()
+                end_values = solutions[k]([t_breaks[k + 1]], as_type='np')
+                fine_values[k] = np.array([u.item() for u in end_values] if n_vars > 1 else [end_values.item()])
+                for key, values in segment_history.items():
+                    history['subintervals'][k].setdefault(key, []).extend(values)
+
+            # parareal correction, sweeping the subintervals in order
+            new_us = [us[0]]
+            for k in range(n_subintervals - 1):
+                new_us.append(coarse(new_us[k], k) + fine_values[k] - coarse(trained_from[k], k))
+            change = max([np.max(np.abs(new - old)) for new, old in zip(new_us, us)] + [0.0])
+            us = new_us
+            history['interface_change'].append(float(change))
+            if change <= tol:
+                break
+        else:
+            warnings.warn(f"The parareal iteration didn't converge within {max_iterations} iterations; "
+                          f"the initial values of the subintervals last changed by {change}")
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return PiecewiseSolution(solutions, t_breaks), history
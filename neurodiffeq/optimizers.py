@@ -0,0 +1,229 @@
+import torch
+from torch.optim import Optimizer
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+
+
+def _residual_jacobian(residuals, params, chunk_size=None):
+    r"""Compute the Jacobian of a vector of residuals w.r.t. a list of parameters.
+    The rows of the Jacobian are computed `chunk_size` at a time, each chunk with a single (vectorized) backward pass.
+    Residuals are usually built with ``neurodiffeq.diff``, which relies on ``torch.autograd.grad``;
+    hence, the backward passes are vectorized with ``is_grads_batched`` instead of ``torch.func.jacrev``.
+
+    :param residuals: The residuals, a 1-D tensor with a graph connecting it to `params`.
+    :type residuals: `torch.Tensor`
+    :param params: The parameters.
+    :type params: list[`torch.Tensor`]
+    :param chunk_size: Number of rows to compute at a time, defaults to all rows at once.
+    :type chunk_size: int
+    :return: The Jacobian, with shape (n_residuals, n_parameters).
+    :rtype: `torch.Tensor`
+    """
+    n = residuals.numel()
+    chunk_size = chunk_size or n
+    rows = []
+    for start in range(0, n, chunk_size):
+        end = min(start + chunk_size, n)
+        # each row of grad_outputs selects one residual
+        grad_outputs = torch.zeros(end - start, n, dtype=residuals.dtype, device=residuals.device)
+        grad_outputs[torch.arange(end - start), torch.arange(start, end)] = 1.0
+        grads = torch.autograd.grad(
+            residuals, params, grad_outputs=grad_outputs, is_grads_batched=True, retain_graph=True, allow_unused=True
+        )
+        rows.append(torch.cat([
+            torch.zeros(end - start, p.numel(), dtype=residuals.dtype, device=residuals.device) if g is None
+            else g.reshape(end - start, -1)
+            for g, p in zip(grads, params)
+        ], dim=1))
+    return torch.cat(rows, dim=0)
+
+
+class LevenbergMarquardt(Optimizer):
+    r"""The Levenberg-Marquardt (damped Gauss-Newton) algorithm, which minimizes a sum of squared residuals
+    :math:`\sum_i r_i^2`. In every iteration, the Jacobian :math:`J` of the residuals w.r.t. the parameters is computed
+    and the parameters are updated by :math:`\delta` solving the damped normal equations
+    :math:`(J^\top J + \lambda I)\delta = -J^\top r`. The damping :math:`\lambda` is decreased after a successful
+    update and increased (with the update rejected) otherwise.
+
+    Like ``torch.optim.LBFGS``, the ``.step()`` method must be passed a closure. Unlike ``torch.optim.LBFGS``,
+    the closure must return the 1-D tensor of residuals (instead of a scalar loss); it doesn't need to call
+    ``.backward()``. The solvers in ``neurodiffeq.solvers`` take care of this; their training loss is the
+    mean of squared residuals then, regardless of the `criterion`.
+
+    :param params: Parameters to optimize; only a single parameter group is supported.
+    :type params: iterable
+    :param damping: The initial damping :math:`\lambda`, defaults to 1e-3.
+    :type damping: float
+    :param damping_up: Factor by which the damping is multiplied after a rejected update, defaults to 10.
+    :type damping_up: float
+    :param damping_down: Factor by which the damping is multiplied after an accepted update, defaults to 0.1.
+    :type damping_down: float
+    :param min_damping: Lower bound of the damping, defaults to 1e-12.
+    :type min_damping: float
+    :param max_damping: Upper bound of the damping; once it's exceeded, the update is given up, the damping is
+        reset to its value before the update and the step ends. Defaults to 1e10.
+    :type max_damping: float
+    :param max_iter: Maximal number of updates per ``.step()``, defaults to 1.
+    :type max_iter: int
+    :param chunk_size: Number of rows of the Jacobian to compute at a time, defaults to 512.
+        A smaller value reduces memory consumption at the cost of more backward passes.
+    :type chunk_size: int
+
+    .. note::
+        The normal equations have as many unknowns as there are parameters,
+        so this optimizer is suited to networks with up to a few thousand parameters.
+    """
+
+    def __init__(self, params, damping=1e-3, damping_up=10.0, damping_down=0.1, min_damping=1e-12, max_damping=1e10,
+                 max_iter=1, chunk_size=512):
+        if damping <= 0:
+            raise ValueError(f"Invalid damping: {damping}")
+        if not damping_up > 1 > damping_down > 0:
+            raise ValueError(f"Invalid damping factors: damping_up={damping_up}, damping_down={damping_down}")
+        defaults = dict(damping=damping, damping_up=damping_up, damping_down=damping_down, min_damping=min_damping,
+                        max_damping=max_damping, max_iter=max_iter, chunk_size=chunk_size)
+        super(LevenbergMarquardt, self).__init__(params, defaults)
+        if len(self.param_groups) != 1:
+            raise ValueError("LevenbergMarquardt doesn't support per-parameter options (parameter groups)")
+
+    @torch.no_grad()
+    def step(self, closure):
+        r"""Performs a single optimization step, made up of up to `max_iter` accepted updates.
+
+        :param closure: A function that re-evaluates the model and returns the 1-D tensor of residuals.
+        :type closure: callable
+        :return: The sum of squared residuals before the step.
+        :rtype: `torch.Tensor`
+        """
+        group = self.param_groups[0]
+        params = [p for p in group['params'] if p.requires_grad]
+
+        def evaluate():
+            # the residuals usually involve derivatives w.r.t. the inputs, which require grad mode
+            with torch.enable_grad():
+                residuals = closure().reshape(-1)
+            return residuals, (residuals.detach() ** 2).sum()
+
+        residuals, loss = evaluate()
+        orig_loss = loss
+
+        for _ in range(group['max_iter']):
+            with torch.enable_grad():
+                jac = _residual_jacobian(residuals, params, group['chunk_size'])
+            r = residuals.detach()
+            jtj = jac.T @ jac
+            jtr = jac.T @ r
+            eye = torch.eye(jtj.shape[0], dtype=jtj.dtype, device=jtj.device)
+            x0 = parameters_to_vector(params)
+            last_damping = group['damping']
+
+            accepted = False
+            while group['damping'] <= group['max_damping']:
+                delta = torch.linalg.lstsq(jtj + group['damping'] * eye, -jtr.unsqueeze(1)).solution.squeeze(1)
+                vector_to_parameters(x0 + delta, params)
+                new_residuals, new_loss = evaluate()
+                if torch.isfinite(new_loss) and new_loss < loss:
+                    group['damping'] = max(group['damping'] * group['damping_down'], group['min_damping'])
+                    residuals, loss = new_residuals, new_loss
+                    accepted = True
+                    break
+                group['damping'] *= group['damping_up']
+
+            if not accepted:
+                # no update decreases the loss, leave the parameters as they were; the damping isn't left saturated,
+                # which would make the following steps crawl until it has been decreased again
+                vector_to_parameters(x0, params)
+                group['damping'] = last_damping
+                break
+
+        return orig_loss
+
+
+def output_layer_parameters(nets):
+    r"""Get the parameters of the output layer (i.e., the last ``torch.nn.Linear`` module) of each network.
+
+    :param nets: The networks.
+    :type nets: list[`torch.nn.Module`]
+    :return: The weights and biases of the output layers.
+    :rtype: list[`torch.nn.Parameter`]
+    """
+    params = []
+    for net in nets:
+        linear_layers = [m for m in net.modules() if isinstance(m, torch.nn.Linear)]
+        if not linear_layers:
+            raise ValueError(f"Network {net.__class__.__name__} has no `torch.nn.Linear` layer")
+        params += list(linear_layers[-1].parameters())
+    return params
+
+
+class LinearLeastSquares(Optimizer):
+    r"""Solves for the parameters in a single step, assuming the residuals are affine in them, which is the case
+    for linear differential equations when only the output layers of the networks are optimized
+    (the hidden layers staying frozen, as in extreme learning machines).
+    The step minimizes :math:`\|r(\theta)\|^2 + \alpha\|\theta\|^2` with a least-squares solver,
+    where the Jacobian of the residuals is computed as in ``LevenbergMarquardt``.
+
+    Like ``LevenbergMarquardt``, the ``.step()`` method must be passed a closure returning the 1-D tensor of residuals.
+    See also ``neurodiffeq.solvers.BaseSolver.fit_least_squares``.
+
+    :param params: Parameters to solve for, usually those returned by ``output_layer_parameters``.
+    :type params: iterable
+    :param regularization: The (Tikhonov) regularization strength :math:`\alpha`, defaults to 0.
+    :type regularization: float
+    :param chunk_size: If specified, the Jacobian is computed `chunk_size` rows at a time and accumulated into the
+        normal equations, instead of being kept as a whole; this saves memory but is less accurate for
+        ill-conditioned problems. Defaults to None.
+    :type chunk_size: int
+
+    .. note::
+        For nonlinear equations, a step amounts to a (full) Gauss-Newton step.
+    """
+
+    def __init__(self, params, regularization=0.0, chunk_size=None):
+        if regularization < 0:
+            raise ValueError(f"Invalid regularization: {regularization}")
+        defaults = dict(regularization=regularization, chunk_size=chunk_size)
+        super(LinearLeastSquares, self).__init__(params, defaults)
+        if len(self.param_groups) != 1:
+            raise ValueError("LinearLeastSquares doesn't support per-parameter options (parameter groups)")
+
+    @torch.no_grad()
+    def step(self, closure):
+        r"""Solves for the parameters.
+
+        :param closure: A function that re-evaluates the model and returns the 1-D tensor of residuals.
+        :type closure: callable
+        :return: The sum of squared residuals before the step.
+        :rtype: `torch.Tensor`
+        """
+        group = self.param_groups[0]
+        params = [p for p in group['params'] if p.requires_grad]
+        alpha = group['regularization']
+        chunk_size = group['chunk_size']
+        x0 = parameters_to_vector(params)
+        eye = torch.eye(len(x0), dtype=x0.dtype, device=x0.device)
+
+        with torch.enable_grad():
+            residuals = closure().reshape(-1)
+            if chunk_size is None:
+                jac = _residual_jacobian(residuals, params)
+            else:
+                # accumulate the normal equations one chunk of rows at a time
+                jtj = torch.zeros_like(eye)
+                jtr = torch.zeros_like(x0)
+                for start in range(0, residuals.numel(), chunk_size):
+                    jac = _residual_jacobian(residuals[start:start + chunk_size], params)
+                    jtj += jac.T @ jac
+                    jtr += jac.T @ residuals[start:start + chunk_size].detach()
+        r = residuals.detach()
+
+        # with delta = theta - theta_0, minimize |J delta + r|^2 + alpha |delta + theta_0|^2
+        if chunk_size is None:
+            a = torch.cat([jac, alpha ** 0.5 * eye])
+            b = torch.cat([-r, -alpha ** 0.5 * x0])
+        else:
+            a = jtj + alpha * eye
+            b = -(jtr + alpha * x0)
+        driver = 'gelsd' if a.device.type == 'cpu' else None
+        delta = torch.linalg.lstsq(a, b.unsqueeze(1), driver=driver).solution.squeeze(1)
+        vector_to_parameters(x0 + delta, params)
+        return (r ** 2).sum()
@@ -1,5 +1,4 @@
 import torch
-import torch.optim as optim
 import torch.nn as nn
 
 import numpy as np
@@ -12,9 +11,11 @@ from .networks import FCNN
 from .neurodiffeq import safe_diff as diff
 from .generators import Generator2D, PredefinedGenerator
 from ._version_utils import warn_deprecate_class
-from .conditions import IrregularBoundaryCondition
+from .conditions import IrregularBoundaryCondition, _enforce_on_single_net
 from .conditions import NoCondition, DirichletBVP2D, IBVP1D
+from .solvers import Solver2D, _residual_criterion, _column_residuals, _broadcast_inputs
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 
 ExampleGenerator2D = warn_deprecate_class(Generator2D)
 PredefinedExampleGenerator2D = warn_deprecate_class(PredefinedGenerator)
@@ -33,15 +34,12 @@ def _network_output_2input(net, xs, ys, ith_unit):
 
 # Adjust the output of the neural network with trial solutions
 # coded into `conditions`.
-def _trial_solution_2input(single_net, nets, xs, ys, conditions):
-    if single_net:  # using a single net
-        us = [
-            con.enforce(single_net, xs, ys)
-            for con in conditions
-        ]
+def _trial_solution_2input(single_net, nets, xs, ys, conditions, params=()):
+    if single_net:  # using a single net, whose forward pass is shared by all conditions
+        us = _enforce_on_single_net(single_net, conditions, xs, ys, *params)
     else:  # using multiple nets
         us = [
-            con.enforce(net, xs, ys)
+            con.enforce(net, xs, ys, *params)
             for con, net in zip(conditions, nets)
         ]
     return us
@@ -166,7 +164,8 @@ def solve2D(
         net=None, train_generator=None, shuffle=True, valid_generator=None, optimizer=None, criterion=None, additional_loss_term=None, metrics=None,
         batch_size=16,
         max_epochs=1000,
-        monitor=None, return_internal=False, return_best=False
+        monitor=None, return_internal=False, return_best=False, exact_epoch_loss=False, compile=False,
+        callbacks=None, time_budget=None,
 ):
     r"""Train a neural network to solve a PDE with 2 independent variables.
 
@@ -206,6 +205,21 @@ def solve2D(
     :type return_internal: bool, optional
     :param return_best: Whether to return the nets that achieved the lowest validation loss, defaults to False.
     :type return_best: bool, optional
+    :param exact_epoch_loss: Whether to evaluate the training loss and metrics on all training points again after each epoch,
+        instead of recording the sample-weighted average of the mini-batch losses and metrics, defaults to False.
+    :type exact_epoch_loss: bool, optional
+    :param compile: Whether to compile the computation of the loss with `torch.compile`, falling back to eager execution
+        if compilation fails, defaults to False.
+    :type compile: bool, optional
+    :param callbacks: Callbacks run after every epoch, each a function `cb(solver)` accepting the underlying solver
+        (e.g., `neurodiffeq.solvers.EarlyStoppingCallback`), which can stop the training by setting
+        `solver._stop_training` to True, defaults to None.
+    :type callbacks: list[callable], optional
+    :param time_budget: If specified, the wall-clock budget of the training, in seconds; the training stops after an
+        epoch if the next one is predicted not to fit in the budget (see `neurodiffeq.solvers.BaseSolver.fit`),
+        and the nets that achieved the lowest validation loss are returned regardless of `return_best`.
+        Defaults to None.
+    :type time_budget: float, optional
     :return: The solution of the PDE. The history of training loss and validation loss.
         Optionally, the nets, conditions, training generator, validation generator, optimizer and loss function.
         The solution is a function that has the signature `solution(xs, ys, as_type)`.
@@ -217,7 +231,9 @@ def solve2D(
         xy_min=xy_min, xy_max=xy_max, nets=nets,
         train_generator=train_generator, shuffle=shuffle, valid_generator=valid_generator,
         optimizer=optimizer, criterion=criterion, additional_loss_term=additional_loss_term, metrics=metrics, batch_size=batch_size,
-        max_epochs=max_epochs, monitor=monitor, return_internal=return_internal, return_best=return_best
+        max_epochs=max_epochs, monitor=monitor, return_internal=return_internal, return_best=return_best,
+        exact_epoch_loss=exact_epoch_loss, compile=compile, callbacks=callbacks,
+        time_budget=time_budget,
     )
 
 
@@ -226,7 +242,8 @@ def solve2D_system(
         single_net=None, nets=None, train_generator=None, shuffle=True, valid_generator=None,
         optimizer=None, criterion=None, additional_loss_term=None, metrics=None, batch_size=16,
         max_epochs=1000,
-        monitor=None, return_internal=False, return_best=False
+        monitor=None, return_internal=False, return_best=False, exact_epoch_loss=False, compile=False,
+        callbacks=None, time_budget=None,
 ):
     r"""Train a neural network to solve a PDE with 2 independent variables.
 
@@ -268,150 +285,69 @@ def solve2D_system(
         :type return_internal: bool, optional
         :param return_best: Whether to return the nets that achieved the lowest validation loss, defaults to False.
         :type return_best: bool, optional
+        :param exact_epoch_loss: Whether to evaluate the training loss and metrics on all training points again after each epoch,
+            instead of recording the sample-weighted average of the mini-batch losses and metrics, defaults to False.
+        :type exact_epoch_loss: bool, optional
+        :param compile: Whether to compile the computation of the loss with `torch.compile`, falling back to eager execution
+            if compilation fails, defaults to False.
+        :type compile: bool, optional
+        :param callbacks: Callbacks run after every epoch, each a function `cb(solver)` accepting the underlying solver
+            (e.g., `neurodiffeq.solvers.EarlyStoppingCallback`), which can stop the training by setting
+            `solver._stop_training` to True, defaults to None.
+        :type callbacks: list[callable], optional
+        :param time_budget: If specified, the wall-clock budget of the training, in seconds; the training stops after an
+            epoch if the next one is predicted not to fit in the budget (see `neurodiffeq.solvers.BaseSolver.fit`),
+            and the nets that achieved the lowest validation loss are returned regardless of `return_best`.
+            Defaults to None.
+        :type time_budget: float, optional
         :return: The solution of the PDE. The history of training loss and validation loss.
             Optionally, the nets, conditions, training generator, validation generator, optimizer and loss function.
             The solution is a function that has the signature `solution(xs, ys, as_type)`.
         :rtype: tuple[`neurodiffeq.pde.Solution`, dict]; or tuple[`neurodiffeq.pde.Solution`, dict, dict]
         """
 
-    ########################################### subroutines ###########################################
-    # Train the neural network for 1 epoch, return the training loss and training metrics
-    def train(train_generator, net, nets, pde_system, conditions, criterion, additional_loss_term, metrics, shuffle, optimizer):
-        train_examples_x, train_examples_y = train_generator.get_examples()
-        train_examples_x, train_examples_y = train_examples_x.reshape((-1, 1)), train_examples_y.reshape((-1, 1))
-        n_examples_train = train_generator.size
-        idx = np.random.permutation(n_examples_train) if shuffle else np.arange(n_examples_train)
-
-        batch_start, batch_end = 0, batch_size
-        while batch_start < n_examples_train:
-            if batch_end > n_examples_train:
-                batch_end = n_examples_train
-            batch_idx = idx[batch_start:batch_end]
-            xs, ys = train_examples_x[batch_idx], train_examples_y[batch_idx]
-
-            train_loss_batch = calculate_loss(xs, ys, net, nets, pde_system, conditions, criterion, additional_loss_term)
-
-            optimizer.zero_grad()
-            train_loss_batch.backward()
-            optimizer.step()
-
-            batch_start += batch_size
-            batch_end += batch_size
-
-        train_loss_epoch = calculate_loss(train_examples_x, train_examples_y, net, nets, pde_system, conditions, criterion, additional_loss_term)
-        train_loss_epoch = train_loss_epoch.item()
-
-        train_metrics_epoch = calculate_metrics(train_examples_x, train_examples_y, net, nets, conditions, metrics)
-        return train_loss_epoch, train_metrics_epoch
-
-    # Vliadate the neural network, return the validation loss and validation metrics
-    def valid(valid_generator, net, nets, pde_system, conditions, criterion, additional_loss_term, metrics):
-        valid_examples_x, valid_examples_y = valid_generator.get_examples()
-        valid_examples_x, valid_examples_y = valid_examples_x.reshape((-1, 1)), valid_examples_y.reshape((-1, 1))
-        valid_loss_epoch = calculate_loss(valid_examples_x, valid_examples_y, net, nets, pde_system, conditions, criterion, additional_loss_term)
-        valid_loss_epoch = valid_loss_epoch.item()
-
-        valid_metrics_epoch = calculate_metrics(valid_examples_x, valid_examples_y, net, nets, conditions, metrics)
-        return valid_loss_epoch, valid_metrics_epoch
-
-    # calculate the loss function
-    def calculate_loss(xs, ys, net, nets, pde_system, conditions, criterion, additional_loss_term):
-        us = _trial_solution_2input(net, nets, xs, ys, conditions)
-        Fuxys = pde_system(*us, xs, ys)
-        loss = sum(
-            criterion(Fuxy, torch.zeros_like(xs))
-            for Fuxy in Fuxys
-        )
-        if additional_loss_term is not None:
-            loss += additional_loss_term(*us, xs, ys)
-        return loss
-
-    # caclulate the metrics
-    def calculate_metrics(xs, ys, net, nets, conditions, metrics):
-        us = _trial_solution_2input(net, nets, xs, ys, conditions)
-        metrics_ = {
-            metric_name: metric_function(*us, xs, ys).item()
-            for metric_name, metric_function in metrics.items()
-        }
-        return metrics_
-    ###################################################################################################
-
     if single_net and nets:
         raise RuntimeError('Only one of net and nets should be specified')
     # defaults to use a single neural network
     if (not single_net) and (not nets):
-        net = FCNN(
+        single_net = FCNN(
             n_input_units=2,
             n_output_units=len(conditions),
             hidden_units=(32, 32),
             actv=nn.Tanh,
         )
-    if single_net:
-        # mark the Conditions so that we know which condition correspond to which output unit
-        for ith, con in enumerate(conditions):
-            con.set_impose_on(ith)
-    if not train_generator:
-        if (xy_min is None) or (xy_max is None):
-            raise RuntimeError('Please specify xy_min and xy_max when train_generator is not specified')
-        train_generator = Generator2D((32, 32), xy_min, xy_max, method='equally-spaced-noisy')
-    if not valid_generator:
-        if (xy_min is None) or (xy_max is None):
-            raise RuntimeError('Please specify xy_min and xy_max when valid_generator is not specified')
-        valid_generator = Generator2D((32, 32), xy_min, xy_max, method='equally-spaced')
-    if (not optimizer) and single_net:  # using a single net
-        optimizer = optim.Adam(single_net.parameters(), lr=0.001)
-    if (not optimizer) and nets:  # using multiple nets
-        all_parameters = []
-        for net in nets:
-            all_parameters += list(net.parameters())
-        optimizer = optim.Adam(all_parameters, lr=0.001)
     if not criterion:
         criterion = nn.MSELoss()
-    if metrics is None:
-        metrics = {}
-
-    history = {}
-    history['train_loss'] = []
-    history['valid_loss'] = []
-    for metric_name, _ in metrics.items():
-        history['train__'+metric_name] = []
-        history['valid__'+metric_name] = []
-
-    if return_best:
-        valid_loss_epoch_min = np.inf
-        solution_min = None
-
-    for epoch in range(max_epochs):
-        train_loss_epoch, train_metrics_epoch = train(train_generator, single_net, nets, pde_system, conditions, criterion, additional_loss_term, metrics, shuffle, optimizer)
-        history['train_loss'].append(train_loss_epoch)
-        for metric_name, metric_value in train_metrics_epoch.items():
-            history['train__'+metric_name].append(metric_value)
-
-        valid_loss_epoch, valid_metrics_epoch = valid(valid_generator, single_net, nets, pde_system, conditions, criterion, additional_loss_term, metrics)
-        history['valid_loss'].append(valid_loss_epoch)
-        for metric_name, metric_value in valid_metrics_epoch.items():
-            history['valid__'+metric_name].append(metric_value)
-
-        if monitor and epoch % monitor.check_every == 0:
-            monitor.check(single_net, nets, conditions, history)
-
-        if return_best and valid_loss_epoch < valid_loss_epoch_min:
-            valid_loss_epoch_min = valid_loss_epoch
-            solution_min = Solution(single_net, nets, conditions)
-
-    if return_best:
-        solution = solution_min
-    else:
-        solution = Solution(single_net, nets, conditions)
+
+    solver = Solver2D(
+        pde_system=_column_residuals(pde_system), conditions=conditions, xy_min=xy_min, xy_max=xy_max,
+        single_net=single_net or None, nets=nets or None,
+        train_generator=train_generator, valid_generator=valid_generator,
+        optimizer=optimizer, criterion=_residual_criterion(criterion),
+        n_batches_train=1, n_batches_valid=1, metrics=metrics,
+        additional_loss_term=additional_loss_term, batch_size=batch_size, shuffle=shuffle,
+        exact_epoch_loss=exact_epoch_loss, compile=compile,
+    )
+
+    callbacks = list(callbacks) if callbacks else []
+    if monitor:
+        def monitor_callback(solver):
+            if solver.local_epoch % monitor.check_every == 0:
+                monitor.check(single_net, nets, conditions, solver.metrics_history)
+        callbacks.append(monitor_callback)
+
+    solver.fit(max_epochs=max_epochs, callbacks=callbacks, time_budget=time_budget)
+    solution = solver.get_solution(best=return_best or time_budget is not None)
+    history = solver.metrics_history
 
     if return_internal:
         internal = {
             'single_net': single_net,
             'nets': nets,
             'conditions': conditions,
-            'train_generator': train_generator,
-            'valid_generator': valid_generator,
-            'optimizer': optimizer,
+            'train_generator': solver.generator['train'],
+            'valid_generator': solver.generator['valid'],
+            'optimizer': solver.optimizer,
             'criterion': criterion
         }
         return solution, history, internal
@@ -436,7 +372,7 @@ class Solution:
         self.nets = deepcopy(nets)
         self.conditions = deepcopy(conditions)
 
-    def __call__(self, xs, ys, as_type='tf'):
+    def __call__(self, xs, ys, as_type='tf', params=()):
         """Evaluate the solution at certain points.
 
         :param xs: the x-coordinates of points on which the dependent variables are evaluated.
@@ -445,6 +381,9 @@ class Solution:
         :type ys: `torch.Tensor` or sequence of number
         :param as_type: Whether the returned value is a `torch.Tensor` ('tf') or `numpy.array` ('np').
         :type as_type: str
+        :param params: For parametric problems, the parameters of the member of the family to evaluate,
+            each a number or broadcastable to the shape of `xs`. Must be passed by keyword.
+        :type params: tuple or list
         :return: dependent variables are evaluated at given points.
         :rtype: list[`torch.Tensor` or `numpy.array` (when there is more than one dependent variables)
             `torch.Tensor` or `numpy.array` (when there is only one dependent variable).
@@ -453,12 +392,16 @@ class Solution:
             xs = torch.tensor(xs)
         if not isinstance(ys, torch.Tensor):
             ys = torch.tensor(ys)
+        params = tuple(params)
+        if params:
+            xs, ys, *params = _broadcast_inputs(xs, ys, *params)
         original_shape = xs.shape
         xs, ys = xs.reshape(-1, 1), ys.reshape(-1, 1)
+        params = [p.reshape(-1, 1) for p in params]
         if as_type not in ('tf', 'np'):
             raise ValueError("The valid return types are 'tf' and 'np'.")
 
-        us = _trial_solution_2input(self.single_net, self.nets, xs, ys, self.conditions)
+        us = _trial_solution_2input(self.single_net, self.nets, xs, ys, self.conditions, params)
         us = [u.reshape(original_shape) for u in us]
         if as_type == 'np':
             us = [u.detach().cpu().numpy() for u in us]
@@ -466,6 +409,281 @@ class Solution:
         return us if len(us) > 1 else us[0]
 
 
+class _SubdomainSolver2D(Solver2D):
+    r"""A ``Solver2D`` on one subdomain of a domain decomposition, whose loss is augmented by interface terms
+    pulling its solution and normal flux towards targets on the interfaces with its neighbors.
+    """
+
+    def __init__(self, *args, interfaces=(), interface_weight=1.0, flux_weight=1.0, **kwargs):
+        super(_SubdomainSolver2D, self).__init__(*args, **kwargs)
+        # each interface is a tuple (xs, ys, axis), where axis is 0 (x) or 1 (y) for the normal direction
+        self.interfaces = list(interfaces)
+        self.interface_weight = interface_weight
+        self.flux_weight = flux_weight
+        # targets of the dependent variables and of their normal derivatives on each interface
+        self.interface_targets = [None] * len(self.interfaces)
+
+    def interface_values(self):
+        r"""Evaluate the dependent variables and their normal derivatives on each interface.
+
+        :return: For each interface, the values and the normal derivatives of the dependent variables.
+        :rtype: list[tuple[list[`torch.Tensor`], list[`torch.Tensor`]]]
+        """
+        values = []
+        for xs, ys, axis in self.interfaces:
+            us = self.compute_func_val(xs, ys)
+            fluxes = [diff(u, (xs, ys)[axis]) for u in us]
+            values.append((us, fluxes))
+        return values
+
+    def additional_loss(self, funcs, key):
+        loss = super(_SubdomainSolver2D, self).additional_loss(funcs, key)
+        if not any(target is not None for target in self.interface_targets):
+            return loss
+        for (us, fluxes), target in zip(self.interface_values(), self.interface_targets):
+            if target is None:
+                continue
+            target_us, target_fluxes = target
+            for u, target_u in zip(us, target_us):
+                loss = loss + self.interface_weight * ((u - target_u) ** 2).mean()
+            for flux, target_flux in zip(fluxes, target_fluxes):
+                loss = loss + self.flux_weight * ((flux - target_flux) ** 2).mean()
+        return loss
+
+
+class PiecewiseSolution:
+    r"""A solution to a PDE (system) stitched together from the solutions on the rectangular subdomains of a grid,
+    as returned by ``neurodiffeq.pde.solve2D_system_decomposed``.
+
+    :param solutions: The solutions on the subdomains, where ``solutions[i][j]`` is the solution on
+        :math:`[x_i, x_{i+1}] \times [y_j, y_{j+1}]`.
+    :type solutions: list[list[`neurodiffeq.pde.Solution`]]
+    :param x_breaks: The end points :math:`x_0 < x_1 < ...` of the subdomains along :math:`x`.
+    :type x_breaks: list[float]
+    :param y_breaks: The end points :math:`y_0 < y_1 < ...` of the subdomains along :math:`y`.
+    :type y_breaks: list[float]
+    """
+    def __init__(self, solutions, x_breaks, y_breaks):
+        """Initializer method
+        """
+        if len(x_breaks) != len(solutions) + 1 or any(len(row) + 1 != len(y_breaks) for row in solutions):
+            raise ValueError(f"The {len(x_breaks)} x- and {len(y_breaks)} y-break points don't match "
+                             f"the grid of solutions")
+        self.solutions = solutions
+        self.x_breaks = list(x_breaks)
+        self.y_breaks = list(y_breaks)
+
+    def __call__(self, xs, ys, as_type='tf'):
+        """Evaluate the solution at certain points, each by the solution on the subdomain owning it.
+        Points outside the decomposed domain are evaluated by the solution on the nearest subdomain.
+
+        :param xs: the x-coordinates of points on which the dependent variables are evaluated.
+        :type xs: `torch.Tensor` or sequence of number
+        :param ys: the y-coordinates of points on which the dependent variables are evaluated.
+        :type ys: `torch.Tensor` or sequence of number
+        :param as_type: Whether the returned value is a `torch.Tensor` ('tf') or `numpy.array` ('np').
+        :type as_type: str
+        :return: dependent variables are evaluated at given points.
+        :rtype: list[`torch.Tensor` or `numpy.array` (when there is more than one dependent variables)
+            `torch.Tensor` or `numpy.array` (when there is only one dependent variable).
+        """
+        if not isinstance(xs, torch.Tensor):
+            xs = torch.tensor(xs)
+        if not isinstance(ys, torch.Tensor):
+            ys = torch.tensor(ys)
+        if as_type not in ('tf', 'np'):
+            raise ValueError("The valid return types are 'tf' and 'np'.")
+        original_shape = xs.shape
+        xs, ys = xs.reshape(-1), ys.reshape(-1)
+        # a point on an interface is evaluated by the subdomain on its upper side
+        i_ids = torch.bucketize(xs.detach(), torch.tensor(self.x_breaks[1:-1], dtype=xs.dtype), right=True)
+        j_ids = torch.bucketize(ys.detach(), torch.tensor(self.y_breaks[1:-1], dtype=ys.dtype), right=True)
+
+        n_vars = len(self.solutions[0][0].conditions)
+        us = [torch.zeros_like(xs) for _ in range(n_vars)]
+        for i, row in enumerate(self.solutions):
+            for j, solution in enumerate(row):
+                mask = (i_ids == i) & (j_ids == j)
+                if not mask.any():
+                    continue
+                subdomain_us = solution(xs[mask], ys[mask], as_type='tf')
+                if n_vars == 1:
+                    subdomain_us = [subdomain_us]
+                for u, subdomain_u in zip(us, subdomain_us):
+                    u[mask] = subdomain_u
+
+        us = [u.reshape(original_shape) for u in us]
+        if as_type == 'np':
+            us = [u.detach().cpu().numpy() for u in us]
+
+        return us if n_vars > 1 else us[0]
+
+
+def solve2D_system_decomposed(
+        pde_system, conditions, xy_min, xy_max, n_subdomains=(2, 2),
+        single_net=None, nets=None, generator_fn=None, criterion=None, additional_loss_term=None, metrics=None,
+        batch_size=None, n_rounds=10, epochs_per_round=100, n_interface_points=32, interface_weight=1.0,
+        flux_weight=1.0, n_workers=None, return_best=False,
+):
+    r"""Train neural networks to solve a PDE with 2 independent variables on a rectangle decomposed into a grid of
+    subdomains, each with its own networks and generators (an XPINN-style domain decomposition).
+
+    The conditions are enforced on the networks of every subdomain, which satisfy them on the parts of the boundary of
+    the whole domain they share. Neighboring subdomains are coupled by interface terms added to their losses: the
+    squared differences between the dependent variables (continuity) and between their normal derivatives (flux) and
+    the averages of both sides on the interface. Training runs in rounds; in each round, the averages are frozen and
+    all subdomains are trained concurrently in a pool of threads for `epochs_per_round` epochs.
+
+    :param pde_system: The PDE system to solve, as in ``neurodiffeq.pde.solve2D_system``.
+    :type pde_system: callable
+    :param conditions: The initial/boundary conditions on the whole domain, as in ``neurodiffeq.pde.solve2D_system``.
+    :type conditions: list[`neurodiffeq.conditions.BaseCondition`]
+    :param xy_min: The lower bound of 2 dimensions of the whole domain.
+    :type xy_min: tuple[float, float]
+    :param xy_max: The upper bound of 2 dimensions of the whole domain.
+    :type xy_max: tuple[float, float]
+    :param n_subdomains: Number of subdomains of equal size along :math:`x` and along :math:`y`, defaults to (2, 2).
+    :type n_subdomains: tuple[int, int], optional
+    :param single_net: The single neural network used on every subdomain (it's copied for each subdomain).
+        Only one of `single_net` and `nets` should be specified, defaults to None
+    :type single_net: `torch.nn.Module`, optional
+    :param nets: The neural networks used on every subdomain (they're copied for each subdomain), defaults to None.
+    :type nets: list[`torch.nn.Module`], optional
+    :param generator_fn: A function mapping the bounds `(xy_min, xy_max)` of a subdomain to a generator of its
+        points, called once for training and once for validation, e.g. to sample only the points of an irregular
+        domain. Defaults to None, in which case the default generators of ``neurodiffeq.solvers.Solver2D`` are used.
+    :type generator_fn: callable, optional
+    :param criterion: The loss function to use for training, defaults to None.
+    :type criterion: `torch.nn.modules.loss._Loss`, optional
+    :param additional_loss_term: Extra terms to add to the loss function of every subdomain,
+        as in ``neurodiffeq.pde.solve2D_system``.
+    :type additional_loss_term: callable
+    :param metrics: Metrics to keep track of during training, as in ``neurodiffeq.pde.solve2D_system``.
+    :type metrics: dict[string, callable]
+    :param batch_size: The size of the mini-batch to use, defaults to None, i.e., all points of the subdomain.
+        The interface terms are evaluated for every mini-batch.
+    :type batch_size: int, optional
+    :param n_rounds: Number of rounds of training, defaults to 10.
+    :type n_rounds: int, optional
+    :param epochs_per_round: Number of epochs every subdomain is trained in a round, defaults to 100.
+    :type epochs_per_round: int, optional
+    :param n_interface_points: Number of equally spaced points on every interface, defaults to 32.
+    :type n_interface_points: int, optional
+    :param interface_weight: Weight of the continuity terms, defaults to 1.0.
+    :type interface_weight: float, optional
+    :param flux_weight: Weight of the flux terms, defaults to 1.0.
+    :type flux_weight: float, optional
+    :param n_workers: Number of threads, defaults to the number of subdomains.
+        If 0, the subdomains are trained one after another.
+    :type n_workers: int, optional
+    :param return_best: Whether to use the nets that achieved the lowest validation loss on each subdomain,
+        defaults to False.
+    :type return_best: bool, optional
+    :return: The solution of the PDE. The history, with the training histories of the subdomains (concatenated over
+        rounds) under 'subdomains', where ``history['subdomains'][i][j]`` is that of the subdomain
+        :math:`[x_i, x_{i+1}] \times [y_j, y_{j+1}]`, and the largest jump of the dependent variables across the
+        interfaces after every round under 'interface_jump'.
+    :rtype: tuple[`neurodiffeq.pde.PiecewiseSolution`, dict]
+    """
+    if single_net and nets:
+        raise RuntimeError('Only one of net and nets should be specified')
+    nx, ny = n_subdomains
+    if nx < 1 or ny < 1:
+        raise ValueError(f"`n_subdomains` must be positive, got {n_subdomains}")
+    if (not single_net) and (not nets):
+        single_net = FCNN(n_input_units=2, n_output_units=len(conditions), hidden_units=(32, 32), actv=nn.Tanh)
+    if not criterion:
+        criterion = nn.MSELoss()
+    if n_workers is None:
+        n_workers = nx * ny
+
+    x_breaks = np.linspace(xy_min[0], xy_max[0], nx + 1).tolist()
+    y_breaks = np.linspace(xy_min[1], xy_max[1], ny + 1).tolist()
+
+    def interface_points(fixed, lo, hi, axis):
+        along = torch.linspace(lo, hi, n_interface_points)
+        across = torch.full_like(along, fixed)
+        xs, ys = (across, along) if axis == 0 else (along, across)
+        return xs.reshape(-1, 1).requires_grad_(), ys.reshape(-1, 1).requires_grad_()
+
+    # interfaces as (subdomain on the lower side, subdomain on the upper side, axis of the normal)
+    interfaces = []
+    for i in range(nx):
+        for j in range(ny):
+            if i + 1 < nx:
+                interfaces.append(((i, j), (i + 1, j), 0))
+            if j + 1 < ny:
+                interfaces.append(((i, j), (i, j + 1), 1))
+
+    solvers = {}
+    interface_ids = {(i, j): [] for i in range(nx) for j in range(ny)}
+    points = []
+    for k, (lower, upper, axis) in enumerate(interfaces):
+        if axis == 0:
+            points.append(interface_points(x_breaks[upper[0]], y_breaks[lower[1]], y_breaks[lower[1] + 1], 0))
+        else:
+            points.append(interface_points(y_breaks[upper[1]], x_breaks[lower[0]], x_breaks[lower[0] + 1], 1))
+        interface_ids[lower].append(k)
+        interface_ids[upper].append(k)
+
+    for i in range(nx):
+        for j in range(ny):
+            sub_min, sub_max = (x_breaks[i], y_breaks[j]), (x_breaks[i + 1], y_breaks[j + 1])
+            solvers[i, j] = _SubdomainSolver2D(
+                pde_system=_column_residuals(pde_system), conditions=deepcopy(conditions),
+                xy_min=sub_min, xy_max=sub_max,
+                single_net=deepcopy(single_net), nets=deepcopy(nets),
+                train_generator=generator_fn(sub_min, sub_max) if generator_fn else None,
+                valid_generator=generator_fn(sub_min, sub_max) if generator_fn else None,
+                criterion=_residual_criterion(criterion), n_batches_train=1, n_batches_valid=1, metrics=metrics,
+                additional_loss_term=additional_loss_term, batch_size=batch_size,
+                # each subdomain gets its own copy of the interface points, as they're used concurrently
+                interfaces=[
+                    (*[p.detach().clone().requires_grad_() for p in points[k]], interfaces[k][2])
+                    for k in interface_ids[i, j]
+                ],
+                interface_weight=interface_weight, flux_weight=flux_weight,
+            )
+
+    def train(solver):
+        solver.fit(max_epochs=epochs_per_round)
+
+    history = {'interface_jump': []}
+    executor = ThreadPoolExecutor(max_workers=n_workers) if n_workers else None
+    try:
+        for round_ in range(n_rounds + 1):
+            # average the values and fluxes of both sides of each interface
+            values = {key: solver.interface_values() for key, solver in solvers.items()}
+            averages, jump = [], 0.0
+            for k, (lower, upper, _) in enumerate(interfaces):
+                lower_values = values[lower][interface_ids[lower].index(k)]
+                upper_values = values[upper][interface_ids[upper].index(k)]
+                averages.append(tuple(
+                    [(a.detach() + b.detach()) / 2 for a, b in zip(lower_side, upper_side)]
+                    for lower_side, upper_side in zip(lower_values, upper_values)
+                ))
+                jump = max([jump] + [(a - b).abs().max().item() for a, b in zip(lower_values[0], upper_values[0])])
+            if round_ > 0:
+                history['interface_jump'].append(jump)
+            if round_ == n_rounds:
+                break
+            for key, solver in solvers.items():
+                solver.interface_targets = [averages[k] for k in interface_ids[key]]
+
+            if executor:
+                list(executor.map(train, solvers.values()))
+            else:
+                for solver in solvers.values():
+                    train(solver)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    history['subdomains'] = [[solvers[i, j].metrics_history for j in range(ny)] for i in range(nx)]
+    solutions = [[solvers[i, j].get_solution(best=return_best) for j in range(ny)] for i in range(nx)]
+    return PiecewiseSolution(solutions, x_breaks, y_breaks), history
+
+
 def make_animation(solution, xs, ts):
     r"""Create animation of 1-D time-dependent problems.
 
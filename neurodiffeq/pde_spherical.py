@@ -1,11 +1,8 @@
 import os
-import sys
 import dill
 import warnings
 import logging
 import torch
-import torch.optim as optim
-import torch.nn as nn
 
 import numpy as np
 import math
@@ -15,7 +12,8 @@ import matplotlib
 import matplotlib.pyplot as plt
 from .function_basis import RealSphericalHarmonics
 
-from .networks import FCNN
+from .solvers import BaseSolver, _broadcast_inputs
+from .conditions import _enforce_on_fused_nets
 from ._version_utils import warn_deprecate_class
 from .generators import Generator3D, GeneratorSpherical
 from .conditions import NoCondition, DirichletBVPSpherical, InfDirichletBVPSpherical
@@ -57,10 +55,10 @@ class SolutionSpherical:
         self.nets = deepcopy(nets)
         self.conditions = deepcopy(conditions)
 
-    def _compute_u(self, net, condition, rs, thetas, phis):
-        return condition.enforce(net, rs, thetas, phis)
+    def _compute_u(self, net, condition, rs, thetas, phis, *params):
+        return condition.enforce(net, rs, thetas, phis, *params)
 
-    def __call__(self, rs, thetas, phis, as_type='tf'):
+    def __call__(self, rs, thetas, phis, as_type='tf', params=()):
         """Evaluate the solution at certain points.
 
         :param rs: The radii of points where the neural network output is evaluated.
@@ -71,6 +69,9 @@ class SolutionSpherical:
         :type phis: `torch.Tensor`
         :param as_type: Whether the returned value is a `torch.Tensor` ('tf') or `numpy.array` ('np').
         :type as_type: str
+        :param params: For parametric problems (e.g., operator learning), the parameters of the member of the family
+            to evaluate, each a number or broadcastable to the shape of `rs`. Must be passed by keyword.
+        :type params: tuple or list
         :return: dependent variables are evaluated at given points.
         :rtype: list[`torch.Tensor` or `numpy.array` (when there is more than one dependent variables)
             `torch.Tensor` or `numpy.array` (when there is only one dependent variable)
@@ -81,15 +82,19 @@ class SolutionSpherical:
             thetas = torch.tensor(thetas)
         if not isinstance(phis, torch.Tensor):
             phis = torch.tensor(phis)
+        params = tuple(params)
+        if params:
+            rs, thetas, phis, *params = _broadcast_inputs(rs, thetas, phis, *params)
         original_shape = rs.shape
         rs = rs.reshape(-1, 1)
         thetas = thetas.reshape(-1, 1)
         phis = phis.reshape(-1, 1)
+        params = [p.reshape(-1, 1) for p in params]
         if as_type not in ('tf', 'np'):
             raise ValueError("The valid return types are 'tf' and 'np'.")
 
         vs = [
-            self._compute_u(net, con, rs, thetas, phis).reshape(original_shape)
+            self._compute_u(net, con, rs, thetas, phis, *params).reshape(original_shape)
             for con, net in zip(self.conditions, self.nets)
         ]
         if as_type == 'np':
@@ -260,7 +265,7 @@ def solve_spherical_system(
     return ret
 
 
-class SphericalSolver:
+class SphericalSolver(BaseSolver):
     """A solver class for solving PDEs in spherical coordinates
     
     :param pde_system: the PDE system to solve; maps a tuple of three coordinates to a tuple of PDE residuals, both the coordinates and PDE residuals must have shape (-1, 1)
@@ -289,15 +294,30 @@ class SphericalSolver:
     :type n_batches_valid: int
     :param enforcer: a function mapping a network, a condition, and a batch (returned by a generator) to the function values evaluated on the batch
     :type enforcer: callable
+    :param compile: whether to compile the computation of the loss with `torch.compile`;
+        falls back to eager execution if compilation fails; see `neurodiffeq.solvers.BaseSolver`
+    :type compile: bool
+    :param ensemble_size: if set, train this many independent copies of the networks at once;
+        `.get_solution()` returns a list of solutions then; see `neurodiffeq.solvers.BaseSolver`
+    :type ensemble_size: int
+    :param ensemble_shared_points: whether the members of the ensemble are trained on the same points, defaults to True
+    :type ensemble_shared_points: bool
+    :param fuse_nets: whether to evaluate networks of identical architecture with a single vectorized call,
+        defaults to False; see `neurodiffeq.solvers.BaseSolver`
+    :type fuse_nets: bool
     :param batch_size: DEPRECATED and IGNORED; each batch will use all samples generated, specify n_batches_train and n_batches_valid instead
     :type batch_size: int
     :param shuffle: deprecated; shuffling should be performed by generators
     :type shuffle: bool
+
+    .. note::
+        The training loop is implemented by `neurodiffeq.solvers.BaseSolver`.
     """
 
     def __init__(self, pde_system, conditions, r_min=None, r_max=None,
                  nets=None, train_generator=None, valid_generator=None, analytic_solutions=None,
                  optimizer=None, criterion=None, n_batches_train=1, n_batches_valid=4, enforcer=None,
+                 compile=False, ensemble_size=None, ensemble_shared_points=True, fuse_nets=False,
                  # deprecated arguments are listed below
                  shuffle=False, batch_size=None):
 
@@ -314,75 +334,62 @@ class SphericalSolver:
                                  f"got r_min={r_min}, r_max={r_max}, train_generator={train_generator}, "
                                  f"valid_generator={valid_generator}")
 
-        self.pdes = pde_system
-        self.conditions = conditions
-        self.n_funcs = len(conditions)
-        self.r_min = r_min
-        self.r_max = r_max
-        if nets is None:
-            self.nets = [
-                FCNN(n_input_units=3, hidden_units=(32, 32), actv=nn.Tanh)
-                for _ in range(self.n_funcs)
-            ]
-        else:
-            self.nets = nets
-
         if train_generator is None:
             train_generator = GeneratorSpherical(512, r_min, r_max, method='equally-spaced-noisy')
 
         if valid_generator is None:
             valid_generator = GeneratorSpherical(512, r_min, r_max, method='equally-spaced-noisy')
 
-        self.analytic_solutions = analytic_solutions
+        super(SphericalSolver, self).__init__(
+            diff_eqs=pde_system,
+            conditions=conditions,
+            nets=nets,
+            train_generator=train_generator,
+            valid_generator=valid_generator,
+            analytic_solutions=analytic_solutions,
+            optimizer=optimizer,
+            criterion=criterion,
+            n_batches_train=n_batches_train,
+            n_batches_valid=n_batches_valid,
+            compile=compile,
+            ensemble_size=ensemble_size,
+            ensemble_shared_points=ensemble_shared_points,
+            fuse_nets=fuse_nets,
+            n_input_units=3,
+        )
+        self.r_min = r_min
+        self.r_max = r_max
         self.enforcer = enforcer
 
-        if optimizer is None:
-            all_params = []
-            for n in self.nets:
-                all_params += n.parameters()
-            self.optimizer = optim.Adam(all_params, lr=0.001)
-        else:
-            self.optimizer = optimizer
+    @property
+    def pdes(self):
+        """The PDE system being solved"""
+        return self.diff_eqs
 
-        if criterion is None:
-            self.criterion = lambda residual_tensor: (residual_tensor ** 2).mean()
-        else:
-            self.criterion = criterion
-
-        def make_pair_dict(train=None, valid=None):
-            return {'train': train, 'valid': valid}
-
-        self.generator = make_pair_dict(train=train_generator, valid=valid_generator)
-        # loss history
-        self.loss = make_pair_dict(train=[], valid=[])
-        # analytic MSE history
-        self.analytic_mse = make_pair_dict(train=[], valid=[])
-        # number of batches for training / validation;
-        self.n_batches = make_pair_dict(train=n_batches_train, valid=n_batches_valid)
-        # current batch of samples, kept for additional_loss term to use
-        self._batch_examples = make_pair_dict()
-        # current network with lowest loss
-        self.best_nets = None
-        # current lowest loss
-        self.lowest_loss = None
-        # local epoch in a `.fit` call, should only be modified inside self.fit()
-        self.local_epoch = 0
-        # maximum local epochs to run in a `.fit()` call, should only set by inside self.fit()
-        self._max_local_epoch = 0
-        # controls early stopping, should be set to False at the beginning of a `.fit()` call
-        # and optionally set to False by `callbacks` in `.fit()` to support early stopping
-        self._stop_training = False
-        # the _phase variable is registered for callback functions to access
-        self._phase = None
+    @property
+    def loss(self):
+        """Loss history, a dict with keys 'train' and 'valid', whose lists are those of `.metrics_history`;
+        assigning such a dict (e.g., when restoring a checkpoint) replaces them in `.metrics_history`"""
+        return {key: self.metrics_history[self._history_key(key, 'loss')] for key in ('train', 'valid')}
+
+    @loss.setter
+    def loss(self, history):
+        for key in ('train', 'valid'):
+            self.metrics_history[self._history_key(key, 'loss')] = history[key]
 
     @property
-    def global_epoch(self):
-        """Global epoch count, always equal to the length of train loss history
+    def analytic_mse(self):
+        """History of MSE against analytic solutions, a dict with keys 'train' and 'valid',
+        whose lists are those of `.metrics_history`; it can be assigned like `.loss`"""
+        return {
+            key: self.metrics_history.get(self._history_key(key, 'analytic_mse'), [])
+            for key in ('train', 'valid')
+        }
 
-        :return: number of training epochs that have been run
-        :rtype: int
-        """
-        return len(self.loss['train'])
+    @analytic_mse.setter
+    def analytic_mse(self, history):
+        for key in ('train', 'valid'):
+            self.metrics_history[self._history_key(key, 'analytic_mse')] = history[key]
 
     def _auto_enforce(self, net, cond, *points):
         """Enforce condition on network with inputs.
@@ -401,137 +408,33 @@ class SphericalSolver:
         if self.enforcer:
             return self.enforcer(net, cond, points)
 
-        n_params = len(signature(cond.enforce).parameters)
-        points = points[:n_params - 1]
-        return cond.enforce(net, *points)
-
-    def _update_history(self, value, metric_type, key):
-        """Append a value to corresponding history list
-
-        :param value: value to be appended
-        :type value: float
-        :param metric_type: {'loss', 'analytic_mse'}; type of history metrics
-        :type metric_type: str
-        :param key: {'train', 'valid'}; dict key in self.loss / self.analytic_mse
-        :type key: str
-        """
-        self._phase = key
-        if metric_type == 'loss':
-            self.loss[key].append(value)
-        elif metric_type == 'analytic_mse':
-            self.analytic_mse[key].append(value)
-        else:
-            raise KeyError(f'history type = {metric_type} not understood')
-
-    def _update_train_history(self, value, metric_type):
-        """Append a value to corresponding training history list"""
-        self._update_history(value, metric_type, key='train')
+        return cond.enforce(net, *self._trim_points(cond, points))
 
-    def _update_valid_history(self, value, metric_type):
-        """Append a value to corresponding validation history list"""
-        self._update_history(value, metric_type, key='valid')
-
-    def _generate_batch(self, key):
-        """Generate the next batch, register in self._batch_examples and return the batch
+    @staticmethod
+    def _trim_points(cond, points):
+        """Keep as many points as `cond.enforce()` takes;
+        if it takes any number of them, keep as many as `cond.parameterize()` takes"""
+        for method in (cond.enforce, cond.parameterize):
+            params = signature(method).parameters.values()
+            if not any(p.kind == p.VAR_POSITIONAL for p in params):
+                return points[:len(params) - 1]
+        return points
+
+    def compute_func_val(self, *points):
+        """Compute the (re-parameterized) dependent variables at given points
 
-        :param key: {'train', 'valid'}; dict key in self._examples / self._batch_examples / self._batch_start
-        :type key: str
-        """
-        # the following side effects are helpful for future extension,
-        # especially for additional loss term that depends on the coordinates
-        self._phase = key
-        self._batch_examples[key] = [v.reshape(-1, 1) for v in self.generator[key].get_examples()]
-        return self._batch_examples[key]
-
-    def _generate_train_batch(self):
-        """Generate the next training batch, register in self._batch_examples and return"""
-        return self._generate_batch('train')
-
-    def _generate_valid_batch(self):
-        """Generate the next validation batch, register in self._batch_examples and return"""
-        return self._generate_batch('valid')
-
-    def _do_optimizer_step(self):
-        r"""Optimization procedures after gradients have been computed. Usually, self.optimizer.step() is sufficient.
-            At times, user can overwrite this method to perform gradient clipping, etc. Here is an example:
-        >>> import itertools
-        >>> class MySolver(SphericalSolver)
-        >>>     def _do_optimizer_step(self):
-        >>>         nn.utils.clip_grad_norm_(itertools.chain([net.parameters() for net in self.nets]), 1.0, 'inf')
-        >>>         self.optimizer.step()
+        :param points: a tuple of vectors, each with shape = (-1, 1)
+        :type points: tuple[torch.Tensor]
+        :return: values of the dependent variables, one for each condition
+        :rtype: list[torch.Tensor]
         """
-        self.optimizer.step()
-
-    def _run_epoch(self, key):
-        """Run an epoch on train/valid points, update history, and perform an optimization step if key=='train'
-        Note that the optimization step is only performed after all batches are run
-        This method doesn't resample points, which shall be handled in the `.fit()` call.
+        if self._fused_nets is not None and self.enforcer is None:
+            # none of the conditions overrides `enforce`, hence they all take the same points
+            points = self._trim_points(self.conditions[0], points)
+            return _enforce_on_fused_nets(self._fused_nets, self.conditions, *points)
+        return super(SphericalSolver, self).compute_func_val(*points)
 
-        :param key: {'train', 'valid'}; phase of the epoch
-        :type key: str
-        """
-        self._phase = key
-        epoch_loss = 0.0
-        epoch_analytic_mse = 0
-
-        # perform forward pass for all batches: a single graph is created and release in every iteration
-        # see https://discuss.pytorch.org/t/why-do-we-need-to-set-the-gradients-manually-to-zero-in-pytorch/4903/17
-        for batch_id in range(self.n_batches[key]):
-            batch = self._generate_batch(key)
-            funcs = [
-                self._auto_enforce(n, c, *batch) for n, c in zip(self.nets, self.conditions)
-            ]
-
-            if self.analytic_solutions is not None:
-                funcs_true = self.analytic_solutions(*batch)
-                for f_pred, f_true in zip(funcs, funcs_true):
-                    epoch_analytic_mse += ((f_pred - f_true) ** 2).mean().item()
-
-            residuals = self.pdes(*funcs, *batch)
-            residuals = torch.cat(residuals, dim=1)
-            loss = self.criterion(residuals) + self.additional_loss(funcs, key)
-
-            # normalize loss across batches
-            loss /= self.n_batches[key]
-
-            # accumulate gradients before the current graph is collected as garbage
-            if key == 'train':
-                loss.backward()
-            epoch_loss += loss.item()
-
-        # calculate mean loss of all batches and register to history
-        self._update_history(epoch_loss, 'loss', key)
-
-        # perform optimization step when training
-        if key == 'train':
-            self._do_optimizer_step()
-            self.optimizer.zero_grad()
-        # update lowest_loss and best_net when validating
-        else:
-            self._update_best()
-
-        # calculate mean analytic mse of all batches and register to history
-        if self.analytic_solutions is not None:
-            epoch_analytic_mse /= self.n_batches[key]
-            epoch_analytic_mse /= self.n_funcs
-            self._update_history(epoch_analytic_mse, 'analytic_mse', key)
-
-    def run_train_epoch(self):
-        """Run a training epoch, update history, and perform gradient descent"""
-        self._run_epoch('train')
-
-    def run_valid_epoch(self):
-        """Run a validation epoch and update history"""
-        self._run_epoch('valid')
-
-    def _update_best(self):
-        """Update self.lowest_loss and self.best_nets if current validation loss is lower than self.lowest_loss"""
-        current_loss = self.loss['valid'][-1]
-        if (self.lowest_loss is None) or current_loss < self.lowest_loss:
-            self.lowest_loss = current_loss
-            self.best_nets = deepcopy(self.nets)
-
-    def fit(self, max_epochs, callbacks=None, monitor=None):
+    def fit(self, max_epochs, callbacks=None, monitor=None, time_budget=None):
         r"""Run multiple epochs of training and validation, update best loss at the end of each epoch.
             This method does not return solution, which is done in the `.get_solution` method.
             If `callbacks` is passed, callbacks are run one at a time, after training, validating, updaing best model and before monitor checking
@@ -543,35 +446,27 @@ class SphericalSolver:
         :rtype monitor: `neurodiffeq.pde_spherical.MonitorSpherical`
         :param callbacks: a list of callback functions, each accepting the solver instance itself as its only argument
         :rtype callbacks: list[callable]
+        :param time_budget: if specified, the wall-clock budget of the training, in seconds;
+            see `neurodiffeq.solvers.BaseSolver.fit`
+        :type time_budget: float
         """
-        self._stop_training = False
-        self._max_local_epoch = max_epochs
+        callbacks = list(callbacks) if callbacks else []
 
         if monitor:
             warnings.warn("Monitor is deprecated, use a MonitorCallback instead")
 
-        for local_epoch in range(max_epochs):
-            # stops training if self._stop_training is set to True by a callback
-            if self._stop_training:
-                break
-
-            # register local epoch so it can be accessed by callbacks
-            self.local_epoch = local_epoch
-            self.run_train_epoch()
-            self.run_valid_epoch()
-
-            if callbacks:
-                for cb in callbacks:
-                    cb(self)
-
-            if monitor:
-                if (local_epoch + 1) % monitor.check_every == 0 or local_epoch == max_epochs - 1:
+            def monitor_callback(solver):
+                if (solver.local_epoch + 1) % monitor.check_every == 0 \
+                        or solver.local_epoch == solver._max_local_epoch - 1:
                     monitor.check(
-                        self.nets,
-                        self.conditions,
-                        loss_history=self.loss,
-                        analytic_mse_history=self.analytic_mse,
+                        solver.nets,
+                        solver.conditions,
+                        loss_history=solver.loss,
+                        analytic_mse_history=solver.analytic_mse,
                     )
+            callbacks.append(monitor_callback)
+
+        super(SphericalSolver, self).fit(max_epochs=max_epochs, callbacks=callbacks, time_budget=time_budget)
 
     def get_solution(self, copy=True, best=True, harmonics_fn=None):
         """Return a solution class
@@ -582,79 +477,30 @@ class SphericalSolver:
         :type best: bool
         :param harmonics_fn: if set, use it as function basis for returned solution
         :type harmonics_fn: callable
-        :return: trained solution
-        :rtype: `neurodiffeq.pde_spherical.SolutionSpherical`
+        :return: trained solution; one for each member in ensemble mode
+        :rtype: `neurodiffeq.pde_spherical.SolutionSpherical` or list[`neurodiffeq.pde_spherical.SolutionSpherical`]
         """
-        nets = self.best_nets if best else self.nets
-        conditions = self.conditions
-        if copy:
-            nets = deepcopy(nets)
-            conditions = deepcopy(conditions)
-
-        if harmonics_fn:
-            return SolutionSphericalHarmonics(nets, conditions, harmonics_fn=harmonics_fn)
-        else:
-            return SolutionSpherical(nets, conditions)
-
-    def get_internals(self, param_names, return_type='list'):
-        """Return internal variable(s) of the solver
-        If param_names == 'all', return all internal variables as a dict;
-        If param_names is single str, return the corresponding variables
-        If param_names is a list and return_type == 'list', return corresponding internal variables as a list
-        If param_names is a list and return_type == 'dict', return a dict with keys in param_names
-
-        :param param_names: a parameter name or a list of parameter names
-        :type param_names: str or list[str]
-        :param return_type: {'list', 'dict'}; ignored if `param_names` is a str
-        :type return_type: str
-        :return: a single parameter, or a list/dict of parameters as indicated above
-        :rtype: list or dict or any
-        """
-        # get internals according to provided param_names
-        available_params = {
+        conditions = deepcopy(self.conditions) if copy else self.conditions
+
+        def make_solution(single_net, nets):
+            # the solution holds its own copy of the networks
+            if harmonics_fn:
+                return SolutionSphericalHarmonics(nets, conditions, harmonics_fn=harmonics_fn)
+            else:
+                return SolutionSpherical(nets, conditions)
+
+        return self._get_solutions(make_solution, best)
+
+    def _get_internal_variables(self):
+        available_params = super(SphericalSolver, self)._get_internal_variables()
+        available_params.update({
             "analytic_mse": self.analytic_mse,
-            "analytic_solutions": self.analytic_solutions,
-            "n_batches": self.n_batches,
-            "best_nets": self.best_nets,
-            "criterion": self.criterion,
-            "conditions": self.conditions,
-            "global_epoch": self.global_epoch,
             "loss": self.loss,
-            "lowest_loss": self.lowest_loss,
-            "n_funcs": self.n_funcs,
-            "nets": self.nets,
-            "optimizer": self.optimizer,
             "pdes": self.pdes,
             "r_max": self.r_max,
             "r_min": self.r_min,
-            "generator": self.generator,
-        }
-
-        if param_names == "all":
-            return available_params
-
-        if isinstance(param_names, str):
-            return available_params[param_names]
-
-        if return_type == 'list':
-            return [available_params[name] for name in param_names]
-        elif return_type == "dict":
-            return {name: available_params[name] for name in param_names}
-        else:
-            raise ValueError(f"unrecognized return_type = {return_type}")
-
-    def additional_loss(self, funcs, key):
-        r"""Return additional loss; this method is to be overridden by subclasses
-            This method can use any of the internal variables: the current batch, the nets, the conditions, etc.
-
-        :param funcs: outputs of the networks after enforced by conditions
-        :type funcs: list[torch.Tensor]
-        :param key: {'train', 'valid'}; phase of the epoch; used to access the sample batch, etc.
-        :type key: str
-        :return: additional scalar loss
-        :rtype: torch.Tensor
-        """
-        return 0.0
+        })
+        return available_params
 
 
 class MonitorSpherical:
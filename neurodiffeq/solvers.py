@@ -0,0 +1,1354 @@
+import os
+import time
+import warnings
+import traceback
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from copy import deepcopy
+
+from .networks import FCNN, EnsembleNet, FusedNetList
+from .generators import Generator1D, Generator2D
+from .conditions import _enforce_on_single_net, _enforce_on_fused_nets, _overrides_enforce
+from .optimizers import LevenbergMarquardt, LinearLeastSquares, output_layer_parameters
+
+
+def _evaluate_metrics(metrics, args, needs_grad=None):
+    """Evaluate each metric function on `args`.
+    Metrics are evaluated under `torch.no_grad()`, so that no graph is recorded for them;
+    a metric that fails to be evaluated that way is evaluated again with gradients enabled,
+    and its name is added to `needs_grad` (if given) so that it's not tried under `torch.no_grad()` again.
+
+    :param metrics: metric functions, mapping names to functions
+    :type metrics: dict[str, callable]
+    :param args: arguments passed to every metric function, usually the dependent variables followed by the coordinates
+    :type args: tuple
+    :param needs_grad: names of metrics known to require gradients; updated in place; optional
+    :type needs_grad: set[str]
+    :return: value of each metric
+    :rtype: dict[str, torch.Tensor]
+    """
+    if needs_grad is None:
+        needs_grad = set()
+    values = {}
+    for name, fn in metrics.items():
+        if name not in needs_grad:
+            try:
+                with torch.no_grad():
+                    values[name] = fn(*args)
+                continue
+            except RuntimeError:
+                needs_grad.add(name)
+        values[name] = fn(*args)
+    return values
+
+
+def _requires_closure(optimizer):
+    """Whether `optimizer.step()` must be passed a closure that re-evaluates the loss, e.g. `torch.optim.LBFGS`"""
+    return isinstance(optimizer, (optim.LBFGS, LevenbergMarquardt, LinearLeastSquares))
+
+
+def _requires_residuals(optimizer):
+    """Whether the closure passed to `optimizer.step()` must return the residuals instead of the loss,
+    e.g. `neurodiffeq.optimizers.LevenbergMarquardt`"""
+    return isinstance(optimizer, (LevenbergMarquardt, LinearLeastSquares))
+
+
+def _backward_and_step(optimizer, loss, compute_loss):
+    """Back-propagate `loss` and perform an optimization step.
+    For optimizers requiring a closure, the closure re-evaluates the loss with `compute_loss` instead,
+    as many times as the optimizer needs (`loss` itself is not back-propagated then).
+
+    :param optimizer: the optimizer
+    :type optimizer: `torch.optim.Optimizer`
+    :param loss: scalar loss on the current batch
+    :type loss: torch.Tensor
+    :param compute_loss: function taking no argument and returning the loss on the same batch
+    :type compute_loss: callable
+    """
+    if _requires_residuals(optimizer):
+        raise ValueError(f"{optimizer.__class__.__name__} requires the residuals, which aren't available here")
+    if _requires_closure(optimizer):
+        def closure():
+            optimizer.zero_grad()
+            closure_loss = compute_loss()
+            closure_loss.backward()
+            return closure_loss
+        optimizer.step(closure)
+    else:
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+
+
+def _is_compile_error(error):
+    """Whether an error is raised by `torch.compile` or by the runtime of compiled graphs (e.g., when they're
+    differentiated twice, which derivatives in the residuals or metrics require),
+    rather than by the functions being compiled"""
+    dynamo_exc = getattr(getattr(torch, '_dynamo', None), 'exc', None)
+    if dynamo_exc is not None and isinstance(error, dynamo_exc.TorchDynamoException):
+        return True
+    # errors of compiled graphs pass through the compiler's runtime and are raised by PyTorch itself,
+    # while errors of the compiled functions are raised by their own code
+    frames = traceback.extract_tb(error.__traceback__)
+    torch_dir = os.path.dirname(torch.__file__)
+    compiler_dirs = [os.path.join(torch_dir, name) for name in ('_dynamo', '_functorch', '_inductor')]
+    return bool(frames) and frames[-1].filename.startswith(torch_dir) and any(
+        frame.filename.startswith(d) for frame in frames for d in compiler_dirs
+    )
+
+
+def _broadcast_inputs(*inputs):
+    """Convert the inputs of a solution (coordinates followed by parameters, if any) to tensors,
+    broadcast to a common shape"""
+    inputs = [x if isinstance(x, torch.Tensor) else torch.tensor(x, dtype=torch.get_default_dtype()) for x in inputs]
+    return torch.broadcast_tensors(*inputs)
+
+
+def _column_residuals(diff_eqs):
+    """Adapt a differential equation system whose residuals have any shape broadcastable against the points
+    (e.g. (-1,), (-1, 1) or a scalar) to one returning residuals with shape (-1, 1), as `BaseSolver` requires;
+    the function-style solvers accept any of them, as the criterion used to compare each residual against zeros.
+    """
+    def column_residuals(*args):
+        n_points = args[-1].shape[0]
+        residuals = []
+        for r in diff_eqs(*args):
+            r = torch.as_tensor(r, dtype=args[-1].dtype)
+            if r.numel() == 1:
+                r = r.reshape(1, 1).expand(n_points, 1)
+            residuals.append(r.reshape(n_points, -1))
+        return residuals
+    return column_residuals
+
+
+def _residual_criterion(criterion):
+    """Adapt a criterion taking an input and a target (e.g. `torch.nn.MSELoss()`) to a function
+    mapping the concatenated residuals to a scalar loss, by comparing each residual against zero and summing up.
+    """
+    def loss_fn(residuals):
+        return sum(criterion(r, torch.zeros_like(r)) for r in residuals.split(1, dim=1))
+    return loss_fn
+
+
+def _state_tensors(nets):
+    """Parameters and buffers of all networks in a fixed order, each counted once even if the networks share it"""
+    tensors, seen = [], set()
+    for net in nets:
+        for tensor in list(net.parameters()) + list(net.buffers()):
+            if id(tensor) not in seen:
+                seen.add(id(tensor))
+                tensors.append(tensor)
+    return tensors
+
+
+class _FlatSnapshot:
+    """A snapshot of the parameters and buffers of networks, kept in preallocated flat buffers (one per dtype),
+    so that taking a snapshot neither allocates memory nor copies the networks themselves.
+
+    :param nets: the networks
+    :type nets: list[`torch.nn.Module`]
+    """
+
+    def __init__(self, nets):
+        tensors = _state_tensors(nets)
+        self.numels = [t.numel() for t in tensors]
+        self.flat = {}
+        for t in tensors:
+            if t.dtype not in self.flat:
+                numel = sum(u.numel() for u in tensors if u.dtype == t.dtype)
+                self.flat[t.dtype] = torch.empty(numel, dtype=t.dtype, device=t.device)
+
+    def _groups(self, tensors):
+        if [t.numel() for t in tensors] != self.numels:
+            raise ValueError("The networks don't match those of the snapshot")
+        return {dtype: [t for t in tensors if t.dtype == dtype] for dtype in self.flat}
+
+    def save(self, nets):
+        """Copy the parameters and buffers of the networks into the snapshot"""
+        with torch.no_grad():
+            for dtype, tensors in self._groups(_state_tensors(nets)).items():
+                torch.cat([t.detach().reshape(-1) for t in tensors], out=self.flat[dtype])
+
+    def load(self, nets):
+        """Copy the snapshot into the parameters and buffers of the networks (which must be alike those saved)"""
+        with torch.no_grad():
+            for dtype, tensors in self._groups(_state_tensors(nets)).items():
+                for t, value in zip(tensors, self.flat[dtype].split([t.numel() for t in tensors])):
+                    t.copy_(value.view_as(t))
+
+
+def _update_duration(predicted, duration):
+    """Update the predicted duration of a recurring step with a newly measured one"""
+    return duration if predicted is None else max(duration, 0.7 * predicted + 0.3 * duration)
+
+
+class _TrainingLoop:
+    r"""The training loop shared by the solvers: it runs epochs of training and validation, keeps the history of the
+    loss and metrics and runs the callbacks. Subclasses implement `.run_train_epoch()` and `.run_valid_epoch()`,
+    which record the loss and metrics of an epoch with `._update_history()`.
+
+    :param optimizer: The optimizer used for training.
+    :type optimizer: `torch.optim.Optimizer`
+    :param metric_names: Names of the metrics recorded besides the loss.
+    :type metric_names: list[str]
+    """
+
+    def __init__(self, optimizer, metric_names=()):
+        self.optimizer = optimizer
+        # loss and metrics history
+        self.metrics_history = {self._history_key(key, 'loss'): [] for key in ('train', 'valid')}
+        for name in metric_names:
+            for key in ('train', 'valid'):
+                self.metrics_history[self._history_key(key, name)] = []
+        # local epoch in a `.fit` call, should only be modified inside self.fit()
+        self.local_epoch = 0
+        # maximum local epochs to run in a `.fit()` call, should only set by inside self.fit()
+        self._max_local_epoch = 0
+        # controls early stopping, should be set to False at the beginning of a `.fit()` call
+        # and optionally set to False by `callbacks` in `.fit()` to support early stopping
+        self._stop_training = False
+        # the _phase variable is registered for callback functions to access
+        self._phase = None
+
+    @property
+    def global_epoch(self):
+        """Global epoch count, always equal to the length of train loss history
+
+        :return: number of training epochs that have been run
+        :rtype: int
+        """
+        return len(self.metrics_history[self._history_key('train', 'loss')])
+
+    @staticmethod
+    def _history_key(key, name):
+        """Key in self.metrics_history under which a metric is recorded
+
+        :param key: {'train', 'valid'}; phase of the epoch
+        :type key: str
+        :param name: 'loss' or name of a metric
+        :type name: str
+        """
+        if name == 'loss':
+            return f'{key}_loss'
+        return f'{key}__{name}'
+
+    def _update_history(self, value, metric_type, key):
+        """Append a value to corresponding history list
+
+        :param value: value to be appended
+        :type value: float
+        :param metric_type: 'loss' or name of a metric
+        :type metric_type: str
+        :param key: {'train', 'valid'}; phase of the epoch
+        :type key: str
+        """
+        self._phase = key
+        self.metrics_history[self._history_key(key, metric_type)].append(value)
+
+    def _update_train_history(self, value, metric_type):
+        """Append a value to corresponding training history list"""
+        self._update_history(value, metric_type, key='train')
+
+    def _update_valid_history(self, value, metric_type):
+        """Append a value to corresponding validation history list"""
+        self._update_history(value, metric_type, key='valid')
+
+    def run_train_epoch(self):
+        """Run a training epoch, update history, and perform gradient descent"""
+        raise NotImplementedError  # pragma: no cover
+
+    def run_valid_epoch(self):
+        """Run a validation epoch and update history"""
+        raise NotImplementedError  # pragma: no cover
+
+    def _sync_flag(self, flag):
+        """Return a decision taken on the wall clock (in a time-budgeted `.fit()`);
+        overridden by solvers running in several processes, which must take the same decisions
+
+        :param flag: the decision of this process
+        :type flag: bool
+        :rtype: bool
+        """
+        return flag
+
+    def fit(self, max_epochs, callbacks=None, time_budget=None):
+        r"""Run multiple epochs of training and validation; solvers also update the best networks when validating.
+            This method does not return solution, which is done in the `.get_solution` method.
+            If `callbacks` is passed, callbacks are run one at a time, after training, validating and updating best model.
+            A callback function `cb(solver)` can set `solver._stop_training` to True to perform early stopping.
+
+        :param max_epochs: number of epochs to run; can be None if `time_budget` is specified
+        :type max_epochs: int
+        :param callbacks: a list of callback functions, each accepting the solver instance itself as its only argument
+        :rtype callbacks: list[callable]
+        :param time_budget: if specified, the wall-clock budget of the training, in seconds; the training stops
+            after an epoch if the next one (and validating both) is predicted, from the durations of the previous
+            epochs, not to fit in the budget.
+            In the last quarter of the budget, validation and callbacks are run less and less often: every 2nd epoch,
+            then every 4th epoch in the last eighth, and so on, but always after the last epoch.
+        :type time_budget: float
+        """
+        if max_epochs is None and time_budget is None:
+            raise ValueError('At least one of `max_epochs` and `time_budget` should be specified')
+        self._stop_training = False
+        self._max_local_epoch = max_epochs if max_epochs is not None else float('inf')
+        start = time.perf_counter()
+        # predicted durations of training and validating an epoch,
+        # exponential moving averages (or the last durations if they're longer)
+        train_time, valid_time = None, None
+
+        local_epoch = 0
+        while max_epochs is None or local_epoch < max_epochs:
+            # stops training if self._stop_training is set to True by a callback
+            if self._stop_training:
+                break
+
+            # register local epoch so it can be accessed by callbacks
+            self.local_epoch = local_epoch
+            epoch_start = time.perf_counter()
+            self.run_train_epoch()
+
+            check, last_epoch = True, False
+            if time_budget is not None:
+                train_time = _update_duration(train_time, time.perf_counter() - epoch_start)
+                remaining = time_budget - (time.perf_counter() - start)
+                # this epoch is the last one if the next one (and validating both) isn't predicted to fit in the budget;
+                # the last epoch is always validated, so that the best model is up to date
+                last_epoch = (max_epochs is not None and local_epoch == max_epochs - 1) \
+                    or train_time + 2 * (valid_time or 0.0) > remaining
+                check_every = 1 if remaining >= time_budget / 4 else \
+                    2 ** int(np.log2(time_budget / 4 / max(remaining, 1e-12)) + 1)
+                last_epoch = self._sync_flag(last_epoch)
+                check = last_epoch or self._sync_flag(local_epoch % check_every == 0)
+                if last_epoch:
+                    # callbacks acting upon the last epoch (e.g., checkpoints) see this one as the last
+                    self._max_local_epoch = local_epoch + 1
+
+            if check:
+                valid_start = time.perf_counter()
+                self.run_valid_epoch()
+                valid_time = _update_duration(valid_time, time.perf_counter() - valid_start)
+                if callbacks:
+                    for cb in callbacks:
+                        cb(self)
+
+            if last_epoch:
+                break
+            local_epoch += 1
+
+
+class BaseSolver(_TrainingLoop):
+    r"""A reusable training engine for (systems of) differential equations.
+    It keeps the networks, the optimizer and the training history as its state,
+    so that training can be resumed by calling `.fit()` repeatedly.
+    Subclasses only need to implement `.get_solution()` (and provide default generators, if any).
+
+    :param diff_eqs: The differential equation system to solve; maps a tuple of dependent variables
+        followed by a tuple of coordinates to a list of residuals, each with shape (-1, 1).
+    :type diff_eqs: callable
+    :param conditions: The initial/boundary conditions. The ith entry of the conditions is the condition that
+        the ith dependent variable should satisfy.
+    :type conditions: list[`neurodiffeq.conditions.BaseCondition`]
+    :param nets: The neural networks used to approximate the solution, one for each condition; optional.
+        Only one of `nets` and `single_net` should be specified.
+        If neither is specified, a `neurodiffeq.networks.FCNN` is created for each condition.
+    :type nets: list[`torch.nn.Module`]
+    :param single_net: A single multi-output network whose ith output unit approximates the ith dependent variable;
+        optional.
+    :type single_net: `torch.nn.Module`
+    :param train_generator: Generator for sampling training points,
+        must provide a `.get_examples()` method and a `.size` field.
+    :type train_generator: `neurodiffeq.generators.BaseGenerator`
+    :param valid_generator: Generator for sampling validation points,
+        must provide a `.get_examples()` method and a `.size` field.
+    :type valid_generator: `neurodiffeq.generators.BaseGenerator`
+    :param analytic_solutions: Analytic solutions to be compared with the neural network solutions;
+        maps a tuple of coordinates to a list of function values; optional.
+        If provided, the MSE against them is recorded as the `analytic_mse` metric.
+    :type analytic_solutions: callable
+    :param optimizer: The optimizer to be used for training, defaults to `torch.optim.Adam` with lr=0.001.
+        Optimizers whose `.step()` requires a closure (`torch.optim.LBFGS`,
+        `neurodiffeq.optimizers.LevenbergMarquardt`) are supported; for them, each training epoch performs a single
+        step on all the points sampled for the epoch (i.e., `batch_size` is ignored), as the line search needs a
+        deterministic objective. `neurodiffeq.optimizers.LevenbergMarquardt` minimizes the mean of squared residuals,
+        ignoring `criterion` and `additional_loss_term`.
+    :type optimizer: `torch.optim.Optimizer`
+    :param criterion: A function mapping the concatenated residuals (tensor with shape (-1, n_equations))
+        to a scalar loss, defaults to the mean of squared residuals.
+    :type criterion: callable
+    :param n_batches_train: Number of batches to train in every epoch, where batch-size equals `train_generator.size`.
+        Gradients of all batches are accumulated before a single optimization step. Defaults to 1.
+    :type n_batches_train: int
+    :param n_batches_valid: Number of batches to validate in every epoch,
+        where batch-size equals `valid_generator.size`. Defaults to 4.
+    :type n_batches_valid: int
+    :param metrics: Metrics to keep track of during training, as a dict mapping names to functions.
+        The functions take the same inputs as `diff_eqs` and return a scalar tensor. Defaults to None.
+        They are evaluated on the same function values as the loss, so they must not release the graph
+        (e.g., by calling `.backward()`); derivatives taken with `neurodiffeq.diff` are fine.
+    :type metrics: dict[str, callable]
+    :param additional_loss_term: Extra term to add to the loss; takes the same inputs as `diff_eqs`
+        and returns a scalar tensor. Defaults to None.
+    :type additional_loss_term: callable
+    :param batch_size: If specified, the points sampled for each training epoch are split into mini-batches of this size
+        and an optimization step is performed after every mini-batch (instead of accumulating `n_batches_train`
+        batches). Defaults to None.
+    :type batch_size: int
+    :param shuffle: Whether to shuffle the training points before splitting them into mini-batches;
+        only used when `batch_size` is specified. Defaults to False.
+    :type shuffle: bool
+    :param exact_epoch_loss: Whether to evaluate the training loss and metrics on all sampled points again
+        after the mini-batches of an epoch; otherwise, the sample-weighted average of the mini-batch losses
+        and metrics is recorded. Only used when `batch_size` is specified. Defaults to False.
+    :type exact_epoch_loss: bool
+    :param compile: Whether to compile the computation of the loss (networks, conditions, residuals and criterion)
+        with `torch.compile`, which can speed up training when the shapes of the batches are fixed.
+        If compilation fails (e.g., because the installed PyTorch doesn't support double backward through compiled
+        graphs, which derivatives in the residuals require), a warning is issued and the solver falls back to eager
+        execution for the rest of the training. Defaults to False.
+    :type compile: bool
+    :param ensemble_size: If specified, this many independent copies of the problem are trained at once,
+        e.g., with different initializations for uncertainty estimates. Each network is turned into an
+        `neurodiffeq.networks.EnsembleNet` of itself and `ensemble_size - 1` re-initialized copies, evaluated with
+        batched matrix multiplications, and `.get_solution()` returns a list of solutions, one for each member.
+        The recorded loss and metrics are averaged over the members. An `optimizer` passed along is usually created
+        on the parameters of the original networks, which only make up the first member; it's then rebuilt (with
+        the same hyperparameters) on the parameters of all members, with a warning. Defaults to None.
+    :type ensemble_size: int
+    :param ensemble_shared_points: Whether the members of the ensemble are trained on the same points;
+        otherwise, each member samples its own points from the generators. Defaults to True.
+    :type ensemble_shared_points: bool
+    :param fuse_nets: Whether to evaluate the networks (one for each condition) with a single vectorized call
+        (see `neurodiffeq.networks.FusedNetList`); only possible if they have identical architectures and no condition
+        overrides `.enforce()`. Note that differentiating one dependent variable (e.g., with `neurodiffeq.diff`)
+        then back-propagates through all networks, which makes residuals that differentiate each variable separately
+        slower to compute; fusing pays off when the networks are many and the derivatives few. Defaults to False,
+        because for the typical residuals (a first derivative of each variable) the fused evaluation is about
+        2 to 2.5 times slower per epoch on CPU than one call per network.
+    :type fuse_nets: bool
+    :param n_input_units: Number of input units of the default networks; only used when no network is provided.
+    :type n_input_units: int
+    """
+
+    def __init__(self, diff_eqs, conditions, nets=None, single_net=None, train_generator=None, valid_generator=None,
+                 analytic_solutions=None, optimizer=None, criterion=None, n_batches_train=1, n_batches_valid=4,
+                 metrics=None, additional_loss_term=None, batch_size=None, shuffle=False, exact_epoch_loss=False,
+                 compile=False, ensemble_size=None, ensemble_shared_points=True, fuse_nets=False,
+                 n_input_units=None):
+
+        if single_net is not None and nets is not None:
+            raise RuntimeError('Only one of net and nets should be specified')
+
+        self.diff_eqs = diff_eqs
+        self.conditions = conditions
+        self.n_funcs = len(conditions)
+        self.single_net = single_net
+        if single_net is not None:
+            # mark the conditions so that we know which condition correspond to which output unit
+            for ith, con in enumerate(conditions):
+                con.set_impose_on(ith)
+            self.nets = [single_net]
+        elif nets is None:
+            self.nets = [
+                FCNN(n_input_units=n_input_units, n_output_units=1, hidden_units=(32, 32), actv=nn.Tanh)
+                for _ in range(self.n_funcs)
+            ]
+        else:
+            self.nets = nets
+
+        self.ensemble_size = ensemble_size
+        self.ensemble_shared_points = ensemble_shared_points
+        if ensemble_size is not None:
+            self.nets = [EnsembleNet.from_net(net, ensemble_size) for net in self.nets]
+            if single_net is not None:
+                self.single_net = self.nets[0]
+
+        self._fused_nets = None
+        if fuse_nets:
+            if single_net is None and ensemble_size is None and len(self.nets) > 1 \
+                    and not any(_overrides_enforce(con) for con in conditions) and FusedNetList.can_fuse(self.nets):
+                self._fused_nets = FusedNetList(self.nets)
+            else:
+                warnings.warn("`fuse_nets` is ignored, as the networks can't be fused")
+
+        if train_generator is None or valid_generator is None:
+            raise ValueError(f"Both generators must be provided: "
+                             f"got train_generator={train_generator}, valid_generator={valid_generator}")
+
+        self.analytic_solutions = analytic_solutions
+        self.additional_loss_term = additional_loss_term
+
+        if optimizer is None:
+            all_params = []
+            for n in self.nets:
+                all_params += n.parameters()
+            self.optimizer = optim.Adam(all_params, lr=0.001)
+        else:
+            self.optimizer = optimizer
+            if ensemble_size is not None:
+                self._cover_ensemble(optimizer)
+
+        if criterion is None:
+            self.criterion = lambda residual_tensor: (residual_tensor ** 2).mean()
+        else:
+            self.criterion = criterion
+
+        self.metrics_fn = dict(metrics) if metrics else {}
+        if self.analytic_solutions is not None:
+            self.metrics_fn['analytic_mse'] = self._analytic_mse
+        # names of metrics that cannot be evaluated under `torch.no_grad()`
+        self._metrics_need_grad = set()
+
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.exact_epoch_loss = exact_epoch_loss
+        self.compile = compile
+        # compiled version of self._residual_loss, created upon first use
+        self._compiled_residual_loss = None
+        # whether a backward pass through the compiled graph has succeeded
+        self._compile_verified = False
+
+        def make_pair_dict(train=None, valid=None):
+            return {'train': train, 'valid': valid}
+
+        self.generator = make_pair_dict(train=train_generator, valid=valid_generator)
+        super(BaseSolver, self).__init__(self.optimizer, metric_names=self.metrics_fn)
+        # number of batches for training / validation;
+        self.n_batches = make_pair_dict(train=n_batches_train, valid=n_batches_valid)
+        # current batch of samples, kept for additional_loss term to use
+        self._batch_examples = make_pair_dict()
+        # snapshot of the parameters of the networks with lowest loss, materialized by `self.best_nets`
+        self._best_snapshot = None
+        self._best_nets = None
+        # current lowest loss
+        self.lowest_loss = None
+
+    def _auto_enforce(self, net, cond, *coordinates):
+        """Enforce condition on network with inputs. Subclasses can override this method to customize enforcement.
+
+        :param net: network for parameterized solution
+        :type net: torch.nn.Module
+        :param cond: condition (a.k.a. parameterization) for the network
+        :type cond: `neurodiffeq.conditions.BaseCondition`
+        :param coordinates: a tuple of vectors, each with shape = (-1, 1)
+        :type coordinates: tuple[torch.Tensor]
+        :return: function values at sampled points
+        :rtype: torch.Tensor
+        """
+        return cond.enforce(net, *coordinates)
+
+    def compute_func_val(self, *coordinates):
+        """Compute the (re-parameterized) dependent variables at given coordinates
+
+        :param coordinates: a tuple of vectors, each with shape = (-1, 1)
+        :type coordinates: tuple[torch.Tensor]
+        :return: values of the dependent variables, one for each condition
+        :rtype: list[torch.Tensor]
+        """
+        if self.single_net is not None:
+            # the forward pass of the single net is shared by all conditions
+            return _enforce_on_single_net(self.single_net, self.conditions, *coordinates)
+        if self._fused_nets is not None and type(self)._auto_enforce is BaseSolver._auto_enforce:
+            return _enforce_on_fused_nets(self._fused_nets, self.conditions, *coordinates)
+        return [self._auto_enforce(n, c, *coordinates) for n, c in zip(self.nets, self.conditions)]
+
+    def _analytic_mse(self, *args):
+        funcs, coordinates = args[:self.n_funcs], args[self.n_funcs:]
+        funcs_true = self.analytic_solutions(*coordinates)
+        return sum(((f_pred - f_true) ** 2).mean() for f_pred, f_true in zip(funcs, funcs_true)) / self.n_funcs
+
+    def _generate_batch(self, key):
+        """Generate the next batch, register in self._batch_examples and return the batch
+
+        :param key: {'train', 'valid'}; dict key in self.generator / self._batch_examples
+        :type key: str
+        """
+        # the following side effects are helpful for future extension,
+        # especially for additional loss term that depends on the coordinates
+        self._phase = key
+        batch = self._sample(key)
+        if self.ensemble_size is not None:
+            # the points of the members are concatenated, as expected by `EnsembleNet`
+            if self.ensemble_shared_points:
+                members = [batch] * self.ensemble_size
+            else:
+                members = [batch] + [self._sample(key) for _ in range(self.ensemble_size - 1)]
+            batch = [
+                torch.cat([m[i].detach() for m in members]).requires_grad_(v.requires_grad)
+                for i, v in enumerate(batch)
+            ]
+        self._batch_examples[key] = batch
+        return self._batch_examples[key]
+
+    def _sample(self, key):
+        """Sample points from the generator, each coordinate reshaped to (-1, 1)"""
+        examples = self.generator[key].get_examples()
+        if isinstance(examples, torch.Tensor):
+            examples = (examples,)
+        return [v.reshape(-1, 1) for v in examples]
+
+    def _generate_train_batch(self):
+        """Generate the next training batch, register in self._batch_examples and return"""
+        return self._generate_batch('train')
+
+    def _generate_valid_batch(self):
+        """Generate the next validation batch, register in self._batch_examples and return"""
+        return self._generate_batch('valid')
+
+    def _do_optimizer_step(self, closure=None):
+        r"""Optimization procedures after gradients have been computed. Usually, self.optimizer.step() is sufficient.
+            At times, user can overwrite this method to perform gradient clipping, etc. Here is an example:
+        >>> import itertools
+        >>> class MySolver(Solver1D)
+        >>>     def _do_optimizer_step(self, closure=None):
+        >>>         nn.utils.clip_grad_norm_(itertools.chain([net.parameters() for net in self.nets]), 1.0, 'inf')
+        >>>         self.optimizer.step(closure)
+
+        :param closure: A function that re-evaluates the loss and its gradients, and returns the loss;
+            only passed if the optimizer requires one (e.g., `torch.optim.LBFGS`).
+        :type closure: callable
+        """
+        if closure is None:
+            self.optimizer.step()
+        else:
+            self.optimizer.step(closure)
+
+    def _closure_step(self, batches, key='train'):
+        """Perform an optimization step with an optimizer requiring a closure;
+        the closure re-evaluates the loss (averaged over `batches`) and its gradients,
+        or the residuals (scaled such that their sum of squares is the mean of squared residuals) if the optimizer
+        requires them
+
+        :param batches: batches of points the loss is evaluated on
+        :type batches: list[list[torch.Tensor]]
+        :param key: {'train', 'valid'}; phase of the epoch
+        :type key: str
+        """
+        def closure():
+            self.optimizer.zero_grad()
+            total_loss = 0.0
+            for batch in batches:
+                # the additional loss term reads the current batch from self._batch_examples
+                self._batch_examples[key] = batch
+                loss = self._batch_loss(batch, key)[0] / len(batches)
+                loss = self._backward(loss, batch, key, scale=1 / len(batches))
+                total_loss += loss.item()
+            return torch.tensor(total_loss)
+
+        def residual_closure():
+            residuals = torch.cat([self._residuals(*batch)[0].reshape(-1) for batch in batches])
+            return residuals / residuals.numel() ** 0.5
+
+        self._do_optimizer_step(residual_closure if _requires_residuals(self.optimizer) else closure)
+        self.optimizer.zero_grad()
+
+    def _residual_loss(self, *coordinates):
+        """Compute the criterion of the residuals at given coordinates; this is the part of the loss that gets compiled
+
+        :param coordinates: a tuple of vectors, each with shape = (-1, 1)
+        :type coordinates: tuple[torch.Tensor]
+        :return: scalar loss, and the values of the dependent variables
+        :rtype: tuple[torch.Tensor, list[torch.Tensor]]
+        """
+        residuals, funcs = self._residuals(*coordinates)
+        return self.criterion(residuals), funcs
+
+    def _residuals(self, *coordinates):
+        """Compute the residuals of the differential equations at given coordinates
+
+        :param coordinates: a tuple of vectors, each with shape = (-1, 1)
+        :type coordinates: tuple[torch.Tensor]
+        :return: the residuals with shape (-1, n_equations), and the values of the dependent variables
+        :rtype: tuple[torch.Tensor, list[torch.Tensor]]
+        """
+        funcs = self.compute_func_val(*coordinates)
+        residuals = self.diff_eqs(*funcs, *coordinates)
+        return torch.cat(residuals, dim=1), funcs
+
+    def _compiled_loss(self, *coordinates):
+        """Run the compiled version of `self._residual_loss`, falling back to eager execution
+        (and setting `self.compile` to False) if compilation fails
+        """
+        if self._compiled_residual_loss is None:
+            if not hasattr(torch, 'compile'):
+                self._fall_back_to_eager("`torch.compile` is not available in this version of PyTorch")
+                return self._residual_loss(*coordinates)
+            # with dynamic=None, a batch of another shape (e.g., a smaller last mini-batch) triggers a single
+            # recompilation with dynamic shapes, instead of one recompilation for every new shape
+            self._compiled_residual_loss = torch.compile(self._residual_loss, dynamic=None)
+        try:
+            return self._compiled_residual_loss(*coordinates)
+        except Exception as e:
+            if not _is_compile_error(e):
+                raise
+            self._fall_back_to_eager(e)
+            return self._residual_loss(*coordinates)
+
+    def _fall_back_to_eager(self, reason):
+        """Warn about a failure of compilation and turn it off for the rest of the training"""
+        if isinstance(reason, Exception):
+            reason = f"{type(reason).__name__}: {reason}"
+        warnings.warn(f"Failed to compile the loss, falling back to eager mode: {reason}")
+        self.compile = False
+
+    def _backward(self, loss, batch, key, scale=1.0):
+        """Back-propagate the loss on a batch. Some failures of compiled graphs (e.g., double backward,
+        which derivatives in the residuals require) only surface in the backward pass; so the first backward pass
+        through a compiled graph is a probe, and if it fails, the loss is recomputed in eager mode and
+        back-propagated instead. The probe is run on the first batch of a training epoch, with no gradient
+        accumulated yet.
+
+        :param loss: scalar loss on the batch, multiplied by `scale`
+        :type loss: torch.Tensor
+        :param batch: coordinates of the points, each with shape (-1, 1)
+        :type batch: list[torch.Tensor]
+        :param key: {'train', 'valid'}; phase of the epoch
+        :type key: str
+        :param scale: the factor the loss has been multiplied by, defaults to 1
+        :type scale: float
+        :return: the loss that has been back-propagated
+        :rtype: torch.Tensor
+        """
+        if not self.compile or self._compile_verified:
+            loss.backward()
+            return loss
+        try:
+            loss.backward()
+        except Exception as e:
+            if not _is_compile_error(e):
+                raise
+            self._fall_back_to_eager(e)
+            # discard whatever the failed pass has accumulated
+            self.optimizer.zero_grad()
+            loss = self._batch_loss(batch, key)[0] * scale
+            loss.backward()
+            return loss
+        self._compile_verified = True
+        return loss
+
+    def _batch_loss(self, batch, key):
+        """Compute the loss on a batch of points
+
+        :param batch: coordinates of the points, each with shape (-1, 1)
+        :type batch: list[torch.Tensor]
+        :param key: {'train', 'valid'}; phase of the epoch
+        :type key: str
+        :return: scalar loss, and the values of the dependent variables (to be reused by metrics)
+        :rtype: tuple[torch.Tensor, list[torch.Tensor]]
+        """
+        if self.compile:
+            loss, funcs = self._compiled_loss(*batch)
+        else:
+            loss, funcs = self._residual_loss(*batch)
+        return loss + self.additional_loss(funcs, key), funcs
+
+    def _batch_metrics(self, funcs, batch):
+        """Compute the metrics on a batch of points, reusing the values of dependent variables computed for the loss.
+        This must be called before the graph of `funcs` is released by a backward pass.
+
+        :param funcs: values of the dependent variables on the batch
+        :type funcs: list[torch.Tensor]
+        :param batch: coordinates of the points, each with shape (-1, 1)
+        :type batch: list[torch.Tensor]
+        :return: value of each metric
+        :rtype: dict[str, float]
+        """
+        try:
+            values = _evaluate_metrics(self.metrics_fn, (*funcs, *batch), needs_grad=self._metrics_need_grad)
+        except Exception as e:
+            if not (self.compile and _is_compile_error(e)):
+                raise
+            # compiled graphs can't be differentiated twice, which some metrics involving derivatives require
+            warnings.warn(f"Failed to evaluate metrics on compiled graph, falling back to eager mode: "
+                          f"{type(e).__name__}: {e}")
+            self.compile = False
+            funcs = self.compute_func_val(*batch)
+            values = _evaluate_metrics(self.metrics_fn, (*funcs, *batch), needs_grad=self._metrics_need_grad)
+        return {name: value.item() for name, value in values.items()}
+
+    def _run_minibatch_epoch(self):
+        """Run a training epoch in mini-batch mode: the sampled points are split into mini-batches of `batch_size`,
+        and an optimization step is performed after every mini-batch.
+        The recorded loss and metrics are the sample-weighted averages over the mini-batches (each evaluated before
+        its optimization step), unless `exact_epoch_loss` is set, in which case they are evaluated on all
+        sampled points after the last step.
+        """
+        key = 'train'
+        batch = self._generate_batch(key)
+        # in ensemble mode, the mini-batches are made up of the same indices in the points of every member
+        n_members = self.ensemble_size or 1
+        n_examples = len(batch[0]) // n_members
+        idx = np.random.permutation(n_examples) if self.shuffle else np.arange(n_examples)
+        # optimizers with a line search (e.g., L-BFGS) take a single step on all points sampled for the epoch
+        use_closure = _requires_closure(self.optimizer)
+        batch_size = n_examples if use_closure else self.batch_size
+        epoch_loss = 0.0
+        epoch_metrics = {name: 0.0 for name in self.metrics_fn}
+
+        for batch_start in range(0, n_examples, batch_size):
+            batch_idx = idx[batch_start:batch_start + batch_size]
+            member_idx = (np.arange(n_members)[:, None] * n_examples + batch_idx).ravel()
+            # indexing records a graph, which the closure can't back-propagate through more than once
+            self._batch_examples[key] = batch if use_closure else [v[member_idx] for v in batch]
+            loss, funcs = self._batch_loss(self._batch_examples[key], key)
+
+            if not self.exact_epoch_loss:
+                weight = len(batch_idx) / n_examples
+                epoch_loss += loss.item() * weight
+                for name, value in self._batch_metrics(funcs, self._batch_examples[key]).items():
+                    epoch_metrics[name] += value * weight
+
+            if use_closure:
+                self._closure_step([self._batch_examples[key]], key)
+            else:
+                self.optimizer.zero_grad()
+                self._backward(loss, self._batch_examples[key], key)
+                self._do_optimizer_step()
+
+        self._batch_examples[key] = batch
+        if self.exact_epoch_loss:
+            loss, funcs = self._batch_loss(batch, key)
+            epoch_loss = loss.item()
+            epoch_metrics = self._batch_metrics(funcs, batch)
+
+        self._update_history(epoch_loss, 'loss', key)
+        for name, value in epoch_metrics.items():
+            self._update_history(value, name, key)
+
+    def _run_epoch(self, key):
+        """Run an epoch on train/valid points, update history, and perform an optimization step if key=='train'
+        Note that the optimization step is only performed after all batches are run
+        (unless `batch_size` is specified, see `._run_minibatch_epoch()`).
+        This method doesn't resample points, which shall be handled in the `.fit()` call.
+
+        :param key: {'train', 'valid'}; phase of the epoch
+        :type key: str
+        """
+        self._phase = key
+        if key == 'train' and self.batch_size is not None:
+            self._run_minibatch_epoch()
+            return
+
+        epoch_loss = 0.0
+        epoch_metrics = {name: 0.0 for name in self.metrics_fn}
+        # with an optimizer requiring a closure, gradients are computed inside the closure (on the same batches)
+        use_closure = key == 'train' and _requires_closure(self.optimizer)
+        batches = []
+
+        # perform forward pass for all batches: a single graph is created and release in every iteration
+        # see https://discuss.pytorch.org/t/why-do-we-need-to-set-the-gradients-manually-to-zero-in-pytorch/4903/17
+        for batch_id in range(self.n_batches[key]):
+            batch = self._generate_batch(key)
+            batches.append(batch)
+            loss, funcs = self._batch_loss(batch, key)
+            # normalize loss across batches
+            loss = loss / self.n_batches[key]
+
+            # metrics reuse the function values of the loss, before the graph is released by the backward pass
+            for name, value in self._batch_metrics(funcs, batch).items():
+                epoch_metrics[name] += value / self.n_batches[key]
+
+            # accumulate gradients before the current graph is collected as garbage
+            if key == 'train' and not use_closure:
+                loss = self._backward(loss, batch, key, scale=1 / self.n_batches[key])
+            epoch_loss += loss.item()
+
+        # calculate mean loss of all batches and register to history
+        self._update_history(epoch_loss, 'loss', key)
+
+        # perform optimization step when training
+        if use_closure:
+            self._closure_step(batches, key)
+        elif key == 'train':
+            self._do_optimizer_step()
+            self.optimizer.zero_grad()
+        # update lowest_loss and best_net when validating
+        else:
+            self._update_best()
+
+        for name, value in epoch_metrics.items():
+            self._update_history(value, name, key)
+
+    def run_train_epoch(self):
+        """Run a training epoch, update history, and perform gradient descent"""
+        self._run_epoch('train')
+
+    def run_valid_epoch(self):
+        """Run a validation epoch and update history"""
+        self._run_epoch('valid')
+
+    def _update_best(self):
+        """Update self.lowest_loss and the snapshot of the best networks
+        if current validation loss is lower than self.lowest_loss"""
+        current_loss = self.metrics_history[self._history_key('valid', 'loss')][-1]
+        if (self.lowest_loss is None) or current_loss < self.lowest_loss:
+            self.lowest_loss = current_loss
+            if self._best_snapshot is None:
+                self._best_snapshot = _FlatSnapshot(self.nets)
+            self._best_snapshot.save(self.nets)
+            self._best_nets = None
+
+    @property
+    def best_nets(self):
+        """Copies of the networks with the lowest validation loss so far (None before any validation),
+        built from the snapshot of their parameters upon the first access after every improvement"""
+        if self._best_snapshot is None:
+            return None
+        if self._best_nets is None:
+            self._best_nets = deepcopy(self.nets)
+            self._best_snapshot.load(self._best_nets)
+        return self._best_nets
+
+    def fit_least_squares(self, regularization=0.0, chunk_size=None, callbacks=None):
+        r"""Solve for the output layers of the networks with a single linear least-squares solve, keeping the hidden
+        layers frozen (as in extreme learning machines); this is exact for linear differential equations whose
+        conditions re-parameterize the network outputs in an affine way, which is the case for all built-in conditions.
+        The least-squares problem is assembled on the points of one training epoch (i.e., `n_batches_train` batches),
+        and the solve is recorded as a training epoch followed by a validation epoch.
+        The `criterion` and `additional_loss_term` are ignored by the solve, which minimizes the squared residuals.
+
+        :param regularization: The (Tikhonov) regularization strength of the output-layer parameters, defaults to 0.
+        :type regularization: float
+        :param chunk_size: If specified, the residual design matrix is assembled `chunk_size` rows at a time into
+            normal equations, to save memory. Defaults to None.
+        :type chunk_size: int
+        :param callbacks: a list of callback functions, each accepting the solver instance itself as its only argument
+        :rtype callbacks: list[callable]
+        """
+        optimizer = self.optimizer
+        self.optimizer = LinearLeastSquares(
+            output_layer_parameters(self.nets), regularization=regularization, chunk_size=chunk_size
+        )
+        try:
+            self.fit(max_epochs=1, callbacks=callbacks)
+        finally:
+            self.optimizer = optimizer
+
+    def _get_internal_variables(self):
+        """Return a dict of all internal variables that can be accessed by `.get_internals()`"""
+        return {
+            "analytic_solutions": self.analytic_solutions,
+            "n_batches": self.n_batches,
+            "criterion": self.criterion,
+            "conditions": self.conditions,
+            "diff_eqs": self.diff_eqs,
+            "global_epoch": self.global_epoch,
+            "lowest_loss": self.lowest_loss,
+            "metrics": self.metrics_fn,
+            "metrics_history": self.metrics_history,
+            "n_funcs": self.n_funcs,
+            "nets": self.nets,
+            "single_net": self.single_net,
+            "optimizer": self.optimizer,
+            "generator": self.generator,
+            "train_generator": self.generator['train'],
+            "valid_generator": self.generator['valid'],
+        }
+
+    def get_internals(self, param_names, return_type='list'):
+        """Return internal variable(s) of the solver
+        If param_names == 'all', return all internal variables as a dict;
+        If param_names is single str, return the corresponding variables
+        If param_names is a list and return_type == 'list', return corresponding internal variables as a list
+        If param_names is a list and return_type == 'dict', return a dict with keys in param_names
+
+        :param param_names: a parameter name or a list of parameter names
+        :type param_names: str or list[str]
+        :param return_type: {'list', 'dict'}; ignored if `param_names` is a str
+        :type return_type: str
+        :return: a single parameter, or a list/dict of parameters as indicated above
+        :rtype: list or dict or any
+        """
+        available_params = self._get_internal_variables()
+        # the best networks are built from their snapshot, hence only upon request
+        if param_names == "all" or "best_nets" in ([param_names] if isinstance(param_names, str) else param_names):
+            available_params["best_nets"] = self.best_nets
+
+        if param_names == "all":
+            return available_params
+
+        if isinstance(param_names, str):
+            return available_params[param_names]
+
+        if return_type == 'list':
+            return [available_params[name] for name in param_names]
+        elif return_type == "dict":
+            return {name: available_params[name] for name in param_names}
+        else:
+            raise ValueError(f"unrecognized return_type = {return_type}")
+
+    def additional_loss(self, funcs, key):
+        r"""Return additional loss; this method can be overridden by subclasses.
+            This method can use any of the internal variables: the current batch, the nets, the conditions, etc.
+            By default, `additional_loss_term` is evaluated on the current batch if it was specified.
+
+        :param funcs: outputs of the networks after enforced by conditions
+        :type funcs: list[torch.Tensor]
+        :param key: {'train', 'valid'}; phase of the epoch; used to access the sample batch, etc.
+        :type key: str
+        :return: additional scalar loss
+        :rtype: torch.Tensor
+        """
+        if self.additional_loss_term is None:
+            return 0.0
+        return self.additional_loss_term(*funcs, *self._batch_examples[key])
+
+    def get_solution(self, best=True):
+        """Return a solution class; to be implemented by subclasses
+
+        :param best: if True, return the solution with lowest validation loss instead of the solution after the last epoch
+        :type best: bool
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} doesn't implement `.get_solution()`")
+
+    def _get_solutions(self, make_solution, best):
+        """Build a solution with `make_solution(single_net, nets)`, which must hold its own copy of the networks,
+        or one solution for each member in ensemble mode;
+        if `best` is True, the snapshot of the best networks is loaded straight into those copies"""
+        if self.ensemble_size is None:
+            parts = [(self.single_net, None) if self.single_net is not None else (None, self.nets)]
+        elif self.single_net is not None:
+            parts = [(member, None) for member in self.single_net]
+        else:
+            parts = [(None, list(members)) for members in zip(*self.nets)]
+        solutions = [make_solution(single_net, nets) for single_net, nets in parts]
+
+        if best and self._best_snapshot is not None:
+            copies = [
+                [solution.single_net] if single_net is not None else solution.nets
+                for solution, (single_net, _) in zip(solutions, parts)
+            ]
+            if self.ensemble_size is not None:
+                # gather the copies of the members into networks alike those of the ensemble
+                copies = [nn.ModuleList(members) for members in zip(*copies)]
+            else:
+                copies = copies[0]
+            self._best_snapshot.load(copies)
+        return solutions if self.ensemble_size is not None else solutions[0]
+
+    def _cover_ensemble(self, optimizer):
+        """Rebuild an optimizer which doesn't optimize all members of the ensemble on the parameters of all of them"""
+        covered = {id(p) for group in optimizer.param_groups for p in group['params']}
+        if all(id(p) in covered for net in self.nets for p in net.parameters()):
+            return
+        if len(optimizer.param_groups) != 1:
+            raise ValueError("The optimizer doesn't optimize all members of the ensemble and can't be rebuilt, "
+                             "as it has several parameter groups; use `.set_optimizer()` instead")
+        warnings.warn(f"The {optimizer.__class__.__name__} optimizer doesn't optimize all members of the ensemble; "
+                      f"it's rebuilt on the parameters of all members")
+        self.set_optimizer(lambda params: optimizer.__class__(params, **optimizer.defaults))
+
+    def set_optimizer(self, optimizer_fn):
+        """Replace the optimizer by one created on the parameters of all networks of the solver
+        (in ensemble mode, those of all members)
+
+        :param optimizer_fn: Function mapping a list of parameters to an optimizer,
+            e.g., `lambda params: torch.optim.Adam(params, lr=1e-2)`.
+        :type optimizer_fn: callable
+        """
+        self.optimizer = optimizer_fn([p for net in self.nets for p in net.parameters()])
+
+
+class Solver1D(BaseSolver):
+    r"""A solver class for solving ODEs (or systems of ODEs) in one independent variable :math:`t`.
+
+    :param ode_system: The ODE system to solve; maps a tuple of dependent variables :math:`(x_1, \dots, x_n)`
+        followed by :math:`t` to a list of residuals.
+    :type ode_system: callable
+    :param conditions: The initial/boundary conditions. The ith entry of the conditions is the condition that
+        :math:`x_i` should satisfy.
+    :type conditions: list[`neurodiffeq.conditions.BaseCondition`]
+    :param t_min: The lower bound of the domain (t); only needed when train_generator or valid_generator are not specified.
+    :type t_min: float
+    :param t_max: The upper bound of the domain (t); only needed when train_generator or valid_generator are not specified.
+    :type t_max: float
+    :param n_params: Number of parameters of a parametric family of ODEs to be solved at once, defaults to 0.
+        If positive, both generators must be specified and yield the parameters after :math:`t`
+        (e.g., ``Generator1D(32, 0.0, 1.0) * ParameterGenerator(32, 0.5, 2.0)``); the parameters are then passed to
+        the networks, the conditions, and `ode_system` after :math:`t`,
+        and the solution is evaluated as ``solution(ts, params=(p_1, ..., p_k))``.
+    :type n_params: int
+    :param kwargs: Other arguments passed to `neurodiffeq.solvers.BaseSolver`.
+    """
+
+    def __init__(self, ode_system, conditions, t_min=None, t_max=None, train_generator=None, valid_generator=None,
+                 n_params=0, **kwargs):
+        if train_generator is None or valid_generator is None:
+            if n_params:
+                raise RuntimeError('Please specify train_generator and valid_generator (yielding the parameters '
+                                   'after the coordinates) for parametric problems')
+            if (t_min is None) or (t_max is None):
+                raise RuntimeError('Please specify t_min and t_max when train_generator or valid_generator '
+                                   'is not specified')
+        if train_generator is None:
+            train_generator = Generator1D(32, t_min, t_max, method='equally-spaced-noisy')
+        if valid_generator is None:
+            valid_generator = Generator1D(32, t_min, t_max, method='equally-spaced')
+
+        kwargs.setdefault('n_input_units', 1 + n_params)
+        super(Solver1D, self).__init__(
+            diff_eqs=ode_system, conditions=conditions,
+            train_generator=train_generator, valid_generator=valid_generator, **kwargs
+        )
+        self.t_min = t_min
+        self.t_max = t_max
+        self.n_params = n_params
+
+    def _get_internal_variables(self):
+        available_params = super(Solver1D, self)._get_internal_variables()
+        available_params.update({"t_min": self.t_min, "t_max": self.t_max, "n_params": self.n_params})
+        return available_params
+
+    def get_solution(self, best=True):
+        """Return a solution class
+
+        :param best: if True, return the solution with lowest validation loss instead of the solution after the last epoch
+        :type best: bool
+        :return: trained solution, holding its own copy of the nets and conditions; one for each member in ensemble mode
+        :rtype: `neurodiffeq.ode.Solution` or list[`neurodiffeq.ode.Solution`]
+        """
+        from .ode import Solution
+        return self._get_solutions(lambda single_net, nets: Solution(single_net, nets, self.conditions), best)
+
+
+class Solver2D(BaseSolver):
+    r"""A solver class for solving PDEs (or systems of PDEs) in two independent variables :math:`x` and :math:`y`.
+
+    :param pde_system: The PDE system to solve; maps a tuple of dependent variables :math:`(u_1, \dots, u_n)`
+        followed by :math:`x` and :math:`y` to a list of residuals.
+    :type pde_system: callable
+    :param conditions: The initial/boundary conditions. The ith entry of the conditions is the condition that
+        :math:`u_i` should satisfy.
+    :type conditions: list[`neurodiffeq.conditions.BaseCondition`]
+    :param xy_min: The lower bound of the 2 dimensions;
+        only needed when train_generator or valid_generator are not specified.
+    :type xy_min: tuple[float, float]
+    :param xy_max: The upper bound of the 2 dimensions;
+        only needed when train_generator or valid_generator are not specified.
+    :type xy_max: tuple[float, float]
+    :param n_params: Number of parameters of a parametric family of PDEs to be solved at once, defaults to 0.
+        If positive, both generators must be specified and yield the parameters after :math:`x` and :math:`y`
+        (e.g., ``Generator2D((32, 32)) * ParameterGenerator(1024, 0.5, 2.0)``); the parameters are then passed to
+        the networks, the conditions, and `pde_system` after :math:`x` and :math:`y`,
+        and the solution is evaluated as ``solution(xs, ys, params=(p_1, ..., p_k))``.
+    :type n_params: int
+    :param kwargs: Other arguments passed to `neurodiffeq.solvers.BaseSolver`.
+    """
+
+    def __init__(self, pde_system, conditions, xy_min=None, xy_max=None, train_generator=None, valid_generator=None,
+                 n_params=0, **kwargs):
+        if train_generator is None or valid_generator is None:
+            if n_params:
+                raise RuntimeError('Please specify train_generator and valid_generator (yielding the parameters '
+                                   'after the coordinates) for parametric problems')
+            if (xy_min is None) or (xy_max is None):
+                raise RuntimeError('Please specify xy_min and xy_max when train_generator or valid_generator '
+                                   'is not specified')
+        if train_generator is None:
+            train_generator = Generator2D((32, 32), xy_min, xy_max, method='equally-spaced-noisy')
+        if valid_generator is None:
+            valid_generator = Generator2D((32, 32), xy_min, xy_max, method='equally-spaced')
+
+        kwargs.setdefault('n_input_units', 2 + n_params)
+        super(Solver2D, self).__init__(
+            diff_eqs=pde_system, conditions=conditions,
+            train_generator=train_generator, valid_generator=valid_generator, **kwargs
+        )
+        self.xy_min = xy_min
+        self.xy_max = xy_max
+        self.n_params = n_params
+
+    def _get_internal_variables(self):
+        available_params = super(Solver2D, self)._get_internal_variables()
+        available_params.update({"xy_min": self.xy_min, "xy_max": self.xy_max, "n_params": self.n_params})
+        return available_params
+
+    def get_solution(self, best=True):
+        """Return a solution class
+
+        :param best: if True, return the solution with lowest validation loss instead of the solution after the last epoch
+        :type best: bool
+        :return: trained solution, holding its own copy of the nets and conditions; one for each member in ensemble mode
+        :rtype: `neurodiffeq.pde.Solution` or list[`neurodiffeq.pde.Solution`]
+        """
+        from .pde import Solution
+        return self._get_solutions(lambda single_net, nets: Solution(single_net, nets, self.conditions), best)
+
+
+class SwitchOptimizerCallback:
+    """A callback that replaces the optimizer of a solver once, typically to switch from a first-order optimizer
+    (e.g., Adam) used as a warm-up to a quasi-Newton one (e.g., L-BFGS).
+    The switch happens after `switch_epoch` global epochs, or as soon as the training loss has plateaued,
+    whichever comes first.
+
+    :param optimizer_fn: Function mapping a list of parameters to the new optimizer; defaults to
+        `torch.optim.LBFGS` with lr=1, max_iter=20, history_size=50 and the strong-Wolfe line search.
+    :type optimizer_fn: callable
+    :param switch_epoch: Number of global epochs after which to switch; optional.
+    :type switch_epoch: int
+    :param patience: Switch if the training loss hasn't decreased by a relative amount of `rel_tol`
+        in the last `patience` epochs; optional.
+    :type patience: int
+    :param rel_tol: Relative decrease of the training loss considered as an improvement, defaults to 1e-3.
+    :type rel_tol: float
+    """
+
+    def __init__(self, optimizer_fn=None, switch_epoch=None, patience=None, rel_tol=1e-3):
+        if switch_epoch is None and patience is None:
+            raise ValueError('At least one of `switch_epoch` and `patience` should be specified')
+        if optimizer_fn is None:
+            def optimizer_fn(params):
+                return optim.LBFGS(params, lr=1.0, max_iter=20, history_size=50, line_search_fn='strong_wolfe')
+        self.optimizer_fn = optimizer_fn
+        self.switch_epoch = switch_epoch
+        self.patience = patience
+        self.rel_tol = rel_tol
+        self.switched = False
+
+    def _plateaued(self, solver):
+        if self.patience is None:
+            return False
+        losses = solver.metrics_history[solver._history_key('train', 'loss')]
+        if len(losses) <= self.patience:
+            return False
+        reference = losses[-self.patience - 1]
+        return reference - min(losses[-self.patience:]) < self.rel_tol * abs(reference)
+
+    def __call__(self, solver):
+        if self.switched:
+            return
+        if (self.switch_epoch is not None and solver.global_epoch >= self.switch_epoch) or self._plateaued(solver):
+            # the new optimizer trains the same parameters as the current one
+            params = [p for group in solver.optimizer.param_groups for p in group['params']]
+            solver.optimizer = self.optimizer_fn(params)
+            self.switched = True
+
+
+class EarlyStoppingCallback:
+    """A callback that stops the training once the loss hasn't improved by more than `min_delta`
+    for `patience` epochs. Only the epochs of the current `.fit()` call are considered;
+    if the validation is thinned out (see the `time_budget` of `.fit()`), only the validated ones.
+
+    :param patience: Number of epochs without improvement after which to stop.
+    :type patience: int
+    :param min_delta: Minimal decrease of the lowest loss considered as an improvement, defaults to 0.
+    :type min_delta: float
+    :param key: {'train', 'valid'}; the loss to watch, defaults to 'valid'.
+    :type key: str
+    """
+
+    def __init__(self, patience, min_delta=0.0, key='valid'):
+        if patience < 1:
+            raise ValueError(f"`patience` must be positive, got {patience}")
+        self.patience = patience
+        self.min_delta = min_delta
+        self.key = key
+        self._start = 0
+
+    def __call__(self, solver):
+        losses = solver.metrics_history[solver._history_key(self.key, 'loss')]
+        # where the history of the current `.fit()` call starts
+        if solver.local_epoch == 0:
+            self._start = len(losses) - 1
+        losses = losses[self._start:]
+        if len(losses) <= self.patience:
+            return
+        if min(losses[-self.patience:]) >= min(losses[:-self.patience]) - self.min_delta:
+            solver._stop_training = True
+
+
+class PlateauCallback:
+    """A callback that detects plateaus of the loss smoothed by an exponential moving average (EMA),
+    which is robust to the noise of losses evaluated on resampled points.
+    A plateau is detected when the EMA hasn't decreased by a relative amount of `rel_tol` in the last `patience` epochs;
+    the training is stopped then, unless an `action` is specified.
+    The EMA restarts with every `.fit()` call.
+
+    :param patience: Number of epochs over which the EMA must decrease.
+    :type patience: int
+    :param rel_tol: Relative decrease of the EMA considered as an improvement, defaults to 1e-3.
+    :type rel_tol: float
+    :param smoothing: The smoothing factor :math:`\\beta` of the EMA :math:`m_t = \\beta m_{t-1} + (1 - \\beta) l_t`,
+        defaults to 0.9.
+    :type smoothing: float
+    :param key: {'train', 'valid'}; the loss to watch, defaults to 'train'.
+    :type key: str
+    :param action: Function called with the solver upon a plateau, e.g. to lower the learning rate;
+        the detection restarts afterwards. Defaults to None, i.e., stopping the training.
+    :type action: callable
+    """
+
+    def __init__(self, patience, rel_tol=1e-3, smoothing=0.9, key='train', action=None):
+        if patience < 1:
+            raise ValueError(f"`patience` must be positive, got {patience}")
+        if not 0 <= smoothing < 1:
+            raise ValueError(f"`smoothing` must be in [0, 1), got {smoothing}")
+        self.patience = patience
+        self.rel_tol = rel_tol
+        self.smoothing = smoothing
+        self.key = key
+        self.action = action
+        self.ema = []
+        self._n_seen = 0
+
+    def __call__(self, solver):
+        losses = solver.metrics_history[solver._history_key(self.key, 'loss')]
+        if solver.local_epoch == 0:
+            self.ema, self._n_seen = [], len(losses) - 1
+        for loss in losses[self._n_seen:]:
+            self.ema.append(loss if not self.ema else self.smoothing * self.ema[-1] + (1 - self.smoothing) * loss)
+        self._n_seen = len(losses)
+
+        if len(self.ema) <= self.patience:
+            return
+        reference = self.ema[-self.patience - 1]
+        if reference - min(self.ema[-self.patience:]) < self.rel_tol * abs(reference):
+            if self.action is None:
+                solver._stop_training = True
+            else:
+                self.action(solver)
+                self.ema = self.ema[-1:]
+
+
+class LRSchedulerCallback:
+    """A callback that steps a learning rate scheduler of `torch.optim.lr_scheduler` after every epoch.
+    A `torch.optim.lr_scheduler.ReduceLROnPlateau` is passed the loss.
+
+    :param scheduler: The scheduler, or a function mapping an optimizer to a scheduler, which is called with the
+        optimizer of the solver upon the first epoch and whenever the optimizer is replaced
+        (e.g., by a `SwitchOptimizerCallback`), which is needed if the solver creates its own optimizer.
+        A scheduler created by the function is first stepped after the next epoch, so that its schedule starts with
+        the epoch following its creation. A scheduler passed as such is no longer stepped (with a warning) once the
+        optimizer is replaced, since it would no longer affect the training.
+    :type scheduler: `torch.optim.lr_scheduler.LRScheduler` or `torch.optim.lr_scheduler.ReduceLROnPlateau` or callable
+    :param key: {'train', 'valid'}; the loss passed to a `torch.optim.lr_scheduler.ReduceLROnPlateau`,
+        defaults to 'valid'.
+    :type key: str
+    """
+
+    def __init__(self, scheduler, key='valid'):
+        if hasattr(scheduler, 'optimizer'):
+            self.scheduler, self.scheduler_fn = scheduler, None
+        else:
+            self.scheduler, self.scheduler_fn = None, scheduler
+        self.key = key
+        self._detached = False
+
+    def __call__(self, solver):
+        if self.scheduler_fn is not None and (
+                self.scheduler is None or self.scheduler.optimizer is not solver.optimizer):
+            # the optimizer hasn't been stepped since, so the scheduler starts with its initial learning rate
+            self.scheduler = self.scheduler_fn(solver.optimizer)
+            return
+        if self.scheduler.optimizer is not solver.optimizer:
+            if not self._detached:
+                warnings.warn("The optimizer of the solver has been replaced, and the scheduler won't be stepped "
+                              "anymore; pass a function creating the scheduler instead")
+                self._detached = True
+            return
+        if isinstance(self.scheduler, optim.lr_scheduler.ReduceLROnPlateau):
+            self.scheduler.step(solver.metrics_history[solver._history_key(self.key, 'loss')][-1])
+        else:
+            self.scheduler.step()
@@ -0,0 +1,216 @@
+import os
+import time
+import warnings
+import itertools
+import dill
+import numpy as np
+import pandas as pd
+import torch
+from multiprocessing import Manager
+from concurrent.futures import ProcessPoolExecutor
+
+
+class TrialPruned(Exception):
+    r"""Raised by ``Trial.report`` to stop a trial whose validation loss trails the median of the other trials."""
+    pass
+
+
+class Trial:
+    r"""A trial of a hyperparameter sweep, passed to the objective by ``neurodiffeq.sweep.run_sweep``.
+    It reports the validation loss during training, and prunes the trial if it trails the median.
+
+    :param number: The number of the trial.
+    :type number: int
+    :param params: The hyperparameters of the trial.
+    :type params: dict
+    :param reports: Validation losses reported by all trials so far, as (trial number, epoch, loss) tuples;
+        shared by all trials of a sweep.
+    :type reports: list
+    :param prune_after: Number of epochs :math:`k`; at epochs :math:`k, 2k, \dots`, the trial is pruned if its validation
+        loss is larger than the median of those of the other trials at the same epoch. Defaults to None (no pruning).
+    :type prune_after: int, optional
+    :param min_trials: Minimal number of other trials that must have reported a loss at the same epoch for pruning,
+        defaults to 2.
+    :type min_trials: int, optional
+    """
+
+    def __init__(self, number, params, reports, prune_after=None, min_trials=2):
+        self.number = number
+        self.params = params
+        self.reports = reports
+        self.prune_after = prune_after
+        self.min_trials = min_trials
+        self.last_epoch = 0
+        self.last_loss = None
+
+    def report(self, epoch, loss):
+        r"""Report the validation loss after an epoch; raises ``TrialPruned`` if the trial should be pruned.
+
+        :param epoch: Number of epochs trained so far.
+        :type epoch: int
+        :param loss: The validation loss.
+        :type loss: float
+        """
+        self.last_epoch, self.last_loss = epoch, float(loss)
+        if not self.prune_after or epoch % self.prune_after != 0:
+            return
+        others = [value for number, e, value in list(self.reports) if e == epoch and number != self.number]
+        self.reports.append((self.number, epoch, self.last_loss))
+        if len(others) >= self.min_trials and self.last_loss > np.median(others):
+            raise TrialPruned(f"Trial {self.number} pruned at epoch {epoch}")
+
+    def callback(self, solver):
+        r"""A callback reporting the validation loss of a solver (e.g., a ``SphericalSolver``) after every epoch,
+        to be passed to its ``.fit()`` method.
+
+        :param solver: The solver.
+        :type solver: `neurodiffeq.solvers.BaseSolver`
+        """
+        valid_loss = solver.metrics_history[solver._history_key('valid', 'loss')]
+        self.report(len(valid_loss), valid_loss[-1])
+
+    def monitor(self):
+        r"""A monitor reporting the validation loss after every epoch,
+        to be passed as the `monitor` of the function-style solvers, i.e., ``neurodiffeq.ode.solve``,
+        ``neurodiffeq.pde.solve2D``, ``neurodiffeq.pde_spherical.solve_spherical`` and the like.
+
+        :return: The monitor.
+        :rtype: `neurodiffeq.sweep.PruningMonitor`
+        """
+        return PruningMonitor(self)
+
+
+class PruningMonitor:
+    r"""A monitor reporting the validation loss to a ``Trial`` whenever it's checked;
+    it accepts the arguments of the monitors of all function-style solvers.
+
+    :param trial: The trial.
+    :type trial: `neurodiffeq.sweep.Trial`
+    """
+
+    def __init__(self, trial):
+        self.trial = trial
+        self.check_every = 1
+
+    def check(self, *args, **kwargs):
+        # the spherical solvers pass loss_history={'train': ..., 'valid': ...}, others pass the history of the solver
+        if 'loss_history' in kwargs:
+            valid_loss = kwargs['loss_history']['valid']
+        else:
+            valid_loss = next(arg['valid_loss'] for arg in args if isinstance(arg, dict) and 'valid_loss' in arg)
+        self.trial.report(len(valid_loss), valid_loss[-1])
+
+
+def _sample_params(space, n_trials, seed):
+    if n_trials is None:
+        if any(callable(values) for values in space.values()):
+            raise ValueError("A grid can't be made of a space with callables; specify `n_trials` for a random search")
+        names = list(space.keys())
+        return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+    rng = np.random.default_rng(seed)
+    return [
+        {name: values(rng) if callable(values) else values[rng.integers(len(values))] for name, values in space.items()}
+        for _ in range(n_trials)
+    ]
+
+
+def _init_worker(n_threads):
+    torch.set_num_threads(n_threads)
+
+
+def _run_trials_in_process(payloads, n_threads):
+    """Run the trials one after another in the current process,
+    whose random number generators and number of threads are restored afterwards"""
+    n_threads_before, np_state = torch.get_num_threads(), np.random.get_state()
+    torch.set_num_threads(n_threads)
+    try:
+        with torch.random.fork_rng():
+            reports = []
+            return [_run_trial(payload, reports) for payload in payloads]
+    finally:
+        torch.set_num_threads(n_threads_before)
+        np.random.set_state(np_state)
+
+
+def _run_trial(payload, reports):
+    objective, number, params, prune_after, min_trials, seed = dill.loads(payload)
+    torch.manual_seed(seed + number)
+    np.random.seed(seed + number)
+    trial = Trial(number, params, reports, prune_after=prune_after, min_trials=min_trials)
+    start = time.time()
+    try:
+        score, status, error = objective(params, trial), 'complete', None
+    except TrialPruned:
+        score, status, error = trial.last_loss, 'pruned', None
+    except Exception as e:
+        score, status, error = None, 'failed', f"{type(e).__name__}: {e}"
+    return dict(
+        trial=number, **params, status=status, score=None if score is None else float(score),
+        epochs=trial.last_epoch, time=time.time() - start, error=error,
+    )
+
+
+def run_sweep(objective, space, n_trials=None, n_workers=None, n_threads=None, prune_after=None, min_trials=2,
+              results_path=None, seed=0):
+    r"""Run a hyperparameter sweep, with trials in a pool of processes.
+
+    :param objective: The function to minimize, mapping the hyperparameters (a dict) and a ``Trial`` to a score,
+        usually the final validation loss. To allow pruning, it must pass the validation loss to the trial, by
+        passing ``trial.callback`` to the ``.fit()`` of a solver (e.g., a ``SphericalSolver``), or ``trial.monitor()``
+        as the `monitor` of a function-style solver (e.g., ``neurodiffeq.ode.solve``), or by calling
+        ``trial.report(epoch, loss)``. It's sent to the processes with ``dill``.
+    :type objective: callable
+    :param space: The hyperparameter space, mapping names to lists of values, or, for a random search, to functions
+        sampling a value given a ``numpy.random.Generator``, e.g., ``lambda rng: 10 ** rng.uniform(-4, -2)``.
+    :type space: dict
+    :param n_trials: Number of trials of a random search, where the values are sampled uniformly from the lists.
+        Defaults to None, i.e., a search over the grid of all combinations of values.
+    :type n_trials: int, optional
+    :param n_workers: Number of worker processes, defaults to the number of CPUs.
+        If 0, the trials are run one after another in the current process,
+        whose random number generators and number of threads are restored afterwards.
+    :type n_workers: int, optional
+    :param n_threads: Number of threads for PyTorch operations in every worker (or in the current process),
+        defaults to an even share of the CPUs.
+    :type n_threads: int, optional
+    :param prune_after: Number of epochs :math:`k`; at epochs :math:`k, 2k, \dots`, a trial is pruned if its validation
+        loss is larger than the median of those reported by the other trials at the same epoch. Defaults to None.
+    :type prune_after: int, optional
+    :param min_trials: Minimal number of other trials that must have reported a loss at the same epoch for pruning,
+        defaults to 2.
+    :type min_trials: int, optional
+    :param results_path: If set, the results table is written to this path as CSV, defaults to None.
+    :type results_path: str, optional
+    :param seed: The seed of the random search; trial `i` is run with the random seed `seed + i`. Defaults to 0.
+    :type seed: int, optional
+    :return: The results table, sorted by score, with a row for each trial holding its number, its hyperparameters,
+        its status ('complete', 'pruned' or 'failed'), its score (the last reported loss for a pruned trial),
+        the number of epochs reported, the time taken and the error of a failed trial.
+    :rtype: `pandas.DataFrame`
+    """
+    all_params = _sample_params(space, n_trials, seed)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_threads is None:
+        n_threads = max(1, (os.cpu_count() or 1) // max(n_workers, 1))
+
+    payloads = [
+        dill.dumps((objective, number, params, prune_after, min_trials, seed))
+        for number, params in enumerate(all_params)
+    ]
+    if n_workers:
+        with Manager() as manager, ProcessPoolExecutor(n_workers, initializer=_init_worker,
+                                                       initargs=(n_threads,)) as executor:
+            reports = manager.list()
+            rows = list(executor.map(_run_trial, payloads, [reports] * len(payloads)))
+    else:
+        rows = _run_trials_in_process(payloads, n_threads)
+
+    for row in rows:
+        if row['status'] == 'failed':
+            warnings.warn(f"Trial {row['trial']} failed: {row['error']}")
+
+    results = pd.DataFrame(rows).sort_values('score', na_position='last').reset_index(drop=True)
+    if results_path is not None:
+        results.to_csv(results_path, index=False)
+    return results
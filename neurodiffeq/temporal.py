@@ -5,6 +5,7 @@
 # Use x and t for distinguish values for x or t; Use xx and tt when corresponding entries of xx and tt are
 # supposed to be paired to represent a point. ([xx, tt] is often the Cartesian product of x and t)
 from abc import ABC, abstractmethod
+import time
 import torch
 import numpy as np
 import matplotlib
@@ -12,6 +13,9 @@ import matplotlib.cm as cm
 import matplotlib.pyplot as plt
 import matplotlib.tri as tri
 from copy import deepcopy
+from .generators import BaseGenerator, _sample_box_surface
+from .networks import SeparableFCNN
+from .solvers import _TrainingLoop, _evaluate_metrics, _requires_closure, _backward_and_step
 
 # return the Cartesian product of x and t.
 def _cartesian_prod_dims(x, t, x_grad=True, t_grad=True):
@@ -22,6 +26,104 @@ def _cartesian_prod_dims(x, t, x_grad=True, t_grad=True):
     tt.requires_grad = t_grad
     return xx, tt
 
+
+class TensorProductBatch:
+    """A set of collocation points that is the Cartesian product of several factors.
+    Instead of only keeping the (paired) coordinates of every point,
+    it also keeps the factors, so that a separable network (`networks.SeparableFCNN`) can be evaluated on the
+    whole grid by running each of its sub-networks on the factors only.
+
+    :param factors: The factors of the product. Each factor is either a 1-D tensor (e.g. :math:`t`),
+        or a tuple of 1-D tensors of the same length that represent paired coordinates (e.g. :math:`(x, y)`).
+    :type factors: `torch.Tensor` or tuple[`torch.Tensor`]
+    :param requires_grad: Whether the coordinates of the grid points require gradient.
+        Can be specified for each factor separately, defaults to True.
+    :type requires_grad: bool or tuple[bool]
+    """
+
+    def __init__(self, *factors, requires_grad=True):
+        self.factors = tuple(tuple(f) if isinstance(f, (tuple, list)) else (f,) for f in factors)
+        self.shape = tuple(len(f[0]) for f in self.factors)
+        if isinstance(requires_grad, bool):
+            requires_grad = (requires_grad,) * len(self.factors)
+        self.requires_grad = tuple(requires_grad)
+
+        grids = torch.meshgrid(*(torch.arange(n) for n in self.shape), indexing='ij')
+        self.indices = tuple(g.flatten() for g in grids)
+        # coordinates of every point on the grid, in the same order as `_cartesian_prod_dims`
+        self.grid_coords = tuple(
+            tuple(c.detach()[idx].requires_grad_(rg) for c in factor)
+            for factor, idx, rg in zip(self.factors, self.indices, self.requires_grad)
+        )
+
+    @property
+    def coords(self):
+        """Flattened coordinates of the grid points, e.g. ``(xx, yy, tt)``"""
+        return tuple(c for group in self.grid_coords for c in group)
+
+    @property
+    def points(self):
+        """Flattened coordinates of the factors, e.g. ``(x, y, t)``"""
+        return tuple(c for factor in self.factors for c in factor)
+
+    def __len__(self):
+        return int(np.prod(self.shape))
+
+    def select(self, dim, idx):
+        """Return the sub-product where the ``dim``-th factor is restricted to the entries ``idx``.
+
+        :param dim: Index of the factor to restrict.
+        :type dim: int
+        :param idx: Indices of the entries to keep.
+        :type idx: `torch.Tensor`
+        :rtype: `temporal.TensorProductBatch`
+        """
+        dim = dim % len(self.factors)
+        factors = list(self.factors)
+        factors[dim] = tuple(c[idx] for c in factors[dim])
+        return TensorProductBatch(*factors, requires_grad=self.requires_grad)
+
+    def network_output(self, network):
+        """Evaluate a `networks.SeparableFCNN` on the grid.
+
+        :param network: The separable network, with one axis group per factor.
+        :type network: `networks.SeparableFCNN`
+        :return: The output of the network on the grid points, with shape (len(self), n_output_units).
+        :rtype: `torch.Tensor`
+        """
+        factor_inputs = [torch.stack([c.detach() for c in factor], dim=1) for factor in self.factors]
+        grid_inputs = [torch.stack(group, dim=1) for group in self.grid_coords]
+        return network.forward_grid(factor_inputs, grid_inputs, self.indices)
+
+
+def _is_separable(approximator):
+    return isinstance(getattr(approximator, 'single_network', None), SeparableFCNN)
+
+
+# evaluate the network on paired coordinates, or on a tensor product batch if one is given
+def _network_output(network, coords, batch=None):
+    if batch is not None:
+        return batch.network_output(network)
+    return network(torch.cat(coords, dim=1))
+
+
+# mean of squared residuals, where the residuals at each time are weighted by the exponential of minus `tolerance` times
+# the (detached) sum of the mean squared residuals at all earlier times, so that later times are only fitted once
+# the solution is accurate at earlier times (causal training, see Wang, Sankaran & Perdikaris, 2022)
+def _causal_mse(residuals, tt, tolerance):
+    times, inverse = torch.unique(tt.detach().reshape(-1), return_inverse=True)
+    squared = residuals.reshape(-1) ** 2
+    per_time = squared.new_zeros(len(times)).index_add(0, inverse, squared) / torch.bincount(inverse)
+    earlier = torch.cumsum(per_time.detach(), dim=0) - per_time.detach()
+    return torch.mean(torch.exp(-tolerance * earlier) * per_time)
+
+
+def _equation_mse(residuals, tt, causal_tolerance):
+    if causal_tolerance is None:
+        return torch.mean(residuals ** 2)
+    return _causal_mse(residuals, tt, causal_tolerance)
+
+
 class Approximator(ABC):
     """The base class of approximators. An approximator is an approximation of the
     differential equation's solution. It knows the parameters in the neural network, 
@@ -43,6 +145,14 @@ class Approximator(ABC):
     def calculate_metrics(self):
         raise NotImplementedError  # pragma: no cover
 
+    def calculate_loss_and_metrics(self, *args, **kwargs):
+        """Calculate the loss and the metrics on the same points.
+        The positional arguments are those of `calculate_metrics`, i.e., those of `calculate_loss` followed by the metrics.
+        Subclasses can override this method to evaluate the approximation only once for both.
+        """
+        *args, metrics = args
+        return self.calculate_loss(*args, **kwargs), self.calculate_metrics(*args, metrics, **kwargs)
+
 
 class SingleNetworkApproximator1DSpatialTemporal(Approximator):
     """An approximator to approximate the solution of a 1D time-dependent problem.
@@ -50,7 +160,9 @@ class SingleNetworkApproximator1DSpatialTemporal(Approximator):
     and the initial condition will be enforced by transforming the output of the
     neural network.
 
-    :param single_network: A neural network with 2 input nodes (x, t) and 1 output node
+    :param single_network: A neural network with 2 input nodes (x, t) and 1 output node.
+        If it is a `networks.SeparableFCNN` with ``axis_dims=(1, 1)``,
+        the network is evaluated on the Cartesian product of x and t using only one pass on each factor.
     :type single_network: `torch.nn.Module`
     :param pde: The PDE to solve. If the PDE is :math:`F(u, x, t) = 0` then `pde` 
         should be a function that maps :math:`(u, x, t)` to :math:`F(u, x, t)`.
@@ -62,28 +174,37 @@ class SingleNetworkApproximator1DSpatialTemporal(Approximator):
     :param boundary_strictness: The regularization parameter, defaults to 1.
         a larger regularization parameter enforces the boundary conditions more strictly.
     :type boundary_strictness: float
+    :param causal_tolerance: If specified, the residuals at each time :math:`t_i` are weighted by
+        :math:`\exp\left(-\epsilon \sum_{t_j < t_i} L(t_j)\right)`, where :math:`\epsilon` is `causal_tolerance`
+        and :math:`L(t_j)` is the mean squared residual at time :math:`t_j`; so that late times are fitted only
+        after early times are (i.e., training respects causality). Defaults to None (no weighting).
+    :type causal_tolerance: float
     """
-    def __init__(self, single_network, pde, initial_condition, boundary_conditions, boundary_strictness=1.):
+    def __init__(self, single_network, pde, initial_condition, boundary_conditions, boundary_strictness=1.,
+                 causal_tolerance=None):
         self.single_network = single_network
         self.pde = pde
         self.initial_condition = initial_condition
         self.boundary_conditions = boundary_conditions
         self.boundary_strictness = boundary_strictness
+        self.causal_tolerance = causal_tolerance
 
-    def __call__(self, xx, tt):
+    def __call__(self, xx, tt, batch=None):
         xx = torch.unsqueeze(xx, dim=1)
         tt = torch.unsqueeze(tt, dim=1)
-        xt = torch.cat((xx, tt), dim=1)
-        uu = torch.exp(-tt) * self.initial_condition.u0(xx) + (1 - torch.exp(-tt)) * self.single_network(xt)
+        network_output = _network_output(self.single_network, (xx, tt), batch=batch)
+        uu = torch.exp(-tt) * self.initial_condition.u0(xx) + (1 - torch.exp(-tt)) * network_output
         return torch.squeeze(uu)
 
     def parameters(self):
         return self.single_network.parameters()
 
-    def calculate_loss(self, xx, tt, x, t):
-        uu = self.__call__(xx, tt)
+    def calculate_loss(self, xx, tt, x, t, batch=None):
+        uu = self.__call__(xx, tt, batch=batch)
+        return self._loss(uu, xx, tt, t)
 
-        equation_mse = torch.mean(self.pde(uu, xx, tt)**2)
+    def _loss(self, uu, xx, tt, t):
+        equation_mse = _equation_mse(self.pde(uu, xx, tt), tt, self.causal_tolerance)
 
         boundary_mse = self.boundary_strictness * sum(self._boundary_mse(t, bc) for bc in self.boundary_conditions)
 
@@ -92,17 +213,24 @@ class SingleNetworkApproximator1DSpatialTemporal(Approximator):
     def _boundary_mse(self, t, bc):
         x = next(bc.points_generator)
 
-        xx, tt = _cartesian_prod_dims(x, t, x_grad=True, t_grad=False)
-        uu = self.__call__(xx, tt)
+        if _is_separable(self):
+            batch = TensorProductBatch(x, t, requires_grad=(True, False))
+            xx, tt = batch.coords
+        else:
+            batch = None
+            xx, tt = _cartesian_prod_dims(x, t, x_grad=True, t_grad=False)
+        uu = self.__call__(xx, tt, batch=batch)
         return torch.mean(bc.form(uu, xx, tt)**2)
 
-    def calculate_metrics(self, xx, tt, x, t, metrics):
-        uu = self.__call__(xx, tt)
+    def calculate_metrics(self, xx, tt, x, t, metrics, batch=None):
+        uu = self.__call__(xx, tt, batch=batch)
 
-        return {
-            metric_name: metric_func(uu, xx, tt)
-            for metric_name, metric_func in metrics.items()
-        }
+        return _evaluate_metrics(metrics, (uu, xx, tt))
+
+    def calculate_loss_and_metrics(self, xx, tt, x, t, metrics, batch=None):
+        uu = self.__call__(xx, tt, batch=batch)
+
+        return self._loss(uu, xx, tt, t), _evaluate_metrics(metrics, (uu, xx, tt))
 
 
 class SingleNetworkApproximator2DSpatial(Approximator):
@@ -138,7 +266,9 @@ class SingleNetworkApproximator2DSpatial(Approximator):
 
     def calculate_loss(self, xx, yy):
         uu = self.__call__(xx, yy)
+        return self._loss(uu, xx, yy)
 
+    def _loss(self, uu, xx, yy):
         equation_mse = torch.mean(self.pde(uu, xx, yy)**2)
 
         boundary_mse = self.boundary_strictness * sum(self._boundary_mse(bc) for bc in self.boundary_conditions)
@@ -153,10 +283,12 @@ class SingleNetworkApproximator2DSpatial(Approximator):
     def calculate_metrics(self, xx, yy, metrics):
         uu = self.__call__(xx, yy)
 
-        return {
-            metric_name: metric_func(uu, xx, yy)
-            for metric_name, metric_func in metrics.items()
-        }
+        return _evaluate_metrics(metrics, (uu, xx, yy))
+
+    def calculate_loss_and_metrics(self, xx, yy, metrics):
+        uu = self.__call__(xx, yy)
+
+        return self._loss(uu, xx, yy), _evaluate_metrics(metrics, (uu, xx, yy))
 
 
 class SingleNetworkApproximator2DSpatialSystem(Approximator):
@@ -195,7 +327,9 @@ class SingleNetworkApproximator2DSpatialSystem(Approximator):
 
     def calculate_loss(self, xx, yy):
         uu = self.__call__(xx, yy)
+        return self._loss(uu, xx, yy)
 
+    def _loss(self, uu, xx, yy):
         equation_mse = sum(
             torch.mean(eq**2)
             for eq in self.pde(*uu, xx, yy)
@@ -213,10 +347,12 @@ class SingleNetworkApproximator2DSpatialSystem(Approximator):
     def calculate_metrics(self, xx, yy, metrics):
         uu = self.__call__(xx, yy)
 
-        return {
-            metric_name: metric_func(*uu, xx, yy)
-            for metric_name, metric_func in metrics.items()
-        }
+        return _evaluate_metrics(metrics, (*uu, xx, yy))
+
+    def calculate_loss_and_metrics(self, xx, yy, metrics):
+        uu = self.__call__(xx, yy)
+
+        return self._loss(uu, xx, yy), _evaluate_metrics(metrics, (*uu, xx, yy))
 
 
 class SingleNetworkApproximator2DSpatialTemporal(Approximator):
@@ -226,6 +362,8 @@ class SingleNetworkApproximator2DSpatialTemporal(Approximator):
     neural network.
 
     :param single_network: A neural network with 3 input nodes (x, y, t) and 1 output node.
+        If it is a `networks.SeparableFCNN` with ``axis_dims=(2, 1)``,
+        the network is evaluated on the Cartesian product of (x, y) and t using only one pass on each factor.
     :type single_network: `torch.nn.Module`
     :param pde: The PDE system to solve. If the PDE is :math:`F(u, x, y, t) = 0`
         then `pde` should be a function that maps :math:`(u, x, y, t)` to :math:`F(u, x, y, t)`.
@@ -237,34 +375,43 @@ class SingleNetworkApproximator2DSpatialTemporal(Approximator):
     :param boundary_strictness: The regularization parameter, defaults to 1.
         a larger regularization parameter enforces the boundary conditions more strictly.
     :type boundary_strictness: float
+    :param causal_tolerance: If specified, the residuals at each time :math:`t_i` are weighted by
+        :math:`\exp\left(-\epsilon \sum_{t_j < t_i} L(t_j)\right)`, where :math:`\epsilon` is `causal_tolerance`
+        and :math:`L(t_j)` is the mean squared residual at time :math:`t_j`; so that late times are fitted only
+        after early times are (i.e., training respects causality). Defaults to None (no weighting).
+    :type causal_tolerance: float
     """
-    def __init__(self, single_network, pde, initial_condition, boundary_conditions, boundary_strictness=1.):
+    def __init__(self, single_network, pde, initial_condition, boundary_conditions, boundary_strictness=1.,
+                 causal_tolerance=None):
         self.single_network = single_network
         self.pde = pde
         self.u0 = initial_condition.u0
         self.u0dot = initial_condition.u0dot if hasattr(initial_condition, 'u0dot') else None
         self.boundary_conditions = boundary_conditions
         self.boundary_strictness = boundary_strictness
+        self.causal_tolerance = causal_tolerance
 
-    def __call__(self, xx, yy, tt):
+    def __call__(self, xx, yy, tt, batch=None):
         xx = torch.unsqueeze(xx, dim=1)
         yy = torch.unsqueeze(yy, dim=1)
         tt = torch.unsqueeze(tt, dim=1)
-        xyt = torch.cat((xx, yy, tt), dim=1)
+        network_output = _network_output(self.single_network, (xx, yy, tt), batch=batch)
         if self.u0dot is None:
-            uu = torch.exp(-tt) * self.u0(xx, yy) + (1 - torch.exp(-tt)) * self.single_network(xyt)
+            uu = torch.exp(-tt) * self.u0(xx, yy) + (1 - torch.exp(-tt)) * network_output
         else:
             # not sure about this line
-            uu = (1 - (1 - torch.exp(-tt))**2) * self.u0(xx, yy) + (1 - torch.exp(-tt)) * self.u0dot(xx, yy) + (1 - torch.exp(-tt))**2 * self.single_network(xyt)
+            uu = (1 - (1 - torch.exp(-tt))**2) * self.u0(xx, yy) + (1 - torch.exp(-tt)) * self.u0dot(xx, yy) + (1 - torch.exp(-tt))**2 * network_output
         return torch.squeeze(uu)
 
     def parameters(self):
         return self.single_network.parameters()
 
-    def calculate_loss(self, xx, yy, tt, x, y, t):
-        uu = self.__call__(xx, yy, tt)
+    def calculate_loss(self, xx, yy, tt, x, y, t, batch=None):
+        uu = self.__call__(xx, yy, tt, batch=batch)
+        return self._loss(uu, xx, yy, tt, t)
 
-        equation_mse = torch.mean(self.pde(uu, xx, yy, tt)**2)
+    def _loss(self, uu, xx, yy, tt, t):
+        equation_mse = _equation_mse(self.pde(uu, xx, yy, tt), tt, self.causal_tolerance)
 
         boundary_mse = self.boundary_strictness * sum(self._boundary_mse(t, bc) for bc in self.boundary_conditions)
 
@@ -273,18 +420,108 @@ class SingleNetworkApproximator2DSpatialTemporal(Approximator):
     def _boundary_mse(self, t, bc):
         x, y = next(bc.points_generator)
 
-        xx, tt = _cartesian_prod_dims(x, t, x_grad=True, t_grad=False)
-        yy, tt = _cartesian_prod_dims(y, t, x_grad=True, t_grad=False)
-        uu = self.__call__(xx, yy, tt)
+        if _is_separable(self):
+            batch = TensorProductBatch((x, y), t, requires_grad=(True, False))
+            xx, yy, tt = batch.coords
+        else:
+            batch = None
+            xx, tt = _cartesian_prod_dims(x, t, x_grad=True, t_grad=False)
+            yy, tt = _cartesian_prod_dims(y, t, x_grad=True, t_grad=False)
+        uu = self.__call__(xx, yy, tt, batch=batch)
         return torch.mean(bc.form(uu, xx, yy, tt) ** 2)
 
-    def calculate_metrics(self, xx, yy, tt, x, y, t, metrics):
-        uu = self.__call__(xx, yy, tt)
+    def calculate_metrics(self, xx, yy, tt, x, y, t, metrics, batch=None):
+        uu = self.__call__(xx, yy, tt, batch=batch)
 
-        return {
-            metric_name: metric_func(uu, xx, yy, tt)
-            for metric_name, metric_func in metrics.items()
-        }
+        return _evaluate_metrics(metrics, (uu, xx, yy, tt))
+
+    def calculate_loss_and_metrics(self, xx, yy, tt, x, y, t, metrics, batch=None):
+        uu = self.__call__(xx, yy, tt, batch=batch)
+
+        return self._loss(uu, xx, yy, tt, t), _evaluate_metrics(metrics, (uu, xx, yy, tt))
+
+
+class SingleNetworkApproximator3DSpatialTemporal(Approximator):
+    """An approximator to approximate the solution of a 3D time-dependent problem.
+    The boundary condition will be enforced by a regularization term in the loss function
+    and the initial condition will be enforced by transforming the output of the
+    neural network.
+
+    :param single_network: A neural network with 4 input nodes (x, y, z, t) and 1 output node.
+        If it is a `networks.SeparableFCNN` with ``axis_dims=(3, 1)``,
+        the network is evaluated on the Cartesian product of (x, y, z) and t using only one pass on each factor.
+    :type single_network: `torch.nn.Module`
+    :param pde: The PDE to solve. If the PDE is :math:`F(u, x, y, z, t) = 0`
+        then `pde` should be a function that maps :math:`(u, x, y, z, t)` to :math:`F(u, x, y, z, t)`.
+    :type pde: function
+    :param initial_condition: A first order initial condition, whose ``u0`` (and ``u0dot``) maps
+        :math:`(x, y, z)` to the initial value (and initial derivative w.r.t. time)
+    :type initial_condition: `temporal.FirstOrderInitialCondition` or `temporal.SecondOrderInitialCondition`
+    :param boundary_conditions: A list of boundary conditions, whose ``points_generator`` generate :math:`(x, y, z)`
+    :type boundary_conditions: list[`temporal.BoundaryCondition`]
+    :param boundary_strictness: The regularization parameter, defaults to 1.
+        a larger regularization parameter enforces the boundary conditions more strictly.
+    :type boundary_strictness: float
+    :param causal_tolerance: If specified, the residuals at each time :math:`t_i` are weighted by
+        :math:`\exp\left(-\epsilon \sum_{t_j < t_i} L(t_j)\right)`, where :math:`\epsilon` is `causal_tolerance`
+        and :math:`L(t_j)` is the mean squared residual at time :math:`t_j`; so that late times are fitted only
+        after early times are (i.e., training respects causality). Defaults to None (no weighting).
+    :type causal_tolerance: float
+    """
+    def __init__(self, single_network, pde, initial_condition, boundary_conditions, boundary_strictness=1.,
+                 causal_tolerance=None):
+        self.single_network = single_network
+        self.pde = pde
+        self.u0 = initial_condition.u0
+        self.u0dot = initial_condition.u0dot if hasattr(initial_condition, 'u0dot') else None
+        self.boundary_conditions = boundary_conditions
+        self.boundary_strictness = boundary_strictness
+        self.causal_tolerance = causal_tolerance
+
+    def __call__(self, xx, yy, zz, tt, batch=None):
+        xx = torch.unsqueeze(xx, dim=1)
+        yy = torch.unsqueeze(yy, dim=1)
+        zz = torch.unsqueeze(zz, dim=1)
+        tt = torch.unsqueeze(tt, dim=1)
+        network_output = _network_output(self.single_network, (xx, yy, zz, tt), batch=batch)
+        if self.u0dot is None:
+            uu = torch.exp(-tt) * self.u0(xx, yy, zz) + (1 - torch.exp(-tt)) * network_output
+        else:
+            uu = (1 - (1 - torch.exp(-tt))**2) * self.u0(xx, yy, zz) + (1 - torch.exp(-tt)) * self.u0dot(xx, yy, zz) + (1 - torch.exp(-tt))**2 * network_output
+        return torch.squeeze(uu)
+
+    def parameters(self):
+        return self.single_network.parameters()
+
+    def calculate_loss(self, xx, yy, zz, tt, x, y, z, t, batch=None):
+        uu = self.__call__(xx, yy, zz, tt, batch=batch)
+        return self._loss(uu, xx, yy, zz, tt, t)
+
+    def _loss(self, uu, xx, yy, zz, tt, t):
+        equation_mse = _equation_mse(self.pde(uu, xx, yy, zz, tt), tt, self.causal_tolerance)
+
+        boundary_mse = self.boundary_strictness * sum(self._boundary_mse(t, bc) for bc in self.boundary_conditions)
+
+        return equation_mse + boundary_mse
+
+    def _boundary_mse(self, t, bc):
+        x, y, z = next(bc.points_generator)
+
+        boundary_batch = TensorProductBatch((x, y, z), t, requires_grad=(True, False))
+        batch = boundary_batch if _is_separable(self) else None
+        xx, yy, zz, tt = boundary_batch.coords
+        uu = self.__call__(xx, yy, zz, tt, batch=batch)
+        return torch.mean(bc.form(uu, xx, yy, zz, tt) ** 2)
+
+    def calculate_metrics(self, xx, yy, zz, tt, x, y, z, t, metrics, batch=None):
+        uu = self.__call__(xx, yy, zz, tt, batch=batch)
+
+        return _evaluate_metrics(metrics, (uu, xx, yy, zz, tt))
+
+    def calculate_loss_and_metrics(self, xx, yy, zz, tt, x, y, z, t, metrics, batch=None):
+        uu = self.__call__(xx, yy, zz, tt, batch=batch)
+
+        return self._loss(uu, xx, yy, zz, tt, t), _evaluate_metrics(metrics, (uu, xx, yy, zz, tt))
 
 
 class FirstOrderInitialCondition:
@@ -344,10 +581,49 @@ class BoundaryCondition:
         self.points_generator = points_generator
 
 
-def generator_1dspatial(size, x_min, x_max, random=True):
-    """Return a generator that generates 1D points range from x_min to x_max
+class _SeededGenerator(BaseGenerator):
+    """Base class for the samplers in this module. A seeded instance owns an explicit ``torch.Generator``
+    (on the default device), so that sampling is reproducible and the sampler (including its RNG state) can be pickled.
 
-    :param size: number of points to generated when `__next__` is invoked
+    :param seed: Seed of the random number generator.
+        If not specified, the global random number generator is used, which is seeded by ``torch.manual_seed``.
+    :type seed: int, optional
+    """
+
+    def __init__(self, seed=None):
+        super(_SeededGenerator, self).__init__()
+        self.seed = seed
+        self.rng = None if seed is None else self._make_rng()
+        if seed is not None:
+            self.rng.manual_seed(seed)
+
+    @staticmethod
+    def _make_rng():
+        return torch.Generator(device=torch.empty(0).device)
+
+    def _rand(self, size):
+        return torch.rand(size, generator=self.rng)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['rng'] = None if self.rng is None else self.rng.get_state()
+        return state
+
+    def __setstate__(self, state):
+        state = state.copy()
+        rng_state = state.pop('rng')
+        self.__dict__.update(state)
+        self.rng = None
+        if rng_state is not None:
+            self.rng = self._make_rng()
+            self.rng.set_state(rng_state)
+
+
+class Generator1DSpatial(_SeededGenerator):
+    """A generator that generates 1D points range from x_min to x_max.
+    The interval is divided into ``size`` cells of equal length and one point is sampled from each cell.
+
+    :param size: number of points to generated when `get_examples` (or `__next__`) is invoked
     :type size: int
     :param x_min: Lower bound of x
     :type x_min: float
@@ -356,25 +632,84 @@ def generator_1dspatial(size, x_min, x_max, random=True):
     :param random: If set to False, then return eqally spaced points range from
         x_min to x_max. If set to True then generate points randomly. Defaults to True
     :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
     """
-    seg_len = (x_max-x_min) / size
-    linspace_lo = x_min + seg_len*0.5
-    linspace_hi = x_max - seg_len*0.5
-    center = torch.linspace(linspace_lo, linspace_hi, size)
-    noise_lo = -seg_len*0.5
-    while True:
-        if random:
-            noise = seg_len*torch.rand(size) + noise_lo
-            yield center + noise
-        else:
-            yield center
 
+    def __init__(self, size, x_min, x_max, random=True, seed=None):
+        super(Generator1DSpatial, self).__init__(seed=seed)
+        self.size = size
+        self.x_min, self.x_max = x_min, x_max
+        self.random = random
+        self.seg_len = (x_max - x_min) / size
+        self.center = torch.linspace(x_min + self.seg_len * 0.5, x_max - self.seg_len * 0.5, size)
 
-def generator_2dspatial_segment(size, start, end, random=True):
-    """Return a generator that generates 2D points in a line segment.
+    def get_examples(self):
+        if self.random:
+            return self.center + self.seg_len * (self._rand(self.size) - 0.5)
+        return self.center
 
-    :param size: number of points to generated when `__next__` is invoked
+
+class GeneratorTemporal(Generator1DSpatial):
+    """A generator that generates 1D points range from t_min to t_max.
+    The interval is divided into ``size`` cells of equal length and one point is sampled from each cell.
+
+    :param size: number of points to generated when `get_examples` (or `__next__`) is invoked
+    :type size: int
+    :param t_min: Lower bound of t
+    :type t_min: float
+    :param t_max: Upper bound of t
+    :type t_max: float
+    :param random: If set to False, then return eqally spaced points range from
+        t_min to t_max. If set to True then generate points randomly. Defaults to True
+    :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
+    """
+
+    def __init__(self, size, t_min, t_max, random=True, seed=None):
+        super(GeneratorTemporal, self).__init__(size, t_min, t_max, random=random, seed=seed)
+
+
+class Generator2DSpatialSegment(_SeededGenerator):
+    """A generator that generates 2D points in a line segment.
+
+    :param size: number of points to generated when `get_examples` (or `__next__`) is invoked
     :type size: int
+    :param start: the starting point of the line segment
+    :type start: tuple[float, float]
+    :param end: the ending point of the line segment
+    :type end: tuple[float, float]
+    :param random: If set to False, then return eqally spaced points range from
+        `start` to `end`. If set to True then generate points randomly. Defaults to True.
+    :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
+    """
+
+    def __init__(self, size, start, end, random=True, seed=None):
+        super(Generator2DSpatialSegment, self).__init__(seed=seed)
+        self.size = size
+        self.start, self.end = start, end
+        self.random = random
+        self.step = 1. / size
+        self.center = torch.linspace(0. + 0.5 * self.step, 1. - 0.5 * self.step, size)
+
+    def get_examples(self):
+        (x1, y1), (x2, y2) = self.start, self.end
+        s = self.center
+        if self.random:
+            s = s + self.step * (self._rand(self.size) - 0.5)
+        return x1 + (x2 - x1) * s, y1 + (y2 - y1) * s
+
+
+class Generator2DSpatialRectangle(_SeededGenerator):
+    """A generator that generates 2D points in a rectangle. The points are the Cartesian product of
+    points sampled along the x and y dimension.
+
+    :param size: number of points on the x and y dimension, the total number of points generated
+        when `get_examples` (or `__next__`) is invoked is ``size[0] * size[1]``
+    :type size: tuple[int, int]
     :param x_min: Lower bound of x
     :type x_min: float
     :param x_max: Upper bound of x
@@ -384,24 +719,126 @@ def generator_2dspatial_segment(size, start, end, random=True):
     :param y_max: Upper bound of y
     :type y_max: float
     :param random: If set to False, then return a grid where the points are eqally
-        spaced in the x and y dimension. If set to True then generate points randomly. 
+        spaced in the x and y dimension. If set to True then generate points randomly.
         Defaults to True.
     :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
     """
-    x1, y1 = start
-    x2, y2 = end
-    step = 1./size
-    center = torch.linspace(0. + 0.5*step, 1. - 0.5*step, size)
-    noise_lo = -step*0.5
-    while True:
-        if random:
-            noise = step*torch.rand(size) + noise_lo
-            center = center + noise
-        yield x1 + (x2-x1)*center, y1 + (y2-y1)*center
 
+    def __init__(self, size, x_min, x_max, y_min, y_max, random=True, seed=None):
+        super(Generator2DSpatialRectangle, self).__init__(seed=seed)
+        self.x_size, self.y_size = size
+        self.size = self.x_size * self.y_size
+        self.random = random
+        self.x_seg_len = (x_max - x_min) / self.x_size
+        self.y_seg_len = (y_max - y_min) / self.y_size
+        self.x_center = torch.linspace(x_min + self.x_seg_len * 0.5, x_max - self.x_seg_len * 0.5, self.x_size)
+        self.y_center = torch.linspace(y_min + self.y_seg_len * 0.5, y_max - self.y_seg_len * 0.5, self.y_size)
+
+    def get_examples(self):
+        x, y = self.x_center, self.y_center
+        if self.random:
+            x = x + self.x_seg_len * (self._rand(self.x_size) - 0.5)
+            y = y + self.y_seg_len * (self._rand(self.y_size) - 0.5)
+        xx = x.repeat_interleave(self.y_size)
+        yy = y.repeat(self.x_size)
+        return xx, yy
+
+
+class Generator3DSpatialBody(_SeededGenerator):
+    """A generator that generates 3D points in a box. The points are the Cartesian product of
+    points sampled along the x, y and z dimension.
+
+    :param size: number of points on the x, y and z dimension, the total number of points generated
+        when `get_examples` (or `__next__`) is invoked is ``size[0] * size[1] * size[2]``
+    :type size: tuple[int, int, int]
+    :param xyz_min: Lower bound of x, y and z
+    :type xyz_min: tuple[float, float, float]
+    :param xyz_max: Upper bound of x, y and z
+    :type xyz_max: tuple[float, float, float]
+    :param random: If set to False, then return a grid where the points are eqally
+        spaced in the x, y and z dimension. If set to True then generate points randomly.
+        Defaults to True.
+    :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
+    """
 
-def generator_2dspatial_rectangle(size, x_min, x_max, y_min, y_max, random=True):
-    """Return a generator that generates 2D points in a rectangle.
+    def __init__(self, size, xyz_min, xyz_max, random=True, seed=None):
+        super(Generator3DSpatialBody, self).__init__(seed=seed)
+        self.sizes = tuple(size)
+        self.size = int(np.prod(self.sizes))
+        self.random = random
+        self.seg_lens = [(hi - lo) / n for lo, hi, n in zip(xyz_min, xyz_max, self.sizes)]
+        self.centers = [
+            torch.linspace(lo + seg_len * 0.5, hi - seg_len * 0.5, n)
+            for lo, hi, n, seg_len in zip(xyz_min, xyz_max, self.sizes, self.seg_lens)
+        ]
+
+    def get_examples(self):
+        axes = self.centers
+        if self.random:
+            axes = [c + seg_len * (self._rand(n) - 0.5) for c, seg_len, n in zip(axes, self.seg_lens, self.sizes)]
+        grids = torch.meshgrid(*axes, indexing='ij')
+        return tuple(g.flatten() for g in grids)
+
+
+class Generator3DSpatialSurface(_SeededGenerator):
+    """A generator that generates 3D points on the surface of a box.
+    The faces are chosen with probability proportional to their areas and exactly ``size`` points are generated.
+
+    :param size: number of points to generated when `get_examples` (or `__next__`) is invoked
+    :type size: int
+    :param xyz_min: Lower bound of x, y and z
+    :type xyz_min: tuple[float, float, float]
+    :param xyz_max: Upper bound of x, y and z
+    :type xyz_max: tuple[float, float, float]
+    :param random: If set to False, then the points are sampled only once and the same points are returned every time.
+        If set to True then generate new points every time. Defaults to True.
+    :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
+    """
+
+    def __init__(self, size, xyz_min, xyz_max, random=True, seed=None):
+        super(Generator3DSpatialSurface, self).__init__(seed=seed)
+        self.size = size
+        self.xyz_min, self.xyz_max = tuple(xyz_min), tuple(xyz_max)
+        self.random = random
+        self.fixed_examples = None if random else self._sample()
+
+    def _sample(self):
+        return _sample_box_surface(self.size, self.xyz_min, self.xyz_max, rng=self.rng)
+
+    def get_examples(self):
+        if self.random:
+            return self._sample()
+        return self.fixed_examples
+
+
+def generator_1dspatial(size, x_min, x_max, random=True, seed=None):
+    """Return a generator that generates 1D points range from x_min to x_max
+
+    :param size: number of points to generated when `__next__` is invoked
+    :type size: int
+    :param x_min: Lower bound of x
+    :type x_min: float
+    :param x_max: Upper bound of x
+    :type x_max: float
+    :param random: If set to False, then return eqally spaced points range from
+        x_min to x_max. If set to True then generate points randomly. Defaults to True
+    :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
+    :return: A picklable generator that supports both ``next()`` and ``.get_examples()``.
+    :rtype: `temporal.Generator1DSpatial`
+    """
+    return Generator1DSpatial(size, x_min, x_max, random=random, seed=seed)
+
+
+def generator_2dspatial_segment(size, start, end, random=True, seed=None):
+    """Return a generator that generates 2D points in a line segment.
 
     :param size: number of points to generated when `__next__` is invoked
     :type size: int
@@ -410,22 +847,102 @@ def generator_2dspatial_rectangle(size, x_min, x_max, y_min, y_max, random=True)
     :param end: the ending point of the line segment
     :type end: tuple[float, float]
     :param random: If set to False, then return eqally spaced points range from
-        `start` to `end`. If set to Rrue then generate points randomly. Defaults to True.
+        `start` to `end`. If set to True then generate points randomly. Defaults to True.
     :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
+    :return: A picklable generator that supports both ``next()`` and ``.get_examples()``.
+    :rtype: `temporal.Generator2DSpatialSegment`
     """
-    x_size, y_size = size
-    x_generator = generator_1dspatial(x_size, x_min, x_max, random)
-    y_generator = generator_1dspatial(y_size, y_min, y_max, random)
-    while True:
-        x = next(x_generator)
-        y = next(y_generator)
-        xy = torch.cartesian_prod(x, y)
-        xx = torch.squeeze(xy[:, 0])
-        yy = torch.squeeze(xy[:, 1])
-        yield xx, yy
+    return Generator2DSpatialSegment(size, start, end, random=random, seed=seed)
 
 
-def generator_temporal(size, t_min, t_max, random=True):
+def generator_2dspatial_rectangle(size, x_min, x_max, y_min, y_max, random=True, seed=None):
+    """Return a generator that generates 2D points in a rectangle.
+
+    :param size: number of points to generated on the x and y dimension when `__next__` is invoked
+    :type size: tuple[int, int]
+    :param x_min: Lower bound of x
+    :type x_min: float
+    :param x_max: Upper bound of x
+    :type x_max: float
+    :param y_min: Lower bound of y
+    :type y_min: float
+    :param y_max: Upper bound of y
+    :type y_max: float
+    :param random: If set to False, then return a grid where the points are eqally
+        spaced in the x and y dimension. If set to True then generate points randomly.
+        Defaults to True.
+    :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
+    :return: A picklable generator that supports both ``next()`` and ``.get_examples()``.
+    :rtype: `temporal.Generator2DSpatialRectangle`
+    """
+    return Generator2DSpatialRectangle(size, x_min, x_max, y_min, y_max, random=random, seed=seed)
+
+
+def generator_3dspatial_body(size, x_min, x_max, y_min, y_max, z_min, z_max, random=True, seed=None):
+    """Return a generator that generates 3D points in a box.
+    For other shapes, `generators.GeneratorBall3D` and `generators.GeneratorCylinder3D` can be used as well.
+
+    :param size: number of points to generated on the x, y and z dimension when `__next__` is invoked
+    :type size: tuple[int, int, int]
+    :param x_min: Lower bound of x
+    :type x_min: float
+    :param x_max: Upper bound of x
+    :type x_max: float
+    :param y_min: Lower bound of y
+    :type y_min: float
+    :param y_max: Upper bound of y
+    :type y_max: float
+    :param z_min: Lower bound of z
+    :type z_min: float
+    :param z_max: Upper bound of z
+    :type z_max: float
+    :param random: If set to False, then return a grid where the points are eqally
+        spaced in the x, y and z dimension. If set to True then generate points randomly.
+        Defaults to True.
+    :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
+    :return: A picklable generator that supports both ``next()`` and ``.get_examples()``.
+    :rtype: `temporal.Generator3DSpatialBody`
+    """
+    return Generator3DSpatialBody(size, (x_min, y_min, z_min), (x_max, y_max, z_max), random=random, seed=seed)
+
+
+def generator_3dspatial_surface(size, x_min, x_max, y_min, y_max, z_min, z_max, random=True, seed=None):
+    """Return a generator that generates 3D points on the surface of a box.
+    For other shapes, `generators.GeneratorBall3D` and `generators.GeneratorCylinder3D`
+    (with ``method='surface'``) can be used as well.
+
+    :param size: number of points to generated when `__next__` is invoked
+    :type size: int
+    :param x_min: Lower bound of x
+    :type x_min: float
+    :param x_max: Upper bound of x
+    :type x_max: float
+    :param y_min: Lower bound of y
+    :type y_min: float
+    :param y_max: Upper bound of y
+    :type y_max: float
+    :param z_min: Lower bound of z
+    :type z_min: float
+    :param z_max: Upper bound of z
+    :type z_max: float
+    :param random: If set to False, then the same points are returned every time.
+        If set to True then generate new points every time. Defaults to True.
+    :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
+    :return: A picklable generator that supports both ``next()`` and ``.get_examples()``.
+    :rtype: `temporal.Generator3DSpatialSurface`
+    """
+    return Generator3DSpatialSurface(size, (x_min, y_min, z_min), (x_max, y_max, z_max), random=random, seed=seed)
+
+
+def generator_temporal(size, t_min, t_max, random=True, seed=None):
     """Return a generator that generates 1D points range from t_min to t_max
 
     :param size: number of points to generated when `__next__` is invoked
@@ -437,18 +954,12 @@ def generator_temporal(size, t_min, t_max, random=True):
     :param random: If set to False, then return eqally spaced points range from
         t_min to t_max. If set to True then generate points randomly. Defaults to True
     :type random: bool
+    :param seed: Seed of the random number generator. Defaults to None.
+    :type seed: int, optional
+    :return: A picklable generator that supports both ``next()`` and ``.get_examples()``.
+    :rtype: `temporal.GeneratorTemporal`
     """
-    seg_len = (t_max - t_min) / size
-    linspace_lo = t_min + seg_len * 0.5
-    linspace_hi = t_max - seg_len * 0.5
-    center = torch.linspace(linspace_lo, linspace_hi, size)
-    noise_lo = -seg_len * 0.5
-    while True:
-        if random:
-            noise = seg_len * torch.rand(size) + noise_lo
-            yield center + noise
-        else:
-            yield center
+    return GeneratorTemporal(size, t_min, t_max, random=random, seed=seed)
 
 
 class MonitorMinimal:
@@ -701,7 +1212,8 @@ class Monitor2DSpatial:
 
 def _solve_1dspatial_temporal(
     train_generator_spatial, train_generator_temporal, valid_generator_spatial, valid_generator_temporal,
-    approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor
+    approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor, exact_epoch_loss=False,
+    time_windows=None, callbacks=None, time_budget=None
 ):
     """Solve a 1D time-dependent problem
 
@@ -728,17 +1240,36 @@ def _solve_1dspatial_temporal(
     :type metrics: dict[string, function]
     :param monitor: The monitor to check the status of nerual network during training
     :type monitor: `temporal.Monitor1DSpatialTemporal` or `temporal.MonitorMinimal`
+    :param exact_epoch_loss: Whether to evaluate the loss and metrics on all training points again after each epoch,
+        instead of recording the sample-weighted average of the mini-batch losses and metrics, defaults to False
+    :type exact_epoch_loss: bool
+    :param time_windows: If specified, train by time marching: an increasing sequence of times
+        :math:`t_0 < t_1 < \dots < t_n`, where :math:`[t_0, t_n]` is the range of the temporal generators.
+        The `max_epochs` are split evenly into :math:`n` stages; in the k-th stage, the temporal points are rescaled
+        to :math:`[t_0, t_k]`, so that the network (warm-started by the previous stages) fits early times before
+        late ones. Defaults to None.
+    :type time_windows: list[float]
+    :param callbacks: Callbacks run after every epoch, each a function `cb(solver)` accepting the underlying solver
+        (e.g., `neurodiffeq.solvers.EarlyStoppingCallback`), which can stop the training by setting
+        `solver._stop_training` to True, defaults to None
+    :type callbacks: list[callable]
+    :param time_budget: If specified, the wall-clock budget of the training, in seconds; the training stops after an
+        epoch if the next one is predicted not to fit in the budget (see `neurodiffeq.solvers.BaseSolver.fit`).
+        In time marching, what remains of the budget is split evenly over the remaining stages. Defaults to None.
+    :type time_budget: float
     """
     return _solve_spatial_temporal(
         train_generator_spatial, train_generator_temporal, valid_generator_spatial, valid_generator_temporal,
-        approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor,
-        train_routine=_train_1dspatial_temporal, valid_routine=_valid_1dspatial_temporal
+        approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor, exact_epoch_loss,
+        train_routine=_train_1dspatial_temporal, valid_routine=_valid_1dspatial_temporal,
+        time_windows=time_windows, callbacks=callbacks, time_budget=time_budget,
     )
 
 
 def _solve_2dspatial_temporal(
     train_generator_spatial, train_generator_temporal, valid_generator_spatial, valid_generator_temporal,
-    approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor
+    approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor, exact_epoch_loss=False,
+    time_windows=None, callbacks=None, time_budget=None
 ):
     """Solve a 2D time-dependent problem
 
@@ -765,22 +1296,93 @@ def _solve_2dspatial_temporal(
     :type metrics: dict[string, function]
     :param monitor: The monitor to check the status of nerual network during training
     :type monitor: `temporal.Monitor2DSpatialTemporal` or `temporal.MonitorMinimal`
+    :param exact_epoch_loss: Whether to evaluate the loss and metrics on all training points again after each epoch,
+        instead of recording the sample-weighted average of the mini-batch losses and metrics, defaults to False
+    :type exact_epoch_loss: bool
+    :param time_windows: If specified, train by time marching: an increasing sequence of times
+        :math:`t_0 < t_1 < \dots < t_n`, where :math:`[t_0, t_n]` is the range of the temporal generators.
+        The `max_epochs` are split evenly into :math:`n` stages; in the k-th stage, the temporal points are rescaled
+        to :math:`[t_0, t_k]`, so that the network (warm-started by the previous stages) fits early times before
+        late ones. Defaults to None.
+    :type time_windows: list[float]
+    :param callbacks: Callbacks run after every epoch, each a function `cb(solver)` accepting the underlying solver
+        (e.g., `neurodiffeq.solvers.EarlyStoppingCallback`), which can stop the training by setting
+        `solver._stop_training` to True, defaults to None
+    :type callbacks: list[callable]
+    :param time_budget: If specified, the wall-clock budget of the training, in seconds; the training stops after an
+        epoch if the next one is predicted not to fit in the budget (see `neurodiffeq.solvers.BaseSolver.fit`).
+        In time marching, what remains of the budget is split evenly over the remaining stages. Defaults to None.
+    :type time_budget: float
     """
     return _solve_spatial_temporal(
         train_generator_spatial, train_generator_temporal, valid_generator_spatial, valid_generator_temporal,
-        approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor,
-        train_routine=_train_2dspatial_temporal, valid_routine=_valid_2dspatial_temporal
+        approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor, exact_epoch_loss,
+        train_routine=_train_2dspatial_temporal, valid_routine=_valid_2dspatial_temporal,
+        time_windows=time_windows, callbacks=callbacks, time_budget=time_budget,
     )
 
-def _solve_2dspatial(
-    train_generator_spatial, valid_generator_spatial,
-    approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor
+
+def _solve_3dspatial_temporal(
+    train_generator_spatial, train_generator_temporal, valid_generator_spatial, valid_generator_temporal,
+    approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor, exact_epoch_loss=False,
+    time_windows=None, callbacks=None, time_budget=None
 ):
+    """Solve a 3D time-dependent problem
+
+    :param train_generator_spatial: a generator to generate 3D spatial points for training
+    :type train_generator_spatial: generator
+    :param train_generator_temporal: a generator to generate 1D temporal points for training
+    :type train_generator_temporal: generator
+    :param valid_generator_spatial: a generator to generate 3D spatial points for validation
+    :type valid_generator_spatial: generator
+    :param valid_generator_temporal: a generator to generate 1D temporal points for validation
+    :type valid_generator_temporal: generator
+    :param approximator: an approximator for 3D time-dependent problem
+    :type approximator: `temporal.SingleNetworkApproximator3DSpatialTemporal` or a custom `temporal.Approximator`
+    :param optimizer: The optimization method to use for training
+    :type optimizer: `torch.optim.Optimizer`
+    :param batch_size: The size of the mini-batch to use
+    :type batch_size: int
+    :param max_epochs: The maximum number of epochs to train
+    :type max_epochs: int
+    :param shuffle: Whether to shuffle the training examples every epoch
+    :type shuffle: bool
+    :param metrics: Metrics to keep track of during training. The metrics should be passed as a dictionary where the keys are the names of the metrics, and the values are the corresponding function.
+        The input functions should be the same as `pde` (of the approximator) and the output should be a numeric value. The metrics are evaluated on both the training set and validation set.
+    :type metrics: dict[string, function]
+    :param monitor: The monitor to check the status of nerual network during training
+    :type monitor: `temporal.MonitorMinimal`
+    :param exact_epoch_loss: Whether to evaluate the loss and metrics on all training points again after each epoch,
+        instead of recording the sample-weighted average of the mini-batch losses and metrics, defaults to False
+    :type exact_epoch_loss: bool
+    :param time_windows: If specified, train by time marching: an increasing sequence of times
+        :math:`t_0 < t_1 < \dots < t_n`, where :math:`[t_0, t_n]` is the range of the temporal generators.
+        The `max_epochs` are split evenly into :math:`n` stages; in the k-th stage, the temporal points are rescaled
+        to :math:`[t_0, t_k]`, so that the network (warm-started by the previous stages) fits early times before
+        late ones. Defaults to None.
+    :type time_windows: list[float]
+    :param callbacks: Callbacks run after every epoch, each a function `cb(solver)` accepting the underlying solver
+        (e.g., `neurodiffeq.solvers.EarlyStoppingCallback`), which can stop the training by setting
+        `solver._stop_training` to True, defaults to None
+    :type callbacks: list[callable]
+    :param time_budget: If specified, the wall-clock budget of the training, in seconds; the training stops after an
+        epoch if the next one is predicted not to fit in the budget (see `neurodiffeq.solvers.BaseSolver.fit`).
+        In time marching, what remains of the budget is split evenly over the remaining stages. Defaults to None.
+    :type time_budget: float
+    """
     return _solve_spatial_temporal(
-        train_generator_spatial, None, valid_generator_spatial, None,
-        approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor,
-        train_routine=_train_2dspatial, valid_routine=_valid_2dspatial
+        train_generator_spatial, train_generator_temporal, valid_generator_spatial, valid_generator_temporal,
+        approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor, exact_epoch_loss,
+        train_routine=_train_3dspatial_temporal, valid_routine=_valid_3dspatial_temporal,
+        time_windows=time_windows, callbacks=callbacks, time_budget=time_budget,
     )
+
+
+def _solve_2dspatial(
+    train_generator_spatial, valid_generator_spatial,
+    approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor, exact_epoch_loss=False,
+    callbacks=None, time_budget=None
+):
     """Solve a 2D steady-state problem
 
     :param train_generator_spatial: a generator to generate 2D spatial points for training
@@ -802,107 +1404,206 @@ def _solve_2dspatial(
     :type metrics: dict[string, function]
     :param monitor: The monitor to check the status of nerual network during training
     :type monitor: `temporal.Monitor2DSpatial` or `temporal.MonitorMinimal`
+    :param exact_epoch_loss: Whether to evaluate the loss and metrics on all training points again after each epoch,
+        instead of recording the sample-weighted average of the mini-batch losses and metrics, defaults to False
+    :type exact_epoch_loss: bool
+    :param callbacks: Callbacks run after every epoch, each a function `cb(solver)` accepting the underlying solver
+        (e.g., `neurodiffeq.solvers.EarlyStoppingCallback`), which can stop the training by setting
+        `solver._stop_training` to True, defaults to None
+    :type callbacks: list[callable]
+    :param time_budget: If specified, the wall-clock budget of the training, in seconds; the training stops after an
+        epoch if the next one is predicted not to fit in the budget (see `neurodiffeq.solvers.BaseSolver.fit`).
+        Defaults to None.
+    :type time_budget: float
     """
+    return _solve_spatial_temporal(
+        train_generator_spatial, None, valid_generator_spatial, None,
+        approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor, exact_epoch_loss,
+        train_routine=_train_2dspatial, valid_routine=_valid_2dspatial, callbacks=callbacks,
+        time_budget=time_budget,
+    )
 
 
-# _solve_1dspatial_temporal, _solve_2dspatial_temporal, _solve_2dspatial all call this function in the end
-def _solve_spatial_temporal(
-    train_generator_spatial, train_generator_temporal, valid_generator_spatial, valid_generator_temporal,
-    approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor,
-    train_routine, valid_routine
-):
-    history = {'train_loss': [], 'valid_loss': []}
-    for metric_name, _ in metrics.items():
-        history['train_' + metric_name] = []
-        history['valid_' + metric_name] = []
-
-    for epoch in range(max_epochs):
-        train_epoch_loss, train_epoch_metrics = train_routine(
-            train_generator_spatial, train_generator_temporal, approximator, optimizer, metrics, shuffle, batch_size
-        )
-        history['train_loss'].append(train_epoch_loss)
-        for metric_name, metric_value in train_epoch_metrics.items():
-            history['train_' + metric_name].append(metric_value)
+class _SpatialTemporalSolver(_TrainingLoop):
+    """Runs the train/valid routines of this module in the training loop shared with `solvers.BaseSolver`,
+    so that the temporal problems have the same `.fit()`, callbacks and history bookkeeping.
+    The approximator is trained in place; there's no tracking of the best approximator.
+    """
 
-        valid_epoch_loss, valid_epoch_metrics = valid_routine(
-            valid_generator_spatial, valid_generator_temporal, approximator, metrics
-        )
-        history['valid_loss'].append(valid_epoch_loss)
-        for metric_name, metric_value in valid_epoch_metrics.items():
-            history['valid_' + metric_name].append(metric_value)
+    def __init__(self, train_generator_spatial, train_generator_temporal,
+                 valid_generator_spatial, valid_generator_temporal,
+                 approximator, optimizer, batch_size, shuffle, metrics, exact_epoch_loss, train_routine, valid_routine):
+        self.metrics_fn = dict(metrics) if metrics else {}
+        super(_SpatialTemporalSolver, self).__init__(optimizer, metric_names=self.metrics_fn)
+        self.generator = {
+            'train': (train_generator_spatial, train_generator_temporal),
+            'valid': (valid_generator_spatial, valid_generator_temporal),
+        }
+        self.approximator = approximator
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.exact_epoch_loss = exact_epoch_loss
+        self.routine = {'train': train_routine, 'valid': valid_routine}
 
-        if monitor and epoch % monitor.check_every == 0:
-            monitor.check(approximator, history)
+    @staticmethod
+    def _history_key(key, name):
+        return f'{key}_{name}'
+
+    def _run_epoch(self, key):
+        self._phase = key
+        generator_spatial, generator_temporal = self.generator[key]
+        if key == 'train':
+            epoch_loss, epoch_metrics = self.routine[key](
+                generator_spatial, generator_temporal, self.approximator, self.optimizer, self.metrics_fn,
+                self.shuffle, self.batch_size, exact_epoch_loss=self.exact_epoch_loss
+            )
+        else:
+            epoch_loss, epoch_metrics = self.routine[key](
+                generator_spatial, generator_temporal, self.approximator, self.metrics_fn
+            )
+        self._update_history(epoch_loss, 'loss', key)
+        for metric_name, metric_value in epoch_metrics.items():
+            self._update_history(metric_value, metric_name, key)
 
-    return approximator, history
+    def run_train_epoch(self):
+        self._run_epoch('train')
 
+    def run_valid_epoch(self):
+        self._run_epoch('valid')
 
-# training phase for 1D time-dependent problems
-def _train_1dspatial_temporal(train_generator_spatial, train_generator_temporal, approximator, optimizer, metrics, shuffle, batch_size):
-    x = next(train_generator_spatial)
-    t = next(train_generator_temporal)
-    xx, tt = _cartesian_prod_dims(x, t)
-    training_set_size = len(xx)
-    idx = torch.randperm(training_set_size) if shuffle else torch.arange(training_set_size)
 
-    batch_start, batch_end = 0, batch_size
-    while batch_start < training_set_size:
-        if batch_end > training_set_size:
-            batch_end = training_set_size
-        batch_idx = idx[batch_start:batch_end]
-        batch_xx = xx[batch_idx]
-        batch_tt = tt[batch_idx]
+class _TimeWindowGenerator(BaseGenerator):
+    """Rescales the points of a temporal generator from :math:`[t_{min}, t_{max}]` to :math:`[t_{min}, t_{end}]`,
+    where :math:`t_{end}` is the end of the current time window (set by the time-marching loop);
+    the generator must span :math:`[t_{min}, t_{max}]`, which is checked if it records its range (as a
+    `GeneratorTemporal` does)
+    """
+
+    def __init__(self, generator, t_min, t_max):
+        super(_TimeWindowGenerator, self).__init__()
+        x_min, x_max = getattr(generator, 'x_min', None), getattr(generator, 'x_max', None)
+        if x_min is not None and x_max is not None and not np.allclose([x_min, x_max], [t_min, t_max]):
+            raise ValueError(f"The temporal generator spans [{x_min}, {x_max}], "
+                             f"but the time windows span [{t_min}, {t_max}]")
+        self.size = getattr(generator, 'size', None)
+        self.generator = generator
+        self.t_min, self.t_max = t_min, t_max
+        self.t_end = t_max
+
+    def get_examples(self):
+        t = next(self.generator)
+        return self.t_min + (t - self.t_min) * ((self.t_end - self.t_min) / (self.t_max - self.t_min))
+
 
-        batch_loss = approximator.calculate_loss(batch_xx, batch_tt, x, t)
+# _solve_1dspatial_temporal, _solve_2dspatial_temporal, _solve_2dspatial all call this function in the end
+def _solve_spatial_temporal(
+    train_generator_spatial, train_generator_temporal, valid_generator_spatial, valid_generator_temporal,
+    approximator, optimizer, batch_size, max_epochs, shuffle, metrics, monitor, exact_epoch_loss,
+    train_routine, valid_routine, time_windows=None, callbacks=None, time_budget=None
+):
+    if time_windows is None:
+        time_windows = []
+    else:
+        time_windows = list(time_windows)
+        if len(time_windows) < 2 or any(a >= b for a, b in zip(time_windows[:-1], time_windows[1:])):
+            raise ValueError(f"`time_windows` must be an increasing sequence of at least 2 times, got {time_windows}")
+        train_generator_temporal = _TimeWindowGenerator(train_generator_temporal, time_windows[0], time_windows[-1])
+        valid_generator_temporal = _TimeWindowGenerator(valid_generator_temporal, time_windows[0], time_windows[-1])
+
+    solver = _SpatialTemporalSolver(
+        train_generator_spatial, train_generator_temporal, valid_generator_spatial, valid_generator_temporal,
+        approximator, optimizer, batch_size, shuffle, metrics, exact_epoch_loss, train_routine, valid_routine
+    )
 
-        optimizer.zero_grad()
-        batch_loss.backward()
-        optimizer.step()
+    callbacks = list(callbacks) if callbacks else []
+    if monitor:
+        def monitor_callback(solver):
+            if solver.local_epoch % monitor.check_every == 0:
+                monitor.check(approximator, solver.metrics_history)
+        callbacks.append(monitor_callback)
+
+    if not time_windows:
+        solver.fit(max_epochs=max_epochs, callbacks=callbacks, time_budget=time_budget)
+        return approximator, solver.metrics_history
+
+    # time marching: every stage extends the time range and warm-starts from the network trained so far
+    n_stages = len(time_windows) - 1
+    start = time.time()
+    for stage, t_end in enumerate(time_windows[1:]):
+        train_generator_temporal.t_end = valid_generator_temporal.t_end = t_end
+        stage_epochs = max_epochs // n_stages + (stage < max_epochs % n_stages)
+        stage_budget = None
+        if time_budget is not None:
+            stage_budget = max(time_budget - (time.time() - start), 0.0) / (n_stages - stage)
+        solver.fit(max_epochs=stage_epochs, callbacks=callbacks, time_budget=stage_budget)
+    return approximator, solver.metrics_history
+
+
+# mini-batch training over paired coordinates `coords` (e.g. [xx, tt]), shared by the routines below;
+# `points` are the factors the coordinates are built from (e.g. [x, t]), passed on to the approximator as they are
+def _train_minibatches(coords, points, approximator, optimizer, metrics, shuffle, batch_size, exact_epoch_loss):
+    training_set_size = len(coords[0])
+    idx = torch.randperm(training_set_size) if shuffle else torch.arange(training_set_size)
+    # optimizers with a line search (e.g., L-BFGS) take a single step on the whole training set
+    use_closure = _requires_closure(optimizer)
+    if use_closure:
+        batch_size = training_set_size
+    epoch_loss = 0.0
+    epoch_metrics = {metric_name: 0.0 for metric_name in metrics}
+
+    for batch_start in range(0, training_set_size, batch_size):
+        batch_idx = idx[batch_start:batch_start + batch_size]
+        # indexing records a graph, which the closure can't back-propagate through more than once
+        batch_coords = list(coords) if use_closure else [c[batch_idx] for c in coords]
+
+        # the loss and metrics of the epoch are averaged over the mini-batches (weighted by their sizes),
+        # which saves another pass over the whole training set
+        if exact_epoch_loss:
+            batch_loss = approximator.calculate_loss(*batch_coords, *points)
+        else:
+            batch_loss, batch_metrics = approximator.calculate_loss_and_metrics(*batch_coords, *points, metrics)
+            weight = len(batch_idx) / training_set_size
+            epoch_loss += batch_loss.item() * weight
+            for k, v in batch_metrics.items():
+                epoch_metrics[k] += v.item() * weight
 
-        batch_start += batch_size
-        batch_end += batch_size
+        _backward_and_step(optimizer, batch_loss, lambda: approximator.calculate_loss(*batch_coords, *points))
 
-    epoch_loss = approximator.calculate_loss(xx, tt, x, t).item()
+    if not exact_epoch_loss:
+        return epoch_loss, epoch_metrics
 
-    epoch_metrics = approximator.calculate_metrics(xx, tt, x, t, metrics)
+    epoch_loss, epoch_metrics = approximator.calculate_loss_and_metrics(*coords, *points, metrics)
+    epoch_loss = epoch_loss.item()
     for k, v in epoch_metrics.items():
         epoch_metrics[k] = v.item()
 
     return epoch_loss, epoch_metrics
 
 
+# training phase for 1D time-dependent problems
+def _train_1dspatial_temporal(train_generator_spatial, train_generator_temporal, approximator, optimizer, metrics, shuffle, batch_size,
+                              exact_epoch_loss=False):
+    x = next(train_generator_spatial)
+    t = next(train_generator_temporal)
+    if _is_separable(approximator):
+        return _train_tensor_product(
+            TensorProductBatch(x, t), approximator, optimizer, metrics, shuffle, batch_size, exact_epoch_loss
+        )
+    xx, tt = _cartesian_prod_dims(x, t)
+    return _train_minibatches(
+        (xx, tt), (x, t), approximator, optimizer, metrics, shuffle, batch_size, exact_epoch_loss
+    )
+
+
 # training phase for 2D steady-state problems
-def _train_2dspatial(train_generator_spatial, train_generator_temporal, approximator, optimizer, metrics, shuffle, batch_size):
+def _train_2dspatial(train_generator_spatial, train_generator_temporal, approximator, optimizer, metrics, shuffle, batch_size,
+                     exact_epoch_loss=False):
     xx, yy = next(train_generator_spatial)
     xx.requires_grad = True
     yy.requires_grad = True
-    training_set_size = len(xx)
-    idx = torch.randperm(training_set_size) if shuffle else torch.arange(training_set_size)
-
-    batch_start, batch_end = 0, batch_size
-    while batch_start < training_set_size:
-        if batch_end > training_set_size:
-            batch_end = training_set_size
-        batch_idx = idx[batch_start:batch_end]
-        batch_xx = xx[batch_idx]
-        batch_yy = yy[batch_idx]
-
-        batch_loss = approximator.calculate_loss(batch_xx, batch_yy)
-
-        optimizer.zero_grad()
-        batch_loss.backward()
-        optimizer.step()
-
-        batch_start += batch_size
-        batch_end += batch_size
-
-    epoch_loss = approximator.calculate_loss(xx, yy).item()
-
-    epoch_metrics = approximator.calculate_metrics(xx, yy, metrics)
-    for k, v in epoch_metrics.items():
-        epoch_metrics[k] = v.item()
-
-    return epoch_loss, epoch_metrics
+    return _train_minibatches(
+        (xx, yy), (), approximator, optimizer, metrics, shuffle, batch_size, exact_epoch_loss
+    )
 
 
 # validation phase for 2D steady-state problems
@@ -911,9 +1612,8 @@ def _valid_2dspatial(valid_generator_spatial, valid_generator_temporal, approxim
     xx.requires_grad = True
     yy.requires_grad = True
 
-    epoch_loss = approximator.calculate_loss(xx, yy).item()
-
-    epoch_metrics = approximator.calculate_metrics(xx, yy, metrics)
+    epoch_loss, epoch_metrics = approximator.calculate_loss_and_metrics(xx, yy, metrics)
+    epoch_loss = epoch_loss.item()
     for k, v in epoch_metrics.items():
         epoch_metrics[k] = v.item()
 
@@ -921,51 +1621,31 @@ def _valid_2dspatial(valid_generator_spatial, valid_generator_temporal, approxim
 
 
 # training phase for 2D time-dependent problems
-def _train_2dspatial_temporal(train_generator_spatial, train_generator_temporal, approximator, optimizer, metrics, shuffle, batch_size):
+def _train_2dspatial_temporal(train_generator_spatial, train_generator_temporal, approximator, optimizer, metrics, shuffle, batch_size,
+                              exact_epoch_loss=False):
     x, y = next(train_generator_spatial)
     t = next(train_generator_temporal)
+    if _is_separable(approximator):
+        return _train_tensor_product(
+            TensorProductBatch((x, y), t), approximator, optimizer, metrics, shuffle, batch_size, exact_epoch_loss
+        )
     xx, tt = _cartesian_prod_dims(x, t)
     yy, tt = _cartesian_prod_dims(y, t)
-    training_set_size = len(xx)
-    idx = torch.randperm(training_set_size) if shuffle else torch.arange(training_set_size)
-
-    batch_start, batch_end = 0, batch_size
-    while batch_start < training_set_size:
-        if batch_end > training_set_size:
-            batch_end = training_set_size
-        batch_idx = idx[batch_start:batch_end]
-        batch_xx = xx[batch_idx]
-        batch_yy = yy[batch_idx]
-        batch_tt = tt[batch_idx]
-
-        batch_loss = approximator.calculate_loss(batch_xx, batch_yy, batch_tt, x, y, t)
-
-        optimizer.zero_grad()
-        batch_loss.backward()
-        optimizer.step()
-
-        batch_start += batch_size
-        batch_end += batch_size
-
-    # TODO: this can give us the real loss after an epoch, but can be very memory intensive
-    epoch_loss = approximator.calculate_loss(xx, yy, tt, x, y, t).item()
-
-    epoch_metrics = approximator.calculate_metrics(xx, yy, tt, x, y, t, metrics)
-    for k, v in epoch_metrics.items():
-        epoch_metrics[k] = v.item()
-
-    return epoch_loss, epoch_metrics
+    return _train_minibatches(
+        (xx, yy, tt), (x, y, t), approximator, optimizer, metrics, shuffle, batch_size, exact_epoch_loss
+    )
 
 
 # validation phase for 1D time-dependent problems
 def _valid_1dspatial_temporal(valid_generator_spatial, valid_generator_temporal, approximator, metrics):
     x = next(valid_generator_spatial)
     t = next(valid_generator_temporal)
+    if _is_separable(approximator):
+        return _valid_tensor_product(TensorProductBatch(x, t), approximator, metrics)
     xx, tt = _cartesian_prod_dims(x, t)
 
-    epoch_loss = approximator.calculate_loss(xx, tt, x, t).item()
-
-    epoch_metrics = approximator.calculate_metrics(xx, tt, x, t, metrics)
+    epoch_loss, epoch_metrics = approximator.calculate_loss_and_metrics(xx, tt, x, t, metrics)
+    epoch_loss = epoch_loss.item()
     for k, v in epoch_metrics.items():
         epoch_metrics[k] = v.item()
 
@@ -976,12 +1656,93 @@ def _valid_1dspatial_temporal(valid_generator_spatial, valid_generator_temporal,
 def _valid_2dspatial_temporal(valid_generator_spatial, valid_generator_temporal, approximator, metrics):
     x, y = next(valid_generator_spatial)
     t = next(valid_generator_temporal)
+    if _is_separable(approximator):
+        return _valid_tensor_product(TensorProductBatch((x, y), t), approximator, metrics)
     xx, tt = _cartesian_prod_dims(x, t)
     yy, tt = _cartesian_prod_dims(y, t)
 
-    epoch_loss = approximator.calculate_loss(xx, yy, tt, x, y, t).item()
+    epoch_loss, epoch_metrics = approximator.calculate_loss_and_metrics(xx, yy, tt, x, y, t, metrics)
+    epoch_loss = epoch_loss.item()
+    for k, v in epoch_metrics.items():
+        epoch_metrics[k] = v.item()
+
+    return epoch_loss, epoch_metrics
+
+
+# training phase for 3D time-dependent problems
+def _train_3dspatial_temporal(train_generator_spatial, train_generator_temporal, approximator, optimizer, metrics, shuffle, batch_size,
+                              exact_epoch_loss=False):
+    x, y, z = next(train_generator_spatial)
+    t = next(train_generator_temporal)
+    batch = TensorProductBatch((x, y, z), t)
+    if _is_separable(approximator):
+        return _train_tensor_product(batch, approximator, optimizer, metrics, shuffle, batch_size, exact_epoch_loss)
+    return _train_minibatches(
+        batch.coords, batch.points, approximator, optimizer, metrics, shuffle, batch_size, exact_epoch_loss
+    )
+
+
+# validation phase for 3D time-dependent problems
+def _valid_3dspatial_temporal(valid_generator_spatial, valid_generator_temporal, approximator, metrics):
+    x, y, z = next(valid_generator_spatial)
+    t = next(valid_generator_temporal)
+    batch = TensorProductBatch((x, y, z), t)
+    if _is_separable(approximator):
+        return _valid_tensor_product(batch, approximator, metrics)
+    x, y, z, t = batch.points
+    xx, yy, zz, tt = batch.coords
+
+    epoch_loss, epoch_metrics = approximator.calculate_loss_and_metrics(xx, yy, zz, tt, x, y, z, t, metrics)
+    epoch_loss = epoch_loss.item()
+    for k, v in epoch_metrics.items():
+        epoch_metrics[k] = v.item()
+
+    return epoch_loss, epoch_metrics
+
+
+# training phase for time-dependent problems whose approximator uses a `networks.SeparableFCNN`;
+# the mini-batches are tensor products too: all spatial points times a chunk of the temporal points
+def _train_tensor_product(batch, approximator, optimizer, metrics, shuffle, batch_size, exact_epoch_loss=False):
+    n_temporal = batch.shape[-1]
+    chunk_size = max(1, batch_size // (len(batch) // n_temporal))
+    # optimizers with a line search (e.g., L-BFGS) take a single step on the whole training set
+    use_closure = _requires_closure(optimizer)
+    if use_closure:
+        chunk_size = n_temporal
+    idx = torch.randperm(n_temporal) if shuffle else torch.arange(n_temporal)
+    epoch_loss = 0.0
+    epoch_metrics = {metric_name: 0.0 for metric_name in metrics}
+
+    for chunk_start in range(0, n_temporal, chunk_size):
+        chunk_idx = idx[chunk_start:chunk_start + chunk_size]
+        # indexing records a graph, which the closure can't back-propagate through more than once
+        sub_batch = batch if use_closure else batch.select(-1, chunk_idx)
+
+        if exact_epoch_loss:
+            batch_loss = approximator.calculate_loss(*sub_batch.coords, *batch.points, batch=sub_batch)
+        else:
+            batch_loss, batch_metrics = approximator.calculate_loss_and_metrics(
+                *sub_batch.coords, *batch.points, metrics, batch=sub_batch
+            )
+            weight = len(chunk_idx) / n_temporal
+            epoch_loss += batch_loss.item() * weight
+            for k, v in batch_metrics.items():
+                epoch_metrics[k] += v.item() * weight
+
+        _backward_and_step(
+            optimizer, batch_loss,
+            lambda: approximator.calculate_loss(*sub_batch.coords, *batch.points, batch=sub_batch),
+        )
+
+    if not exact_epoch_loss:
+        return epoch_loss, epoch_metrics
+    return _valid_tensor_product(batch, approximator, metrics)
+
 
-    epoch_metrics = approximator.calculate_metrics(xx, yy, tt, x, y, t, metrics)
+# validation phase for time-dependent problems whose approximator uses a `networks.SeparableFCNN`
+def _valid_tensor_product(batch, approximator, metrics):
+    epoch_loss, epoch_metrics = approximator.calculate_loss_and_metrics(*batch.coords, *batch.points, metrics, batch=batch)
+    epoch_loss = epoch_loss.item()
     for k, v in epoch_metrics.items():
         epoch_metrics[k] = v.item()
 
@@ -11,6 +11,7 @@ from neurodiffeq.conditions import InfDirichletBVPSpherical
 from neurodiffeq.conditions import DirichletBVPSphericalBasis
 from neurodiffeq.conditions import InfDirichletBVPSphericalBasis
 from neurodiffeq.conditions import IBVP1D
+from neurodiffeq.conditions import _enforce_on_single_net
 from neurodiffeq.networks import FCNN
 from neurodiffeq.neurodiffeq import safe_diff as diff
 from pytest import raises, warns, deprecated_call
@@ -99,6 +100,40 @@ def test_ensemble_condition():
     assert all_close(y, y0), "y(x_0) != y_0"
 
 
+def test_enforce_on_single_net():
+    class CountingNet(FCNN):
+        n_calls = 0
+
+        def forward(self, t):
+            self.n_calls += 1
+            return super(CountingNet, self).forward(t)
+
+    net = CountingNet(1, 3)
+    conditions = [IVP(x0, y0), IVP(x1, y0, y1), NoCondition()]
+    for i, cond in enumerate(conditions):
+        cond.ith_unit = i
+
+    x = x0 * ones
+    us = _enforce_on_single_net(net, conditions, x)
+    assert net.n_calls == 1
+    expected = [cond.enforce(net, x) for cond in conditions]
+    for u, u_expected in zip(us, expected):
+        assert u.shape == (N_SAMPLES, 1)
+        assert all_close(u, u_expected)
+
+    # conditions that override `.enforce` fall back to their own `.enforce`
+    net = CountingNet(2, 2)
+    conditions = [
+        IBVP1D(x_min=0, x_max=1, t_min=0, t_min_val=lambda x: x, x_min_val=lambda t: t, x_max_val=lambda t: t),
+        NoCondition(),
+    ]
+    conditions[0].ith_unit, conditions[1].ith_unit = 0, 1
+    xs, ts = torch.rand(N_SAMPLES, 1), torch.rand(N_SAMPLES, 1)
+    us = _enforce_on_single_net(net, conditions, xs, ts)
+    assert net.n_calls == 2
+    assert all_close(us[0], conditions[0].enforce(net, xs, ts))
+
+
 def test_dirichlet_bvp():
     cond = DirichletBVP(x0, y0, x1, y1)
     net = FCNN(1, 1)
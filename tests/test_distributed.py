@@ -0,0 +1,68 @@
+import torch
+import torch.distributed as dist
+from pytest import raises
+from torch.nn.utils import parameters_to_vector
+from neurodiffeq.neurodiffeq import safe_diff as diff
+from neurodiffeq.networks import FCNN
+from neurodiffeq.generators import GeneratorSpherical
+from neurodiffeq.conditions import DirichletBVPSpherical
+from neurodiffeq.pde_spherical import SolutionSpherical
+from neurodiffeq.solvers import SwitchOptimizerCallback, LRSchedulerCallback
+from neurodiffeq.distributed import DistributedSphericalSolver, launch
+
+
+def _fit(rank, world_size, optimizer_fn=None):
+    laplace = lambda u, r, theta, phi: [diff(u, r, order=2) + 2 / r * diff(u, r)]
+    net = FCNN(3, 1, hidden_units=(16,))
+    n_calls = [0]
+
+    def callback(solver):
+        n_calls[0] += 1
+        if solver.local_epoch == 2:
+            solver._stop_training = True
+
+    solver = DistributedSphericalSolver(
+        laplace, [DirichletBVPSpherical(r_0=1.0, f=lambda th, ph: 1.0, r_1=2.0, g=lambda th, ph: 0.5)], nets=[net],
+        train_generator=GeneratorSpherical(32, 1.0, 2.0), valid_generator=GeneratorSpherical(32, 1.0, 2.0),
+        optimizer=optimizer_fn(net.parameters()) if optimizer_fn else None, n_batches_valid=1,
+        enforcer=lambda net, cond, points: cond.enforce(net, *points),
+    )
+    # callbacks changing the optimizer are run by every rank
+    switch = SwitchOptimizerCallback(lambda params: torch.optim.SGD(params, lr=1e-3), switch_epoch=1)
+    scheduler = LRSchedulerCallback(lambda optimizer: torch.optim.lr_scheduler.ExponentialLR(optimizer, 0.5))
+    solver.fit(max_epochs=5, callbacks=[callback, switch, scheduler])
+
+    # the replicas are identical, and so are the histories
+    params = [torch.zeros_like(parameters_to_vector(net.parameters())) for _ in range(world_size)]
+    dist.all_gather(params, parameters_to_vector(net.parameters()).detach())
+    losses = [torch.zeros(3) for _ in range(world_size)]
+    dist.all_gather(losses, torch.tensor(solver.loss['train']))
+    calls = [torch.zeros(1) for _ in range(world_size)]
+    dist.all_gather(calls, torch.tensor([float(n_calls[0])]))
+    lrs = [torch.zeros(1) for _ in range(world_size)]
+    dist.all_gather(lrs, torch.tensor([solver.optimizer.param_groups[0]['lr']]))
+    return dict(
+        solution=solver.get_solution(),
+        same_params=all(torch.equal(p, params[0]) for p in params),
+        same_losses=all(torch.equal(loss, losses[0]) for loss in losses),
+        calls=[c.item() for c in calls],
+        lrs=[lr.item() for lr in lrs],
+        switched=isinstance(solver.optimizer, torch.optim.SGD),
+        best=solver.lowest_loss,
+    )
+
+
+def test_distributed_spherical_solver():
+    for optimizer_fn in [None, lambda params: torch.optim.LBFGS(params, max_iter=2)]:
+        result = launch(lambda rank, world_size: _fit(rank, world_size, optimizer_fn), world_size=2, n_threads=1)
+        assert isinstance(result['solution'], SolutionSpherical)
+        assert result['same_params'] and result['same_losses']
+        # callbacks only run in rank 0, which stops the training of all ranks
+        assert result['calls'] == [3, 0]
+        assert result['switched'] and result['lrs'][0] == result['lrs'][1] < 1e-3
+        assert result['best'] is not None
+
+    with raises(RuntimeError):
+        DistributedSphericalSolver(lambda u, r, theta, phi: [u], [DirichletBVPSpherical(1.0, 0.0)], r_min=1, r_max=2)
+    with raises(ValueError):
+        launch(lambda rank, world_size: None, world_size=0)
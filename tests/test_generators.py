@@ -7,6 +7,11 @@ from neurodiffeq.generators import Generator1D
 from neurodiffeq.generators import Generator2D
 from neurodiffeq.generators import Generator3D
 from neurodiffeq.generators import GeneratorSpherical
+from neurodiffeq.generators import GeneratorBox3D
+from neurodiffeq.generators import GeneratorBall3D
+from neurodiffeq.generators import GeneratorCylinder3D
+from neurodiffeq.generators import ParameterGenerator
+from neurodiffeq.generators import InputFunctionGenerator
 # complex generator classes
 from neurodiffeq.generators import ConcatGenerator
 from neurodiffeq.generators import StaticGenerator
@@ -16,6 +21,7 @@ from neurodiffeq.generators import EnsembleGenerator
 from neurodiffeq.generators import FilterGenerator
 from neurodiffeq.generators import ResampleGenerator
 from neurodiffeq.generators import BatchGenerator
+from neurodiffeq.generators import BaseGenerator
 
 MAGIC = 42
 torch.manual_seed(MAGIC)
@@ -144,6 +150,103 @@ def test_generator_spherical():
     assert _check_boundary((r, theta, phi), (r_min, 0.0, 0.0), (r_max, np.pi, np.pi * 2))
 
 
+def test_generator_box_3d():
+    size = 300
+    xyz_min, xyz_max = (0.0, 1.0, 2.0), (1.0, 3.0, 5.0)
+
+    generator = GeneratorBox3D(size, xyz_min=xyz_min, xyz_max=xyz_max, method='volume')
+    x, y, z = generator.get_examples()
+    assert _check_shape_and_grad(generator, size, x, y, z)
+    assert _check_boundary((x, y, z), xyz_min, xyz_max)
+
+    generator = GeneratorBox3D(size, xyz_min=xyz_min, xyz_max=xyz_max, method='surface')
+    x, y, z = generator.get_examples()
+    assert _check_shape_and_grad(generator, size, x, y, z)
+    assert _check_boundary((x, y, z), xyz_min, xyz_max)
+    on_face = torch.stack([(c == lo) | (c == hi) for c, lo, hi in zip((x, y, z), xyz_min, xyz_max)])
+    assert on_face.any(dim=0).all()
+
+    with raises(ValueError):
+        GeneratorBox3D(size, method='bad_method')
+
+
+def test_generator_ball_3d():
+    size = 300
+    center, radius = (1.0, 2.0, 3.0), 2.0
+
+    generator = GeneratorBall3D(size, center=center, radius=radius, method='volume')
+    x, y, z = generator.get_examples()
+    assert _check_shape_and_grad(generator, size, x, y, z)
+    r = ((x - center[0]) ** 2 + (y - center[1]) ** 2 + (z - center[2]) ** 2) ** 0.5
+    assert (r <= radius).all()
+
+    generator = GeneratorBall3D(size, center=center, radius=radius, method='surface')
+    x, y, z = generator.get_examples()
+    assert _check_shape_and_grad(generator, size, x, y, z)
+    r = ((x - center[0]) ** 2 + (y - center[1]) ** 2 + (z - center[2]) ** 2) ** 0.5
+    assert torch.isclose(r, torch.ones_like(r) * radius).all()
+
+
+def test_generator_cylinder_3d():
+    size = 300
+    center, radius, height = (1.0, 2.0, 3.0), 2.0, 4.0
+
+    generator = GeneratorCylinder3D(size, center=center, radius=radius, height=height, method='volume')
+    x, y, z = generator.get_examples()
+    assert _check_shape_and_grad(generator, size, x, y, z)
+    r = ((x - center[0]) ** 2 + (y - center[1]) ** 2) ** 0.5
+    assert (r <= radius).all()
+    assert _check_boundary((z,), (center[2] - height / 2,), (center[2] + height / 2,))
+
+    generator = GeneratorCylinder3D(size, center=center, radius=radius, height=height, method='surface')
+    x, y, z = generator.get_examples()
+    assert _check_shape_and_grad(generator, size, x, y, z)
+    r = ((x - center[0]) ** 2 + (y - center[1]) ** 2) ** 0.5
+    on_lateral = torch.isclose(r, torch.ones_like(r) * radius)
+    on_disks = (z == center[2] - height / 2) | (z == center[2] + height / 2)
+    assert (on_lateral | on_disks).all()
+
+
+def test_parameter_generator():
+    size = 100
+    param_min, param_max = (0.0, 1.0), (1.0, 3.0)
+
+    generator = ParameterGenerator(size, 0.5, 2.0)
+    p = generator.get_examples()
+    assert _check_shape_and_grad(generator, size, p)
+    assert _check_boundary((p,), (0.5,), (2.0,))
+
+    generator = ParameterGenerator(size, param_min, param_max, method='latin-hypercube')
+    a, b = generator.get_examples()
+    assert _check_shape_and_grad(generator, size, a, b)
+    assert _check_boundary((a, b), param_min, param_max)
+    # exactly one value falls in each stratum
+    strata = ((a - param_min[0]) / (param_max[0] - param_min[0]) * size).floor().long()
+    assert (strata.sort()[0] == torch.arange(size)).all()
+
+    x, p = (Generator1D(size) * ParameterGenerator(size, 0.5, 2.0)).get_examples()
+    assert x.shape == p.shape == (size,)
+
+    with raises(ValueError):
+        ParameterGenerator(size, param_min, param_max, method='bad_method')
+    with raises(ValueError):
+        ParameterGenerator(size, param_min, 1.0)
+
+
+def test_input_function_generator():
+    size, n_functions, n_sensors = 60, 4, 3
+    generator = InputFunctionGenerator(size, n_functions, lambda n: torch.rand(n, n_sensors))
+    data = generator.get_examples()
+    assert len(data) == n_sensors
+    for column in data:
+        assert column.shape == (size,)
+        # each function is shared by consecutive points
+        assert len(torch.unique_consecutive(column)) == n_functions
+
+    with raises(ValueError):
+        InputFunctionGenerator(size, 7, lambda n: torch.rand(n, n_sensors))
+
+
 def test_concat_generator():
     size1, size2 = 10, 20
     t_min, t_max = 0.5, 1.5
@@ -367,6 +470,73 @@ def test_resample_generator():
     assert len(torch.unique(x.detach())) < len(x)
 
 
+def test_resample_generator_pooled():
+    class CountingGenerator(Generator1D):
+        def __init__(self, *args, **kwargs):
+            super(CountingGenerator, self).__init__(*args, **kwargs)
+            self.n_calls = 0
+
+        def get_examples(self):
+            self.n_calls += 1
+            return super(CountingGenerator, self).get_examples()
+
+    pool_size, sample_size = 1000, 10
+
+    generator = CountingGenerator(pool_size, t_min=0.0, t_max=1.0, method='uniform')
+    resample_generator = ResampleGenerator(generator, size=sample_size, refresh_every=5)
+    for _ in range(10):
+        x = resample_generator.get_examples()
+        assert _check_shape_and_grad(resample_generator, sample_size, x)
+        assert _check_boundary((x,), (0.0,), (1.0,))
+    assert generator.n_calls == 2
+
+    generator = CountingGenerator(pool_size, t_min=0.0, t_max=1.0, method='uniform')
+    resample_generator = ResampleGenerator(generator, size=sample_size, refresh_fraction=0.1)
+    for _ in range(10):
+        x = resample_generator.get_examples()
+        assert _check_shape_and_grad(resample_generator, sample_size, x)
+    # 1 call for the initial pool, then 9 * 10% of the pool is taken from 1 reserve pool
+    assert generator.n_calls == 2
+    assert len(resample_generator.pool[0]) == pool_size
+
+    # every point of this generator lies in its own unit cell [i, i + 1)
+    class JitteredGrid(BaseGenerator):
+        def __init__(self):
+            super(JitteredGrid, self).__init__()
+            self.size = pool_size
+
+        def get_examples(self):
+            return (torch.arange(pool_size) + torch.rand(pool_size)).requires_grad_()
+
+    resample_generator = ResampleGenerator(JitteredGrid(), size=sample_size, refresh_fraction=0.1, stratify=True)
+    resample_generator.get_examples()
+    first_pool = resample_generator.pool[0].clone()
+    stride = pool_size // sample_size
+    for _ in range(5):
+        x = resample_generator.get_examples()
+        assert _check_shape_and_grad(resample_generator, sample_size, x)
+        assert (torch.div(x.detach(), stride, rounding_mode='floor') == torch.arange(sample_size)).all()
+    # 5 refreshes replaced 10% of the pool each, keeping every point in its cell
+    pool = resample_generator.pool[0]
+    assert (pool != first_pool).sum() == 5 * pool_size // 10
+    assert (pool.floor() == torch.arange(pool_size)).all()
+
+    x = np.arange(pool_size, dtype=np.float32)
+    generator = PredefinedGenerator(x)
+    resample_generator = ResampleGenerator(generator, size=sample_size, refresh_every=1, stratify=True)
+    x = resample_generator.get_examples()
+    assert _check_shape_and_grad(resample_generator, sample_size, x)
+    stride = pool_size // sample_size
+    assert (torch.div(x.detach(), stride, rounding_mode='floor') == torch.arange(sample_size)).all()
+
+    with raises(ValueError):
+        ResampleGenerator(generator, refresh_every=0)
+    with raises(ValueError):
+        ResampleGenerator(generator, refresh_fraction=1.5)
+    with raises(ValueError):
+        ResampleGenerator(generator, stratify=True)
+
+
 def test_batch_generator():
     size = 10
     batch_size = 3
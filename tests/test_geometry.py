@@ -0,0 +1,115 @@
+import struct
+import numpy as np
+import torch
+from pytest import raises
+from neurodiffeq.geometry import Polygon, TriangleMesh, GeometryGenerator, GeometryCondition
+from neurodiffeq.generators import Generator2D, FilterGenerator
+from neurodiffeq.conditions import DirichletBVP2D
+
+MAGIC = 42
+torch.manual_seed(MAGIC)
+np.random.seed(MAGIC)
+
+# an L-shaped polygon with area 3, given in clockwise order
+L_SHAPE = [(0, 0), (0, 2), (1, 2), (1, 1), (2, 1), (2, 0)]
+
+CUBE_VERTICES = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+], dtype=np.float64)
+CUBE_FACES = [
+    [0, 2, 1], [0, 3, 2], [4, 5, 6], [4, 6, 7], [0, 1, 5], [0, 5, 4],
+    [1, 2, 6], [1, 6, 5], [2, 3, 7], [2, 7, 6], [3, 0, 4], [3, 4, 7],
+]
+
+
+def test_polygon():
+    polygon = Polygon(L_SHAPE)
+    assert np.isclose(polygon.area, 3.0)
+    assert np.isclose(polygon.perimeter, 8.0)
+
+    x = torch.tensor([0.5, 1.5, 1.5, 3.0])
+    y = torch.tensor([0.5, 0.5, 1.5, 0.5])
+    assert polygon.contains(x, y).tolist() == [True, True, False, False]
+    assert polygon.winding_number(x, y).tolist() == [1, 1, 0, 0]
+    assert polygon.in_domain(x.numpy().reshape(2, 2), y.numpy().reshape(2, 2)).tolist() == [[True, True], [False, False]]
+
+    x, y = polygon.sample_interior(1000)
+    assert x.shape == y.shape == (1000,)
+    assert polygon.contains(x, y).all()
+
+    x, y, nx, ny = polygon.sample_boundary(1000)
+    assert torch.isclose(nx ** 2 + ny ** 2, torch.ones(1000)).all()
+    # points moved slightly outward along the normals are outside the polygon
+    assert not polygon.contains(x + 1e-6 * nx, y + 1e-6 * ny).any()
+    assert polygon.contains(x - 1e-6 * nx, y - 1e-6 * ny).all()
+
+    with raises(ValueError):
+        Polygon([(0, 0), (1, 1)])
+
+
+def test_triangle_mesh(tmp_path):
+    mesh = TriangleMesh(CUBE_VERTICES, CUBE_FACES)
+    assert np.isclose(mesh.volume, 1.0)
+    assert np.isclose(mesh.area, 6.0)
+
+    x, y, z = torch.tensor([0.5, 1.5]), torch.tensor([0.5, 0.5]), torch.tensor([0.5, 0.5])
+    assert torch.isclose(mesh.winding_number(x, y, z), torch.tensor([1.0, 0.0]), atol=1e-6).all()
+    assert mesh.contains(x, y, z).tolist() == [True, False]
+
+    x, y, z = mesh.sample_interior(500)
+    assert x.shape == (500,)
+    assert ((x >= 0) & (x <= 1) & (y >= 0) & (y <= 1) & (z >= 0) & (z <= 1)).all()
+
+    x, y, z, nx, ny, nz = mesh.sample_boundary(500)
+    assert torch.isclose(nx.abs() + ny.abs() + nz.abs(), torch.ones(500)).all()
+    assert not mesh.contains(x + 1e-6 * nx, y + 1e-6 * ny, z + 1e-6 * nz).any()
+
+    obj_path = tmp_path / 'cube.obj'
+    with open(obj_path, 'w') as f:
+        f.writelines(f'v {a} {b} {c}\n' for a, b, c in CUBE_VERTICES)
+        f.writelines(f'f {a + 1}//1 {b + 1}//1 {c + 1}//1\n' for a, b, c in CUBE_FACES)
+    assert np.isclose(TriangleMesh.from_file(obj_path).volume, 1.0)
+
+    stl_path = tmp_path / 'cube.stl'
+    with open(stl_path, 'wb') as f:
+        f.write(b'\0' * 80 + struct.pack('<I', len(CUBE_FACES)))
+        for face in CUBE_FACES:
+            f.write(struct.pack('<12fH', 0, 0, 0, *CUBE_VERTICES[face].ravel(), 0))
+    mesh = TriangleMesh.from_file(stl_path)
+    assert np.isclose(mesh.volume, 1.0) and len(mesh.vertices) == 8
+
+    with raises(ValueError):
+        TriangleMesh.from_file(tmp_path / 'cube.ply')
+
+    # an open, inconsistently oriented mesh contains no point, so rejection sampling gives up
+    with raises(ValueError):
+        TriangleMesh(CUBE_VERTICES, CUBE_FACES[:2] + [[4, 6, 5]]).sample_interior(4)
+
+
+def test_geometry_generator_and_condition():
+    polygon = Polygon(L_SHAPE)
+
+    generator = GeometryGenerator(polygon, 64)
+    x, y = generator.get_examples()
+    assert x.shape == y.shape == (64,) and x.requires_grad and y.requires_grad
+
+    generator = GeometryGenerator(polygon, 64, method='boundary', with_normals=True)
+    x, y, nx, ny = generator.get_examples()
+    assert x.requires_grad and not nx.requires_grad
+
+    with raises(ValueError):
+        GeometryGenerator(polygon, 64, method='bad_method')
+    with raises(ValueError):
+        GeometryGenerator(polygon, 64, with_normals=True)
+
+    generator = FilterGenerator(Generator2D((16, 16), xy_min=(0, 0), xy_max=(2, 2)), filter_fn=polygon.filter_fn)
+    x, y = generator.get_examples()
+    assert polygon.contains(x, y).all()
+
+    condition = GeometryCondition(polygon, DirichletBVP2D(
+        x_min=0, x_min_val=lambda y: y, x_max=2, x_max_val=lambda y: y,
+        y_min=0, y_min_val=lambda x: x, y_max=2, y_max_val=lambda x: x,
+    ))
+    x, y = torch.rand(10, 1), torch.rand(10, 1)
+    assert condition.parameterize(torch.zeros(10, 1), x, y).shape == (10, 1)
+    assert condition.in_domain(np.array([0.5, 1.5]), np.array([1.5, 1.5])).tolist() == [True, False]
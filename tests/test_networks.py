@@ -5,8 +5,12 @@ import pytest
 from neurodiffeq.networks import FCNN
 from neurodiffeq.networks import Resnet
 from neurodiffeq.networks import MonomialNN
+from neurodiffeq.networks import SeparableFCNN
+from neurodiffeq.networks import DeepONet
 from neurodiffeq.networks import SinActv
 from neurodiffeq.networks import Swish
+from neurodiffeq.networks import FusedNetList
+from neurodiffeq.neurodiffeq import diff
 
 MAGIC = 42
 torch.manual_seed(MAGIC)
@@ -115,3 +119,65 @@ def test_swish():
     assert len(list(f.parameters())) == 1
     assert list(f.parameters())[0].shape == ()
     assert torch.isclose(f(x), x * torch.sigmoid(beta * x)).all()
+
+
+def test_separable_fcnn():
+    for _ in range(N_TESTS):
+        n_samples = np.random.randint(30, 100)
+        n_features_out = np.random.randint(1, 5)
+        _test_shape(n_samples, 3, n_features_out, SeparableFCNN, axis_dims=(2, 1), n_output_units=n_features_out)
+
+    with pytest.raises(ValueError):
+        SeparableFCNN(taylor_order=3)
+
+    net = SeparableFCNN(axis_dims=(1, 1), rank=4)
+    x, t = torch.rand(6, 1), torch.rand(5, 1)
+    ix, it = [g.flatten() for g in torch.meshgrid(torch.arange(6), torch.arange(5), indexing='ij')]
+    xx, tt = x[ix].requires_grad_(), t[it].requires_grad_()
+    u_grid = net.forward_grid([x, t], [xx, tt], [ix, it])
+
+    xx_, tt_ = x[ix].requires_grad_(), t[it].requires_grad_()
+    u_point = net(torch.cat([xx_, tt_], dim=1))
+
+    assert torch.isclose(u_grid, u_point).all()
+    assert torch.isclose(diff(u_grid, tt), diff(u_point, tt_)).all()
+    assert torch.isclose(diff(u_grid, xx, order=2), diff(u_point, xx_, order=2)).all()
+    assert torch.isclose(diff(diff(u_grid, xx), tt), diff(diff(u_point, xx_), tt_)).all()
+
+
+def test_deeponet():
+    for _ in range(N_TESTS):
+        n_samples = np.random.randint(30, 100)
+        n_features_out = np.random.randint(1, 5)
+        _test_shape(n_samples, 2 + 10, n_features_out, DeepONet, n_coords=2, n_sensors=10,
+                    n_output_units=n_features_out)
+
+    net = DeepONet(n_coords=1, n_sensors=3, n_basis=4)
+    t, data = torch.rand(5, 1), torch.rand(5, 3)
+    expected = (net.branch_net(data) * net.trunk_net(t)).sum(dim=1, keepdim=True) + net.bias
+    assert torch.allclose(net(torch.cat([t, data], dim=1)), expected)
+
+    with pytest.raises(ValueError):
+        net(torch.rand(5, 3))
+
+
+def test_fused_net_list():
+    nets = [FCNN(2, 3, hidden_units=(8, 8)) for _ in range(4)]
+    fused = FusedNetList(nets)
+    x = torch.rand(10, 2, requires_grad=True)
+    outputs = fused(x)
+    assert outputs.shape == (4, 10, 3)
+    for net, output in zip(nets, outputs):
+        assert torch.allclose(output, net(x))
+    outputs.sum().backward()
+    assert all(net.NN[0].weight.grad is not None for net in nets)
+
+    # parameters and state_dict are those of a list of the individual networks
+    assert list(fused.parameters()) == list(nn.ModuleList(nets).parameters())
+    assert fused.state_dict().keys() == nn.ModuleList(nets).state_dict().keys()
+
+    assert not FusedNetList.can_fuse([FCNN(2, 3), FCNN(2, 3, actv=SinActv)])
+    assert not FusedNetList.can_fuse([FCNN(2, 3), FCNN(2, 2)])
+    assert not FusedNetList.can_fuse([Swish(beta=1.0), Swish(beta=2.0)])
+    with pytest.raises(ValueError):
+        FusedNetList([FCNN(2, 3), FCNN(2, 2)])
@@ -10,7 +10,7 @@ from neurodiffeq.neurodiffeq import safe_diff as diff
 from neurodiffeq.networks import FCNN, SinActv
 from neurodiffeq.ode import IVP, DirichletBVP
 from neurodiffeq.ode import solve, solve_system, Monitor
-from neurodiffeq.ode import Solution
+from neurodiffeq.ode import Solution, PiecewiseSolution, solve_system_parallel_in_time
 from neurodiffeq.generators import Generator1D
 
 import torch
@@ -114,6 +114,12 @@ def test_ode_system():
         assert isinstance(loss_history[key], list)
     assert len(loss_history[keys[0]]) == len(loss_history[keys[1]])
 
+    # residuals of other shapes are broadcast against the points, as the criterion compares them against zeros
+    flat_circle = lambda u1, u2, u3, t: [(diff(u1, t) - u2).flatten(), diff(u2, t) + u1, 0.0 * u3.sum()]
+    _, flat_history = solve_system(ode_system=flat_circle, conditions=init_vals_pc + [IVP(t_0=0.0, u_0=0.0)],
+                                   t_min=0.0, t_max=2 * np.pi, max_epochs=2)
+    assert len(flat_history['train_loss']) == 2
+
 
 def test_additional_loss_term():
     def particle_squarewell(y1, y2, t):
@@ -177,9 +183,43 @@ def test_solution():
         check_output(us, shape=(N_SAMPLES,), type=torch.Tensor, msg=f"[use_single={use_single}]")
         us = solution(ts, as_type='np')
         check_output(us, shape=(N_SAMPLES,), type=np.ndarray, msg=f"[use_single={use_single}]")
+        us = solution(ts, 'np')
+        check_output(us, shape=(N_SAMPLES,), type=np.ndarray, msg=f"[use_single={use_single}]")
 
         ts = ts.reshape(-1, 1)
         us = solution(ts)
         check_output(us, shape=(N_SAMPLES, 1), type=torch.Tensor, msg=f"[use_single={use_single}]")
         us = solution(ts, as_type='np')
         check_output(us, shape=(N_SAMPLES, 1), type=np.ndarray, msg=f"[use_single={use_single}]")
+
+
+def test_solve_system_parallel_in_time():
+    # u' = v, v' = -u with u(0) = 0, v(0) = 1; the coarse propagator is a few explicit Euler steps
+    def coarse_propagator(u, t0, t1, n_steps=4):
+        (u, v), h = u, (t1 - t0) / n_steps
+        for _ in range(n_steps):
+            u, v = u + h * v, v - h * u
+        return [u, v]
+
+    ode_system = lambda u, v, t: [diff(u, t) - v, diff(v, t) + u]
+    solution, history = solve_system_parallel_in_time(
+        ode_system, [0.0, 1.0], 0.0, 2.0, n_subintervals=2, coarse_propagator=coarse_propagator,
+        max_epochs=50, n_workers=2,
+    )
+    assert isinstance(solution, PiecewiseSolution)
+    # the first subinterval is trained once, the second one again from the corrected initial values
+    assert len(history['interface_change']) == 2 and history['interface_change'][-1] == 0
+    assert [len(h['train_loss']) for h in history['subintervals']] == [50, 100]
+
+    ts = torch.linspace(0.0, 2.0, 21).reshape(-1, 1)
+    us = solution(ts, as_type='np')
+    assert len(us) == 2 and us[0].shape == (21, 1)
+    assert isclose(us[0][0], 0.0) and isclose(us[1][0], 1.0)
+    # the second subinterval starts from the end values of the first one
+    left, right = solution([1.0 - 1e-9, 1.0], as_type='np')[0]
+    assert isclose(left, right, atol=1e-6)
+
+    with raises(ValueError):
+        solve_system_parallel_in_time(ode_system, [0.0, 1.0], 0.0, 2.0, n_subintervals=0)
+    with raises(RuntimeError):
+        solve_system_parallel_in_time(ode_system, [0.0, 1.0], 0.0, 2.0, single_net=FCNN(1, 2), nets=[FCNN(1, 1)] * 2)
@@ -0,0 +1,92 @@
+import numpy as np
+import torch
+from pytest import raises
+
+from neurodiffeq.neurodiffeq import safe_diff as diff
+from neurodiffeq.networks import FCNN
+from neurodiffeq.conditions import IVP, DirichletBVP, DirichletBVPSpherical
+from neurodiffeq.generators import Generator1D, GeneratorSpherical
+from neurodiffeq.solvers import Solver1D
+from neurodiffeq.pde_spherical import SphericalSolver
+from neurodiffeq.optimizers import LevenbergMarquardt, output_layer_parameters, _residual_jacobian
+
+torch.manual_seed(42)
+np.random.seed(42)
+
+
+def test_residual_jacobian():
+    net = FCNN(1, 1, hidden_units=(4,))
+    t = torch.rand(7, 1, requires_grad=True)
+    u = net(t)
+    residuals = (diff(u, t) - u).reshape(-1)
+    params = list(net.parameters())
+    jac = _residual_jacobian(residuals, params, chunk_size=3)
+    assert jac.shape == (7, sum(p.numel() for p in params))
+    for i in range(7):
+        row = torch.cat([g.reshape(-1) for g in torch.autograd.grad(residuals[i], params, retain_graph=True)])
+        assert torch.allclose(jac[i], row)
+
+
+def test_levenberg_marquardt():
+    exponential = lambda u, t: [diff(u, t) - u]
+    net = FCNN(1, 1, hidden_units=(16,))
+    solver = Solver1D(
+        exponential, [IVP(t_0=0.0, u_0=1.0)], nets=[net],
+        train_generator=Generator1D(32, 0.0, 1.0, method='equally-spaced'),
+        valid_generator=Generator1D(32, 0.0, 1.0, method='equally-spaced'),
+        optimizer=LevenbergMarquardt(net.parameters(), max_iter=5, chunk_size=16),
+        batch_size=8,
+    )
+    solver.fit(max_epochs=10)
+    assert solver.metrics_history['valid_loss'][-1] < 1e-6
+    # each step is accepted only if it decreases the loss
+    assert (np.diff(solver.metrics_history['train_loss']) <= 0).all()
+
+    laplace = lambda u, r, theta, phi: [diff(u, r, order=2) + 2 / r * diff(u, r)]
+    net = FCNN(3, 1, hidden_units=(16,))
+    solver = SphericalSolver(
+        laplace, [DirichletBVPSpherical(r_0=1.0, f=lambda th, ph: 1.0, r_1=2.0, g=lambda th, ph: 0.5)], nets=[net],
+        train_generator=GeneratorSpherical(64, 1.0, 2.0), valid_generator=GeneratorSpherical(64, 1.0, 2.0),
+        optimizer=LevenbergMarquardt(net.parameters(), max_iter=2), n_batches_valid=1,
+        enforcer=lambda net, cond, points: cond.enforce(net, *points),
+    )
+    solver.fit(max_epochs=3)
+    assert solver.loss['valid'][-1] < solver.loss['valid'][0]
+
+    # at the minimum, no update is accepted; the damping is left as it was rather than saturated
+    p = torch.ones(2, requires_grad=True)
+    optimizer = LevenbergMarquardt([p], damping=1e-3)
+    optimizer.step(lambda: p - 1.0)
+    assert (p == 1.0).all()
+    assert optimizer.param_groups[0]['damping'] == 1e-3
+
+    with raises(ValueError):
+        LevenbergMarquardt(net.parameters(), damping=0.0)
+
+
+def test_linear_least_squares():
+    # u'' + u = 0, u(0) = 0, u(pi / 2) = 1, solved by u = sin(t)
+    oscillator = lambda u, v, t: [diff(u, t, order=2) + u, diff(v, t) - u]
+    conditions = [DirichletBVP(0.0, 0.0, np.pi / 2, 1.0), IVP(0.0, 1.0)]
+    for chunk_size in [None, 50]:
+        torch.manual_seed(0)
+        nets = [FCNN(1, 1, hidden_units=(64,)) for _ in conditions]
+        hidden_weight = nets[0].NN[0].weight.clone()
+        solver = Solver1D(
+            oscillator, conditions, nets=nets,
+            train_generator=Generator1D(64, 0.0, np.pi / 2, method='equally-spaced'),
+            valid_generator=Generator1D(64, 0.0, np.pi / 2, method='equally-spaced'),
+            n_batches_train=2, n_batches_valid=1,
+        )
+        optimizer = solver.optimizer
+        solver.fit_least_squares(regularization=1e-12, chunk_size=chunk_size)
+        assert solver.global_epoch == 1 and solver.optimizer is optimizer
+        assert torch.equal(nets[0].NN[0].weight, hidden_weight)
+        assert solver.metrics_history['valid_loss'][-1] < 1e-6
+        u, v = solver.get_solution()([0.5, 1.0], as_type='np')
+        assert np.isclose(u, np.sin([0.5, 1.0]), atol=1e-3).all()
+        assert np.isclose(v, 2 - np.cos([0.5, 1.0]), atol=1e-3).all()
+
+    assert len(output_layer_parameters(nets)) == 4
+    with raises(ValueError):
+        output_layer_parameters([torch.nn.Tanh()])
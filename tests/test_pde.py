@@ -9,7 +9,7 @@ from neurodiffeq.neurodiffeq import safe_diff as diff
 from neurodiffeq.networks import FCNN
 from neurodiffeq.pde import DirichletControlPoint, NeumannControlPoint, Point, CustomBoundaryCondition
 from neurodiffeq.pde import solve2D, solve2D_system, Monitor2D, make_animation
-from neurodiffeq.pde import Solution
+from neurodiffeq.pde import Solution, PiecewiseSolution, solve2D_system_decomposed
 from neurodiffeq.generators import PredefinedGenerator, Generator2D
 from neurodiffeq.conditions import DirichletBVP2D, DirichletBVP
 
@@ -505,9 +505,46 @@ def test_solution():
         check_output(us, shape=(N_SAMPLES,), type=torch.Tensor, msg=f"[use_single={use_single}]")
         us = solution(xs, ys, as_type='np')
         check_output(us, shape=(N_SAMPLES,), type=np.ndarray, msg=f"[use_single={use_single}]")
+        us = solution(xs, ys, 'np')
+        check_output(us, shape=(N_SAMPLES,), type=np.ndarray, msg=f"[use_single={use_single}]")
 
         xs, ys = xs.reshape(-1, 1), ys.reshape(-1, 1)
         us = solution(xs, ys)
         check_output(us, shape=(N_SAMPLES, 1), type=torch.Tensor, msg=f"[use_single={use_single}]")
         us = solution(xs, ys, as_type='np')
         check_output(us, shape=(N_SAMPLES, 1), type=np.ndarray, msg=f"[use_single={use_single}]")
+
+
+def test_solve2D_system_decomposed():
+    # Laplace's equation with the exact solution u = x^2 - y^2
+    pde_system = lambda u, x, y: [diff(u, x, order=2) + diff(u, y, order=2)]
+    conditions = [DirichletBVP2D(
+        x_min=0, x_min_val=lambda y: -y ** 2, x_max=1, x_max_val=lambda y: 1 - y ** 2,
+        y_min=0, y_min_val=lambda x: x ** 2, y_max=1, y_max_val=lambda x: x ** 2 - 1,
+    )]
+    bounds = []
+
+    def generator_fn(xy_min, xy_max):
+        bounds.append((xy_min, xy_max))
+        return Generator2D((8, 8), xy_min, xy_max)
+
+    for n_workers in [None, 0]:
+        bounds.clear()
+        solution, history = solve2D_system_decomposed(
+            pde_system, conditions, (0, 0), (1, 1), n_subdomains=(2, 1), generator_fn=generator_fn,
+            n_rounds=2, epochs_per_round=5, n_workers=n_workers,
+        )
+        assert sorted(set(bounds)) == [((0.0, 0.0), (0.5, 1.0)), ((0.5, 0.0), (1.0, 1.0))]
+        assert isinstance(solution, PiecewiseSolution)
+        assert len(history['interface_jump']) == 2
+        assert len(history['subdomains']) == 2 and len(history['subdomains'][0]) == 1
+        assert len(history['subdomains'][1][0]['train_loss']) == 10
+
+        xs, ys = torch.rand(10, 3), torch.rand(10, 3)
+        assert solution(xs, ys).shape == (10, 3)
+        # the boundary conditions hold on every subdomain
+        us = solution([0.0, 0.25, 0.75, 1.0], [0.5, 0.0, 1.0, 0.5], as_type='np')
+        assert np.allclose(us, [-0.25, 0.0625, -0.4375, 0.75])
+
+    with raises(ValueError):
+        solve2D_system_decomposed(pde_system, conditions, (0, 0), (1, 1), n_subdomains=(0, 2))
@@ -0,0 +1,516 @@
+import time
+import warnings
+import numpy as np
+import torch
+from pytest import raises, warns
+
+from neurodiffeq.neurodiffeq import safe_diff as diff
+from neurodiffeq.networks import FCNN, DeepONet
+from neurodiffeq.conditions import IVP, DirichletBVP2D, IBVP1D, DirichletBVPSpherical, DirichletBVPSphericalBasis
+from neurodiffeq.generators import Generator1D, Generator2D, ParameterGenerator, InputFunctionGenerator
+from neurodiffeq.generators import GeneratorSpherical
+from neurodiffeq.solvers import BaseSolver, Solver1D, Solver2D, SwitchOptimizerCallback
+from neurodiffeq.solvers import EarlyStoppingCallback, PlateauCallback, LRSchedulerCallback
+from neurodiffeq.pde_spherical import SphericalSolver
+from neurodiffeq import ode, pde
+
+torch.manual_seed(42)
+np.random.seed(42)
+
+
+def test_solver_1d():
+    exponential = lambda u, t: [diff(u, t) - u]
+    solver = Solver1D(
+        exponential, [IVP(t_0=0.0, u_0=1.0)], t_min=0.0, t_max=1.0,
+        n_batches_train=2, n_batches_valid=2,
+        metrics={'mse': lambda u, t: ((u - torch.exp(t)) ** 2).mean()},
+        analytic_solutions=lambda t: [torch.exp(t)],
+    )
+    solver.fit(max_epochs=3)
+    # training can be resumed
+    solver.fit(max_epochs=2)
+    assert solver.global_epoch == 5
+    for key in ['train_loss', 'valid_loss', 'train__mse', 'valid__mse', 'train__analytic_mse']:
+        assert len(solver.metrics_history[key]) == 5
+    assert np.isclose(solver.metrics_history['valid__mse'], solver.metrics_history['valid__analytic_mse']).all()
+    assert solver.lowest_loss == min(solver.metrics_history['valid_loss'])
+
+    solution = solver.get_solution()
+    assert isinstance(solution, ode.Solution)
+    assert solution([0.5]).shape == (1,)
+
+    nets, generator = solver.get_internals(['nets', 'generator'])
+    assert nets is solver.nets and len(nets) == 1
+    assert set(solver.get_internals(['t_min', 't_max'], return_type='dict').values()) == {0.0, 1.0}
+
+    with raises(RuntimeError):
+        Solver1D(exponential, [IVP(t_0=0.0, u_0=1.0)])
+    with raises(NotImplementedError):
+        BaseSolver(exponential, [IVP(t_0=0.0, u_0=1.0)], n_input_units=1,
+                   train_generator=Generator1D(32), valid_generator=Generator1D(32)).get_solution()
+
+
+def test_solver_2d_single_net_and_callbacks():
+    laplace = lambda u, v, x, y: [diff(u, x, order=2) + diff(u, y, order=2), v - u]
+    condition = DirichletBVP2D(
+        x_min=0, x_min_val=lambda y: torch.sin(np.pi * y),
+        x_max=1, x_max_val=lambda y: 0,
+        y_min=0, y_min_val=lambda x: 0,
+        y_max=1, y_max_val=lambda x: 0,
+    )
+    net = FCNN(n_input_units=2, n_output_units=2)
+    solver = Solver2D(
+        laplace, [condition, DirichletBVP2D(0, lambda y: 0, 1, lambda y: 0, 0, lambda x: 0, 1, lambda x: 0)],
+        single_net=net, train_generator=Generator2D((8, 8)), valid_generator=Generator2D((8, 8)),
+        batch_size=16, shuffle=True,
+    )
+
+    def stop_after_two_epochs(solver):
+        if solver.local_epoch == 1:
+            solver._stop_training = True
+
+    solver.fit(max_epochs=10, callbacks=[stop_after_two_epochs])
+    assert solver.global_epoch == 2
+    solution = solver.get_solution(best=False)
+    assert isinstance(solution, pde.Solution)
+    u, v = solution([0.5, 0.2], [0.5, 0.3])
+    assert u.shape == v.shape == (2,)
+
+    with raises(RuntimeError):
+        Solver2D(laplace, [condition], nets=[net], single_net=net, xy_min=(0, 0), xy_max=(1, 1))
+
+
+def test_running_average_epoch_loss():
+    exponential = lambda u, t: [diff(u, t) - u]
+    mse = lambda u, t: ((u - torch.exp(t)) ** 2).mean()
+    histories = []
+    for exact_epoch_loss in [False, True]:
+        torch.manual_seed(0)
+        net = FCNN(1, 1)
+        solver = Solver1D(
+            exponential, [IVP(t_0=0.0, u_0=1.0)], nets=[net],
+            train_generator=Generator1D(30, 0.0, 1.0, method='equally-spaced'),
+            valid_generator=Generator1D(30, 0.0, 1.0, method='equally-spaced'),
+            # with a zero learning rate, the average over mini-batches must equal the exact epoch loss
+            optimizer=torch.optim.SGD(net.parameters(), lr=0.0),
+            batch_size=7, shuffle=True, exact_epoch_loss=exact_epoch_loss, metrics={'mse': mse},
+        )
+        solver.fit(max_epochs=2)
+        histories.append(solver.metrics_history)
+
+    running, exact = histories
+    for key in ['train_loss', 'train__mse', 'valid_loss']:
+        assert np.isclose(running[key], exact[key]).all()
+
+
+def test_metrics_reuse_function_values():
+    class CountingFCNN(FCNN):
+        n_calls = 0
+
+        def forward(self, t):
+            CountingFCNN.n_calls += 1
+            return super(CountingFCNN, self).forward(t)
+
+    exponential = lambda u, t: [diff(u, t) - u]
+    metrics = {
+        'mse': lambda u, t: ((u - torch.exp(t)) ** 2).mean(),
+        'residual': lambda u, t: (diff(u, t) - u).abs().mean(),
+        # builds a graph of its own, hence can't be evaluated under torch.no_grad()
+        'grad_norm': lambda u, t: torch.autograd.grad((2 * u).sum(), t, create_graph=True)[0].abs().mean(),
+    }
+    solver = Solver1D(
+        exponential, [IVP(t_0=0.0, u_0=1.0)], nets=[CountingFCNN(1, 1)], t_min=0.0, t_max=1.0,
+        n_batches_train=2, n_batches_valid=1, metrics=metrics,
+    )
+    solver.fit(max_epochs=2)
+    # one forward pass per batch, shared by the loss and all metrics
+    assert CountingFCNN.n_calls == (2 + 1) * 2
+    assert solver._metrics_need_grad == {'grad_norm'}
+    assert all(v > 0 for v in solver.metrics_history['valid__grad_norm'])
+
+
+def test_compile():
+    def train(compile, equation, metrics=None):
+        torch.manual_seed(0)
+        net = FCNN(1, 1)
+        solver = Solver1D(
+            equation, [IVP(t_0=0.0, u_0=0.0)], nets=[net],
+            train_generator=Generator1D(16, 0.0, 1.0, method='equally-spaced'),
+            valid_generator=Generator1D(16, 0.0, 1.0, method='equally-spaced'),
+            optimizer=torch.optim.SGD(net.parameters(), lr=0.01), metrics=metrics, compile=compile,
+        )
+        solver.fit(max_epochs=3)
+        return solver
+
+    # no derivatives in the residuals, can be compiled
+    algebraic = lambda u, t: [u - torch.sin(t)]
+    eager, compiled = train(False, algebraic), train(True, algebraic)
+    assert compiled.compile
+    for key in ['train_loss', 'valid_loss']:
+        assert np.isclose(eager.metrics_history[key], compiled.metrics_history[key]).all()
+
+    # derivatives in the residuals or metrics can't be compiled, the solver falls back to eager mode
+    exponential = lambda u, t: [diff(u, t) - u]
+    residual = {'residual': lambda u, t: (diff(u, t) - u).abs().mean()}
+    for equation, metrics in [(exponential, None), (algebraic, residual)]:
+        eager = train(False, equation, metrics)
+        with warns(UserWarning):
+            compiled = train(True, equation, metrics)
+        assert not compiled.compile
+        for key in eager.metrics_history:
+            assert np.isclose(eager.metrics_history[key], compiled.metrics_history[key]).all()
+
+    # errors of the equations themselves aren't taken for failures of compilation
+    def broken(u, t):
+        raise KeyError('broken equation')
+
+    with warnings.catch_warnings(record=True) as record, raises(KeyError):
+        warnings.simplefilter('always')
+        train(True, broken)
+    assert not any('compile' in str(w.message) for w in record)
+
+
+def test_lbfgs_and_switch_optimizer():
+    exponential = lambda u, t: [diff(u, t) - u]
+    for batch_size in [None, 8]:
+        net = FCNN(1, 1)
+        solver = Solver1D(
+            exponential, [IVP(t_0=0.0, u_0=1.0)], nets=[net],
+            train_generator=Generator1D(32, 0.0, 1.0, method='equally-spaced'),
+            valid_generator=Generator1D(32, 0.0, 1.0, method='equally-spaced'),
+            optimizer=torch.optim.LBFGS(net.parameters(), max_iter=5), n_batches_train=2, batch_size=batch_size,
+        )
+        solver.fit(max_epochs=3)
+        # one step on all points of each epoch, regardless of mini-batching
+        assert solver.optimizer.state[next(net.parameters())]['n_iter'] == 3 * 5
+        assert solver.metrics_history['train_loss'][-1] < solver.metrics_history['train_loss'][0]
+
+    solver = Solver1D(exponential, [IVP(t_0=0.0, u_0=1.0)], t_min=0.0, t_max=1.0)
+    params = list(solver.nets[0].parameters())
+    switch = SwitchOptimizerCallback(switch_epoch=2)
+    solver.fit(max_epochs=1, callbacks=[switch])
+    assert isinstance(solver.optimizer, torch.optim.Adam) and not switch.switched
+    solver.fit(max_epochs=2, callbacks=[switch])
+    assert isinstance(solver.optimizer, torch.optim.LBFGS) and switch.switched
+    assert solver.optimizer.param_groups[0]['params'] == params
+
+    # with a zero learning rate, the training loss plateaus immediately
+    net = FCNN(1, 1)
+    solver = Solver1D(exponential, [IVP(t_0=0.0, u_0=1.0)], nets=[net], t_min=0.0, t_max=1.0,
+                      train_generator=Generator1D(32, 0.0, 1.0, method='equally-spaced'),
+                      optimizer=torch.optim.SGD(net.parameters(), lr=0.0))
+    switch = SwitchOptimizerCallback(patience=2)
+    solver.fit(max_epochs=4, callbacks=[switch])
+    assert switch.switched
+
+    with raises(ValueError):
+        SwitchOptimizerCallback()
+
+
+def test_ensemble():
+    exponential = lambda u, t: [diff(u, t) - u]
+    for shared_points in [True, False]:
+        solver = Solver1D(
+            exponential, [IVP(t_0=0.0, u_0=1.0)], t_min=0.0, t_max=1.0, batch_size=8, shuffle=True,
+            ensemble_size=3, ensemble_shared_points=shared_points,
+            metrics={'mse': lambda u, t: ((u - torch.exp(t)) ** 2).mean()},
+        )
+        members = list(solver.nets[0])
+        solver.fit(max_epochs=2)
+        assert len(solver.metrics_history['valid__mse']) == 2
+        solutions = solver.get_solution(best=False)
+        assert len(solutions) == 3
+        ts = torch.rand(10, 1)
+        for member, solution in zip(members, solutions):
+            # each member is trained independently of the others
+            assert member.NN[0].weight.grad is not None
+            expected = IVP(t_0=0.0, u_0=1.0).enforce(member, ts)
+            assert torch.allclose(solution(ts), expected.detach())
+        assert not torch.allclose(solutions[0](ts), solutions[1](ts))
+        # the best solution of each member is that of the corresponding best network
+        for member, solution in zip(solver.best_nets[0], solver.get_solution(best=True)):
+            assert torch.allclose(solution(ts), IVP(t_0=0.0, u_0=1.0).enforce(member, ts).detach())
+
+    # an optimizer created on the original network is rebuilt on all members
+    net = FCNN(1, 1)
+    with warns(UserWarning):
+        solver = Solver1D(
+            exponential, [IVP(t_0=0.0, u_0=1.0)], t_min=0.0, t_max=1.0, nets=[net], ensemble_size=2,
+            optimizer=torch.optim.SGD(net.parameters(), lr=0.5),
+        )
+    assert isinstance(solver.optimizer, torch.optim.SGD) and solver.optimizer.param_groups[0]['lr'] == 0.5
+    assert len(solver.optimizer.param_groups[0]['params']) == len(list(solver.nets[0].parameters()))
+
+    # members don't interact: the ensemble loss is the average of the losses of the members trained one by one
+    nets = [FCNN(2, 2) for _ in range(2)]
+    laplace = lambda u, v, x, y: [diff(u, x, order=2) + diff(u, y, order=2), v - u]
+    conditions = [DirichletBVP2D(0, lambda y: 0, 1, lambda y: 0, 0, lambda x: 0, 1, lambda x: x) for _ in range(2)]
+    generator = Generator2D((4, 4), method='equally-spaced')
+    single = [
+        Solver2D(laplace, conditions, single_net=net, train_generator=generator, valid_generator=generator)
+        for net in nets
+    ]
+    ensemble = Solver2D(laplace, conditions, single_net=nets[0], train_generator=generator, valid_generator=generator,
+                        ensemble_size=2)
+    ensemble.single_net[1].load_state_dict(nets[1].state_dict())
+    ensemble.set_optimizer(lambda params: torch.optim.SGD(params, lr=0.0))
+    ensemble.fit(max_epochs=1)
+    losses = []
+    for solver in single:
+        solver.set_optimizer(lambda params: torch.optim.SGD(params, lr=0.0))
+        solver.fit(max_epochs=1)
+        losses.append(solver.metrics_history['valid_loss'][0])
+    assert np.isclose(ensemble.metrics_history['valid_loss'][0], np.mean(losses))
+
+
+def test_fused_nets():
+    oscillator = lambda u, v, t: [diff(u, t) - v, diff(v, t) + u]
+    conditions = [IVP(t_0=0.0, u_0=0.0), IVP(t_0=0.0, u_0=1.0)]
+    assert Solver1D(oscillator, conditions, t_min=0.0, t_max=1.0)._fused_nets is None
+    solver = Solver1D(oscillator, conditions, t_min=0.0, t_max=1.0, fuse_nets=True)
+    # the default networks have identical architectures
+    assert solver._fused_nets is not None
+    t = torch.rand(10, 1, requires_grad=True)
+    for u, net, condition in zip(solver.compute_func_val(t), solver.nets, conditions):
+        assert torch.allclose(u, condition.enforce(net, t))
+    weights = [net.NN[0].weight.clone() for net in solver.nets]
+    solver.fit(max_epochs=2)
+    # every network is trained through the fused evaluation
+    assert all(not torch.equal(net.NN[0].weight, w) for net, w in zip(solver.nets, weights))
+
+    with warns(UserWarning):
+        solver = Solver1D(oscillator, conditions, t_min=0.0, t_max=1.0, fuse_nets=True,
+                          nets=[FCNN(1, 1), FCNN(1, 1, hidden_units=(8,))])
+    assert solver._fused_nets is None
+
+
+def test_parametric():
+    # u' = -k u, u(0) = u_0 for all k in [0.5, 2] and u_0 in [1, 2]
+    decay = lambda u, t, k, u_0: [diff(u, t) + k * u]
+    generator = lambda: Generator1D(32, 0.0, 1.0) * ParameterGenerator(32, (0.5, 1.0), (2.0, 2.0))
+    conditions = [IVP(t_0=0.0, u_0=lambda k, u_0: u_0)]
+    with raises(RuntimeError):
+        Solver1D(decay, conditions, t_min=0.0, t_max=1.0, n_params=2)
+    solver = Solver1D(
+        decay, conditions, train_generator=generator(), valid_generator=generator(), n_params=2,
+        analytic_solutions=lambda t, k, u_0: [u_0 * torch.exp(-k * t)],
+    )
+    assert solver.nets[0].NN[0].in_features == 3
+    solver.fit(max_epochs=2)
+    assert len(solver.metrics_history['valid__analytic_mse']) == 2
+
+    solution = solver.get_solution()
+    ts = torch.linspace(0.0, 1.0, 5)
+    # parameters are broadcast against the coordinates
+    assert solution(ts, params=(1.0, 1.5)).shape == (5,)
+    assert torch.allclose(solution(ts, params=(torch.ones(5), 1.5)), solution(ts, params=(1.0, 1.5)))
+    assert torch.allclose(solution([0.0, 0.0], params=([1.0, 2.0], [1.5, 1.2])), torch.tensor([1.5, 1.2]))
+    # the return type can still be given positionally
+    assert isinstance(solution(ts, 'np', params=(1.0, 1.5)), np.ndarray)
+
+    laplace = lambda u, x, y, a: [diff(u, x, order=2) + diff(u, y, order=2)]
+    condition = DirichletBVP2D(
+        x_min=0, x_min_val=lambda y, a: a * torch.sin(np.pi * y),
+        x_max=1, x_max_val=lambda y, a: torch.zeros_like(y),
+        y_min=0, y_min_val=lambda x, a: torch.zeros_like(x),
+        y_max=1, y_max_val=lambda x, a: torch.zeros_like(x),
+    )
+    generator = lambda: Generator2D((8, 8)) * ParameterGenerator(64, 0.0, 1.0, method='latin-hypercube')
+    solver = Solver2D(laplace, [condition], train_generator=generator(), valid_generator=generator(), n_params=1)
+    solver.fit(max_epochs=2)
+    solution = solver.get_solution()
+    assert torch.allclose(solution([0.0], [0.5], params=[0.3]), torch.tensor([0.3]))
+
+    # the default enforcer of SphericalSolver passes the parameters on to the condition
+    laplace = lambda u, r, theta, phi, a: [diff(u * r, r, order=2) / r]
+    condition = DirichletBVPSpherical(r_0=1.0, f=lambda theta, phi, a: a, r_1=2.0, g=lambda theta, phi, a: 0.0 * a)
+    generator = lambda: GeneratorSpherical(64, 1.0, 2.0) * ParameterGenerator(64, 0.0, 1.0)
+    solver = SphericalSolver(
+        laplace, [condition], nets=[FCNN(4, 1)], train_generator=generator(), valid_generator=generator(),
+    )
+    solver.fit(max_epochs=2)
+    solution = solver.get_solution()
+    assert torch.allclose(solution([1.0, 2.0], [0.5, 0.5], [0.5, 0.5], params=([0.3, 0.3],)), torch.tensor([0.3, 0.0]))
+    # conditions enforced on networks of the radius alone are only given the radius
+    points = GeneratorSpherical(8).get_examples()
+    basis_condition = DirichletBVPSphericalBasis(r_0=0.0, R_0=torch.zeros(1))
+    assert len(SphericalSolver._trim_points(basis_condition, points)) == 1
+
+
+def test_operator_learning():
+    # heat equation whose initial value is a1 sin(pi x) + a2 sin(2 pi x), learned for all (a1, a2)
+    heat = lambda u, x, t, a1, a2: [diff(u, t) - 0.1 * diff(u, x, order=2)]
+    condition = IBVP1D(
+        x_min=0.0, x_max=1.0, t_min=0.0,
+        t_min_val=lambda x, a1, a2: a1 * torch.sin(np.pi * x) + a2 * torch.sin(2 * np.pi * x),
+        x_min_val=lambda t, a1, a2: torch.zeros_like(t),
+        x_max_val=lambda t, a1, a2: torch.zeros_like(t),
+    )
+    sampler = lambda n: torch.rand(n, 2) * 2 - 1
+    generator = lambda: Generator2D((8, 8), xy_max=(1.0, 0.5)) * InputFunctionGenerator(64, 4, sampler)
+    solver = Solver2D(
+        heat, [condition], nets=[DeepONet(n_coords=2, n_sensors=2, n_basis=8, hidden_units=(16,))],
+        train_generator=generator(), valid_generator=generator(), n_params=2,
+    )
+    solver.fit(max_epochs=2)
+
+    # the solution for new initial values is a forward pass
+    solution = solver.get_solution()
+    xs = torch.linspace(0.0, 1.0, 5)
+    a = torch.tensor([0.3, -0.7])
+    assert torch.allclose(solution(xs, torch.zeros(5), params=a), a[0] * torch.sin(np.pi * xs) + a[1] * torch.sin(2 * np.pi * xs))
+    assert solution(xs, 0.25, 'np', params=a).shape == (5,)
+
+
+def test_early_stopping_plateau_and_lr_scheduler():
+    exponential = lambda u, t: diff(u, t) + u
+    frozen = lambda net: torch.optim.SGD(net.parameters(), lr=0.0)
+
+    # with a frozen network on fixed points, the loss never improves
+    net = FCNN(1, 1)
+    fixed = Generator1D(16, 0.0, 1.0, method='equally-spaced')
+    _, history = ode.solve(
+        exponential, IVP(0.0, 1.0), net=net, train_generator=fixed, valid_generator=fixed, optimizer=frozen(net),
+        max_epochs=100, callbacks=[EarlyStoppingCallback(patience=3)],
+    )
+    assert len(history['valid_loss']) == 4
+
+    n_plateaus = []
+    net = FCNN(1, 1)
+    _, history = ode.solve(
+        exponential, IVP(0.0, 1.0), net=net, train_generator=fixed, valid_generator=fixed, optimizer=frozen(net),
+        max_epochs=10, callbacks=[PlateauCallback(patience=2, action=lambda solver: n_plateaus.append(1))],
+    )
+    # the detection restarts after each plateau
+    assert len(n_plateaus) == 4
+    _, history = ode.solve(
+        exponential, IVP(0.0, 1.0), 0.0, 1.0, max_epochs=100, callbacks=[PlateauCallback(patience=5, rel_tol=1.0)],
+    )
+    assert len(history['train_loss']) == 6
+
+    # the scheduler is created on the optimizer the solver creates by default, after the first epoch
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        _, _, internal = ode.solve(
+            exponential, IVP(0.0, 1.0), 0.0, 1.0, max_epochs=3, return_internal=True,
+            callbacks=[LRSchedulerCallback(lambda optimizer: torch.optim.lr_scheduler.ExponentialLR(optimizer, 0.5))],
+        )
+    assert not any('lr_scheduler.step()' in str(w.message) for w in caught)
+    # it isn't stepped before the optimizer, hence the second epoch runs with its initial learning rate
+    assert np.isclose(internal['optimizer'].param_groups[0]['lr'], 1e-3 / 4)
+
+    # the optimizer doesn't train the network, so that the validation loss stays the same
+    net, zero = FCNN(2, 1), lambda z: 0 * z
+    optimizer = torch.optim.SGD([torch.zeros(1, requires_grad=True)], lr=0.1)
+    scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(optimizer, factor=0.5, patience=0)
+    pde.solve2D(
+        lambda u, x, y: diff(u, x) + diff(u, y), DirichletBVP2D(0, zero, 1, zero, 0, zero, 1, zero), net=net,
+        train_generator=Generator2D((4, 4)), valid_generator=Generator2D((4, 4), method='equally-spaced'),
+        optimizer=optimizer, max_epochs=3, callbacks=[LRSchedulerCallback(scheduler)],
+    )
+    # the learning rate is halved after every epoch but the first
+    assert np.isclose(optimizer.param_groups[0]['lr'], 0.025)
+
+    # a scheduler of an optimizer that has been replaced isn't stepped anymore
+    net = FCNN(1, 1)
+    optimizer = torch.optim.SGD(net.parameters(), lr=0.1)
+    scheduler = torch.optim.lr_scheduler.ExponentialLR(optimizer, 0.5)
+    switch = SwitchOptimizerCallback(lambda params: torch.optim.SGD(params, lr=0.1), switch_epoch=2)
+    with warns(UserWarning, match='scheduler'):
+        ode.solve(
+            exponential, IVP(0.0, 1.0), 0.0, 1.0, net=net, optimizer=optimizer, max_epochs=4,
+            callbacks=[switch, LRSchedulerCallback(scheduler)],
+        )
+    assert np.isclose(optimizer.param_groups[0]['lr'], 0.1 / 2)
+
+    with raises(ValueError):
+        EarlyStoppingCallback(patience=0)
+    with raises(ValueError):
+        PlateauCallback(patience=1, smoothing=1.0)
+
+
+def test_fit_time_budget():
+    exponential = lambda u, t: [diff(u, t) - u]
+    solver = Solver1D(exponential, [IVP(t_0=0.0, u_0=1.0)], t_min=0.0, t_max=1.0)
+    start = time.perf_counter()
+    solver.fit(max_epochs=None, time_budget=1.0)
+    assert time.perf_counter() - start < 1.5
+    n_train, n_valid = len(solver.metrics_history['train_loss']), len(solver.metrics_history['valid_loss'])
+    # validation is thinned out as the budget runs out, but the last epoch is validated
+    assert 1 < n_valid < n_train
+    assert solver.lowest_loss == min(solver.metrics_history['valid_loss'])
+    # the epochs are capped by `max_epochs` as well
+    solver.fit(max_epochs=3, time_budget=100.0)
+    assert len(solver.metrics_history['train_loss']) == n_train + 3
+    with raises(ValueError):
+        solver.fit(max_epochs=None)
+
+    start = time.perf_counter()
+    solution, history = ode.solve(
+        lambda u, t: diff(u, t) - u, IVP(0.0, 1.0), 0.0, 1.0, max_epochs=10 ** 6, time_budget=0.5
+    )
+    assert time.perf_counter() - start < 1.0
+    assert len(history['train_loss']) < 10 ** 6
+
+    # early stopping watches the validated epochs of the current call only, also when validation is thinned out
+    slow_exponential = lambda u, t: [time.sleep(0.02) or diff(u, t) - u]
+    solver = Solver1D(slow_exponential, [IVP(t_0=0.0, u_0=1.0)], t_min=0.0, t_max=1.0, n_batches_valid=1)
+    solver.fit(max_epochs=5)
+    validated = []
+    solver.fit(max_epochs=None, time_budget=2.0, callbacks=[
+        lambda s: validated.append(s.local_epoch), EarlyStoppingCallback(patience=40, min_delta=np.inf),
+    ])
+    # the loss never improves by more than `min_delta`, so the training stops upon the 41st validation, if any
+    assert len(validated) <= 41
+    assert solver._stop_training == (len(validated) == 41)
+
+
+def test_best_nets_snapshot():
+    exponential = lambda u, t: [diff(u, t) - u]
+    solver = Solver1D(exponential, [IVP(t_0=0.0, u_0=1.0)], t_min=0.0, t_max=1.0)
+    assert solver.best_nets is None
+    solver.fit(max_epochs=5)
+    flat = solver._best_snapshot.flat[torch.get_default_dtype()]
+    address = flat.data_ptr()
+    # the best networks are only built upon request, and then kept until the next improvement
+    solver.get_internals(['nets', 'lowest_loss'])
+    assert solver._best_nets is None
+    best_nets = solver.get_internals('best_nets')
+    assert solver.best_nets is best_nets
+    best_loss = solver.lowest_loss
+    solver.fit(max_epochs=5)
+    # the snapshot is taken in place
+    assert solver._best_snapshot.flat[torch.get_default_dtype()].data_ptr() == address
+
+    # the best networks are copies, restored from the snapshot
+    params = torch.nn.utils.parameters_to_vector(solver.best_nets[0].parameters())
+    assert torch.equal(params, flat)
+    assert solver.best_nets[0] is not solver.nets[0]
+    if solver.lowest_loss < best_loss:
+        assert not torch.equal(params, torch.nn.utils.parameters_to_vector(best_nets[0].parameters()))
+    t = torch.rand(10, 1)
+    # the snapshot is loaded into the copy of the networks held by the solution
+    solver._best_nets = None
+    best_solution = solver.get_solution(best=True)
+    assert solver._best_nets is None
+    solver._best_snapshot.load(solver.nets)
+    assert torch.equal(best_solution(t), solver.get_solution(best=False)(t))
+
+
+def test_spherical_solver_history():
+    laplace = lambda u, r, theta, phi: [diff(u * r, r, order=2) / r]
+    condition = DirichletBVPSpherical(r_0=1.0, f=lambda theta, phi: 1.0, r_1=2.0, g=lambda theta, phi: 0.5)
+    make_solver = lambda: SphericalSolver(
+        laplace, [condition], r_min=1.0, r_max=2.0, analytic_solutions=lambda r, theta, phi: [1 / r],
+    )
+    solver = make_solver()
+    solver.fit(max_epochs=2)
+    assert solver.loss['valid'] is solver.metrics_history['valid_loss']
+    assert len(solver.analytic_mse['train']) == 2
+
+    # the histories can be restored, e.g. from a checkpoint
+    restored = make_solver()
+    restored.loss = solver.loss
+    restored.analytic_mse = solver.analytic_mse
+    assert restored.metrics_history == solver.metrics_history
+    assert restored.global_epoch == 2
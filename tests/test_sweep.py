@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import torch
+from pytest import raises, warns
+from neurodiffeq.neurodiffeq import safe_diff as diff
+from neurodiffeq.networks import FCNN, SinActv
+from neurodiffeq.conditions import IVP, DirichletBVPSpherical
+from neurodiffeq.generators import GeneratorSpherical
+from neurodiffeq.ode import solve
+from neurodiffeq.pde_spherical import SphericalSolver
+from neurodiffeq.sweep import run_sweep
+
+
+def test_median_pruning():
+    def objective(params, trial):
+        for epoch in range(1, 5):
+            trial.report(epoch, params['loss'] * epoch)
+        return params['loss'] * 4
+
+    # trials run one after another, each compared with the median of the ones before
+    results = run_sweep(objective, {'loss': [1.0, 3.0, 2.0, 0.5]}, n_workers=0, prune_after=2, min_trials=1)
+    assert list(results['trial']) == [3, 0, 1, 2]
+    assert list(results['status']) == ['complete', 'complete', 'pruned', 'pruned']
+    assert list(results['score']) == [2.0, 4.0, 6.0, 8.0]
+    assert list(results['epochs']) == [4, 4, 2, 4]
+
+    # the trials run in this process, whose random state and number of threads are left as they were
+    random_objective = lambda params, trial: params['loss'] + torch.rand(1).item() + np.random.rand()
+    n_threads = torch.get_num_threads()
+    torch.manual_seed(123)
+    np.random.seed(123)
+    expected = torch.rand(1), np.random.rand()
+    torch.manual_seed(123)
+    np.random.seed(123)
+    results = run_sweep(random_objective, {'loss': lambda rng: rng.uniform(1, 2)}, n_trials=3, n_workers=0,
+                        n_threads=n_threads + 1)
+    assert len(results) == 3 and (results['status'] == 'complete').all()
+    results = run_sweep(lambda params, trial: torch.get_num_threads(), {'loss': [1.0]}, n_workers=0,
+                        n_threads=n_threads + 1)
+    assert list(results['score']) == [n_threads + 1] and torch.get_num_threads() == n_threads
+    assert torch.equal(torch.rand(1), expected[0]) and np.random.rand() == expected[1]
+    with raises(ValueError):
+        run_sweep(objective, {'loss': lambda rng: rng.uniform(1, 2)})
+
+
+def test_run_sweep(tmp_path):
+    def spherical_objective(params, trial):
+        laplace = lambda u, r, theta, phi: [diff(u, r, order=2) + 2 / r * diff(u, r)]
+        net = FCNN(3, 1, hidden_units=(params['width'],), actv=params['actv'])
+        solver = SphericalSolver(
+            laplace, [DirichletBVPSpherical(r_0=1.0, f=lambda th, ph: 1.0, r_1=2.0, g=lambda th, ph: 0.5)],
+            nets=[net], train_generator=GeneratorSpherical(32, 1.0, 2.0),
+            valid_generator=GeneratorSpherical(32, 1.0, 2.0), n_batches_valid=1,
+            optimizer=torch.optim.Adam(net.parameters(), lr=params['lr']),
+            enforcer=lambda net, cond, points: cond.enforce(net, *points),
+        )
+        solver.fit(max_epochs=4, callbacks=[trial.callback])
+        return solver.loss['valid'][-1]
+
+    space = {'width': [4, 8], 'actv': [torch.nn.Tanh, SinActv], 'lr': [1e-2]}
+    results = run_sweep(spherical_objective, space, n_workers=2, n_threads=1, results_path=tmp_path / 'results.csv')
+    assert len(results) == 4 and set(results['status']) <= {'complete', 'pruned'}
+    assert (results['score'].diff().dropna() >= 0).all()
+    assert len(pd.read_csv(tmp_path / 'results.csv')) == 4
+
+    def ode_objective(params, trial):
+        if params['lr'] < 0:
+            raise ValueError('negative learning rate')
+        net = FCNN(1, 1, hidden_units=(8,))
+        _, history = solve(
+            lambda u, t: diff(u, t) + u, IVP(0.0, 1.0), 0.0, 1.0, net=net, max_epochs=4,
+            optimizer=torch.optim.Adam(net.parameters(), lr=params['lr']), monitor=trial.monitor(),
+        )
+        return history['valid_loss'][-1]
+
+    with warns(UserWarning):
+        results = run_sweep(ode_objective, {'lr': [1e-3, -1.0]}, n_workers=2)
+    assert list(results['status']) == ['complete', 'failed']
+    assert results['epochs'][0] == 4 and 'negative learning rate' in results['error'][1]
@@ -1,16 +1,22 @@
 from math import pi as PI
+import pickle
+import pytest
 import torch
 from torch import nn, optim
 from neurodiffeq.neurodiffeq import unsafe_diff as diff
-from neurodiffeq.networks import FCNN
+from neurodiffeq.networks import FCNN, SeparableFCNN
 from neurodiffeq.temporal import generator_1dspatial, generator_temporal
 from neurodiffeq.temporal import generator_2dspatial_segment, generator_2dspatial_rectangle
-from neurodiffeq.temporal import FirstOrderInitialCondition, BoundaryCondition
+from neurodiffeq.temporal import generator_3dspatial_body, generator_3dspatial_surface
+from neurodiffeq.temporal import FirstOrderInitialCondition, BoundaryCondition, TensorProductBatch
 from neurodiffeq.temporal import SingleNetworkApproximator1DSpatialTemporal, SingleNetworkApproximator2DSpatial, SingleNetworkApproximator2DSpatialTemporal
 from neurodiffeq.temporal import Monitor1DSpatialTemporal, Monitor2DSpatial, Monitor2DSpatialTemporal
+from neurodiffeq.temporal import _cartesian_prod_dims, _causal_mse
 from neurodiffeq.temporal import _train_1dspatial_temporal, _valid_1dspatial_temporal, _solve_1dspatial_temporal
 from neurodiffeq.temporal import _train_2dspatial_temporal, _valid_2dspatial_temporal, _solve_2dspatial_temporal
 from neurodiffeq.temporal import _train_2dspatial, _valid_2dspatial, _solve_2dspatial
+from neurodiffeq.temporal import _solve_3dspatial_temporal, SingleNetworkApproximator3DSpatialTemporal, MonitorMinimal
+from neurodiffeq.generators import GeneratorBall3D
 import matplotlib
 matplotlib.use('Agg') # use a non-GUI backend, so plots are not shown during testing
 
@@ -99,6 +105,43 @@ def test_generator_temporal():
     assert not (t == next(t_gen)).all()
 
 
+def test_temporal_generators_seed_and_pickle():
+    gens = [
+        lambda: generator_1dspatial(size=32, x_min=-4, x_max=2, seed=42),
+        lambda: generator_2dspatial_segment(size=32, start=(4., 2.), end=(-2., -4.), seed=42),
+        lambda: generator_2dspatial_rectangle(size=(8, 8), x_min=-2., x_max=4., y_min=-4., y_max=2., seed=42),
+        lambda: generator_temporal(size=32, t_min=0, t_max=42, seed=42),
+    ]
+    def _as_tuple(examples):
+        return (examples,) if isinstance(examples, torch.Tensor) else examples
+
+    for make_gen in gens:
+        g1, g2 = make_gen(), make_gen()
+        for a, b in zip(_as_tuple(next(g1)), _as_tuple(next(g2))):
+            assert (a == b).all()
+
+        g3 = pickle.loads(pickle.dumps(g1))
+        for _ in range(3):
+            for a, b in zip(_as_tuple(g1.get_examples()), _as_tuple(next(g3))):
+                assert (a == b).all()
+
+    # without a seed, the samplers draw from the global generator
+    unseeded = generator_2dspatial_rectangle(size=(8, 8), x_min=-2., x_max=4., y_min=-4., y_max=2.)
+    torch.manual_seed(0)
+    x1, y1 = next(unseeded)
+    torch.manual_seed(0)
+    x2, y2 = next(pickle.loads(pickle.dumps(unseeded)))
+    assert (x1 == x2).all() and (y1 == y2).all()
+
+
+def test_generator_2dspatial_segment_no_drift():
+    s_gen = generator_2dspatial_segment(size=4, start=(0., 0.), end=(1., 0.), random=True)
+    for _ in range(1000):
+        x, y = next(s_gen)
+    assert (x >= 0).all() and (x <= 1).all()
+    assert ((x - torch.tensor([0.125, 0.375, 0.625, 0.875])).abs() <= 0.125).all()
+
+
 def test_first_order_initial_condition():
     initial_condition = FirstOrderInitialCondition(u0=lambda x: torch.sin(x))
     x = torch.linspace(0, 1, 32)
@@ -176,6 +219,10 @@ def test_single_network_approximator_1dspatial_temporal():
         return torch.mean((uu - (xx+tt))**2)
     metrics = {'dummy_mse': dummy_mse}
     assert fcnn_approximator.calculate_metrics(xx, tt, x, t, metrics)['dummy_mse'].shape == torch.Size([])
+    loss, loss_metrics = fcnn_approximator.calculate_loss_and_metrics(xx, tt, x, t, metrics)
+    assert loss.isclose(fcnn_approximator.calculate_loss(xx, tt, x, t))
+    assert loss_metrics['dummy_mse'].isclose(fcnn_approximator.calculate_metrics(xx, tt, x, t, metrics)['dummy_mse'])
+    assert not loss_metrics['dummy_mse'].requires_grad
     xx, tt = torch.rand(16), torch.zeros(16)
     assert fcnn_approximator(xx, tt).isclose(torch.sin(PI * xx)).all()
 
@@ -569,6 +616,58 @@ def test__train_1dspatial_temporal():
     assert train_epoch_metrics['dummy_mse'] > 0
 
 
+def test__train_1dspatial_temporal_running_epoch_loss():
+    def points_gen():
+        while True:
+            yield torch.tensor([0.0, 1.0])
+
+    approximator = SingleNetworkApproximator1DSpatialTemporal(
+        single_network=FCNN(n_input_units=2, n_output_units=1),
+        pde=lambda u, x, t: diff(u, t) - diff(u, x, order=2),
+        initial_condition=FirstOrderInitialCondition(u0=lambda x: torch.sin(PI * x)),
+        boundary_conditions=[BoundaryCondition(form=lambda u, x, t: u, points_generator=points_gen())],
+    )
+    metrics = {'mean_u': lambda uu, xx, tt: uu.mean()}
+    # with a zero learning rate, the average over mini-batches must equal the loss evaluated on all points
+    sgd = optim.SGD(approximator.parameters(), lr=0.0)
+    results = [
+        _train_1dspatial_temporal(
+            generator_1dspatial(size=8, x_min=0.0, x_max=1.0, random=False),
+            generator_temporal(size=6, t_min=0.0, t_max=1.0, random=False),
+            approximator, sgd, metrics, shuffle=True, batch_size=10, exact_epoch_loss=exact_epoch_loss,
+        )
+        for exact_epoch_loss in [False, True]
+    ]
+    (running_loss, running_metrics), (exact_loss, exact_metrics) = results
+    assert abs(running_loss - exact_loss) < 1e-8
+    assert abs(running_metrics['mean_u'] - exact_metrics['mean_u']) < 1e-8
+
+
+def test__train_1dspatial_temporal_lbfgs():
+    def points_gen():
+        while True:
+            yield torch.tensor([0.0, 1.0])
+
+    approximator = SingleNetworkApproximator1DSpatialTemporal(
+        single_network=FCNN(n_input_units=2, n_output_units=1),
+        pde=lambda u, x, t: diff(u, t) - diff(u, x, order=2),
+        initial_condition=FirstOrderInitialCondition(u0=lambda x: torch.sin(PI * x)),
+        boundary_conditions=[BoundaryCondition(form=lambda u, x, t: u, points_generator=points_gen())],
+    )
+    lbfgs = optim.LBFGS(approximator.parameters(), max_iter=5)
+    losses = [
+        _train_1dspatial_temporal(
+            generator_1dspatial(size=8, x_min=0.0, x_max=1.0, random=False),
+            generator_temporal(size=6, t_min=0.0, t_max=1.0, random=False),
+            approximator, lbfgs, {}, shuffle=True, batch_size=10,
+        )[0]
+        for _ in range(3)
+    ]
+    # a single step on the whole (fixed) training set in each epoch
+    assert lbfgs.state[lbfgs._params[0]]['n_iter'] == 3 * 5
+    assert losses[-1] < losses[0]
+
+
 def test__valid_1dspatial_temporal():
     DIFFUSIVITY, X_MIN, X_MAX, T_MIN, T_MAX = 0.3, 0.0, 2.0, 0.0, 3.0
 
@@ -701,6 +800,96 @@ def test__solve_1dspatial_temporal():
     assert fcnn_approximator(xx, tt).isclose(torch.sin(PI * xx / X_MAX)).all()
 
 
+def test__solve_1dspatial_temporal_time_marching():
+    # without weighting (tolerance=0), the causal MSE is the mean of the per-time MSEs
+    tt = torch.tensor([0.0, 0.0, 1.0, 1.0, 2.0])
+    residuals = torch.tensor([1.0, 3.0, 2.0, 2.0, 1.0])
+    assert torch.isclose(_causal_mse(residuals, tt, 0.0), torch.tensor((5.0 + 4.0 + 1.0) / 3))
+    # later times are down-weighted by the residuals at earlier times
+    assert torch.isclose(_causal_mse(residuals, tt, 1.0), torch.tensor((5.0 + 4.0 * torch.exp(torch.tensor(-5.0)) + 1.0 * torch.exp(torch.tensor(-9.0))) / 3))
+
+    def points_gen():
+        while True:
+            yield torch.tensor([0.0, 1.0])
+
+    approximator = SingleNetworkApproximator1DSpatialTemporal(
+        single_network=FCNN(n_input_units=2, n_output_units=1),
+        pde=lambda u, x, t: diff(u, t) - diff(u, x, order=2),
+        initial_condition=FirstOrderInitialCondition(u0=lambda x: torch.sin(PI * x)),
+        boundary_conditions=[BoundaryCondition(form=lambda u, x, t: u, points_generator=points_gen())],
+        causal_tolerance=1.0,
+    )
+    metrics = {'t_max': lambda u, x, t: t.max()}
+    epochs = []
+    _, history = _solve_1dspatial_temporal(
+        train_generator_spatial=generator_1dspatial(size=8, x_min=0.0, x_max=1.0),
+        train_generator_temporal=generator_temporal(size=8, t_min=0.0, t_max=4.0),
+        valid_generator_spatial=generator_1dspatial(size=8, x_min=0.0, x_max=1.0, random=False),
+        valid_generator_temporal=generator_temporal(size=8, t_min=0.0, t_max=4.0, random=False),
+        approximator=approximator,
+        optimizer=optim.Adam(approximator.parameters()),
+        batch_size=16, max_epochs=7, shuffle=True, metrics=metrics, monitor=None,
+        time_windows=[0.0, 1.0, 2.0, 4.0], callbacks=[lambda solver: epochs.append(solver.local_epoch)],
+    )
+    # the epochs are split into stages, each extending the time range
+    assert len(history['train_loss']) == 7
+    assert epochs == [0, 1, 2, 0, 1, 0, 1]
+    assert history['valid_t_max'] == [0.9375] * 3 + [1.875] * 2 + [3.75] * 2
+
+    with pytest.raises(ValueError):
+        _solve_1dspatial_temporal(
+            generator_1dspatial(size=8, x_min=0.0, x_max=1.0), generator_temporal(size=8, t_min=0.0, t_max=4.0),
+            generator_1dspatial(size=8, x_min=0.0, x_max=1.0), generator_temporal(size=8, t_min=0.0, t_max=4.0),
+            approximator, optim.Adam(approximator.parameters()), 16, 2, True, {}, None, time_windows=[1.0, 0.0],
+        )
+    # the temporal generators must span the time windows
+    with pytest.raises(ValueError):
+        _solve_1dspatial_temporal(
+            generator_1dspatial(size=8, x_min=0.0, x_max=1.0), generator_temporal(size=8, t_min=0.0, t_max=10.0),
+            generator_1dspatial(size=8, x_min=0.0, x_max=1.0), generator_temporal(size=8, t_min=0.0, t_max=10.0),
+            approximator, optim.Adam(approximator.parameters()), 16, 2, True, {}, None, time_windows=[0.0, 1.0, 2.0],
+        )
+
+
+def test_tensor_product_batch_separable():
+    DIFFUSIVITY, X_MIN, X_MAX, T_MIN, T_MAX = 0.3, 0.0, 2.0, 0.0, 6.0
+
+    def heat_equation_1d(u, x, t):
+        return diff(u, t) - DIFFUSIVITY * diff(u, x, order=2)
+
+    dirichlet_boundary = BoundaryCondition(
+        form=lambda u, x, t: u,
+        points_generator=generator_1dspatial(size=2, x_min=X_MIN, x_max=X_MAX, random=False),
+    )
+    approximator = SingleNetworkApproximator1DSpatialTemporal(
+        single_network=SeparableFCNN(axis_dims=(1, 1), rank=8),
+        pde=heat_equation_1d,
+        initial_condition=FirstOrderInitialCondition(u0=lambda x: torch.sin(PI * x / X_MAX)),
+        boundary_conditions=[dirichlet_boundary],
+    )
+
+    x = next(generator_1dspatial(size=16, x_min=X_MIN, x_max=X_MAX))
+    t = next(generator_temporal(size=8, t_min=T_MIN, t_max=T_MAX))
+    batch = TensorProductBatch(x, t)
+    assert len(batch) == 16 * 8
+    assert len(batch.select(-1, torch.arange(3))) == 16 * 3
+
+    xx, tt = _cartesian_prod_dims(x, t)
+    xx_, tt_ = batch.coords
+    assert (xx == xx_).all() and (tt == tt_).all()
+    grid_loss = approximator.calculate_loss(*batch.coords, x, t, batch=batch)
+    pointwise_loss = approximator.calculate_loss(xx, tt, x, t)
+    assert torch.isclose(grid_loss, pointwise_loss)
+
+    train_gen_spatial = generator_1dspatial(size=16, x_min=X_MIN, x_max=X_MAX)
+    train_gen_temporal = generator_temporal(size=16, t_min=T_MIN, t_max=T_MAX)
+    adam = optim.Adam(approximator.parameters())
+    train_epoch_loss, _ = _train_1dspatial_temporal(
+        train_gen_spatial, train_gen_temporal, approximator, adam, {}, shuffle=True, batch_size=64
+    )
+    assert train_epoch_loss > 0
+
+
 def test__train_2dspatial():
     def laplace_2d(u, xx, yy):
         return diff(u, xx, order=2) + diff(u, yy, order=2)
@@ -1134,3 +1323,56 @@ def test__solve_2dspatial():
     )
     xx, yy = torch.rand(16), torch.rand(16)
     assert poisson_2d_solution(xx, yy).shape == torch.Size([16])
+
+
+def test_generator_3dspatial_body_and_surface():
+    s_gen = generator_3dspatial_body(size=(4, 5, 6), x_min=0., x_max=1., y_min=1., y_max=2., z_min=2., z_max=3.)
+    for _ in range(3):
+        x, y, z = next(s_gen)
+        for c, lo in zip((x, y, z), (0., 1., 2.)):
+            assert c.shape == torch.Size([120])
+            assert (c >= lo).all() and (c <= lo + 1).all()
+            assert not c.requires_grad
+
+    s_gen = generator_3dspatial_surface(size=100, x_min=0., x_max=1., y_min=1., y_max=2., z_min=2., z_max=3.,
+                                        random=False)
+    x, y, z = next(s_gen)
+    assert x.shape == y.shape == z.shape == torch.Size([100])
+    assert (((x == 0) | (x == 1)) | ((y == 1) | (y == 2)) | ((z == 2) | (z == 3))).all()
+    assert (x == next(s_gen)[0]).all()
+
+
+def test__solve_3dspatial_temporal():
+    def heat_equation_3d(u, x, y, z, t):
+        return diff(u, t) - (diff(u, x, order=2) + diff(u, y, order=2) + diff(u, z, order=2))
+
+    boundary = BoundaryCondition(
+        form=lambda u, x, y, z, t: u,
+        points_generator=GeneratorBall3D(size=32, method='surface'),
+    )
+    approximator = SingleNetworkApproximator3DSpatialTemporal(
+        single_network=FCNN(n_input_units=4, n_output_units=1, hidden_units=(16,)),
+        pde=heat_equation_3d,
+        initial_condition=FirstOrderInitialCondition(u0=lambda x, y, z: 1 - (x ** 2 + y ** 2 + z ** 2)),
+        boundary_conditions=[boundary],
+    )
+
+    def dummy_mse(uu, xx, yy, zz, tt):
+        return torch.mean(uu ** 2)
+
+    solution, history = _solve_3dspatial_temporal(
+        train_generator_spatial=GeneratorBall3D(size=32),
+        train_generator_temporal=generator_temporal(size=4, t_min=0., t_max=1.),
+        valid_generator_spatial=GeneratorBall3D(size=32),
+        valid_generator_temporal=generator_temporal(size=4, t_min=0., t_max=1., random=False),
+        approximator=approximator,
+        optimizer=optim.Adam(approximator.parameters()),
+        batch_size=64,
+        max_epochs=2,
+        shuffle=True,
+        metrics={'dummy_mse': dummy_mse},
+        monitor=MonitorMinimal(check_every=1),
+    )
+    assert len(history['train_loss']) == 2 and len(history['valid_dummy_mse']) == 2
+    xx, yy, zz, tt = torch.rand(16), torch.rand(16), torch.rand(16), torch.rand(16)
+    assert solution(xx, yy, zz, tt).shape == torch.Size([16])